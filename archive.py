@@ -0,0 +1,377 @@
+"""
+공지 본문 보관함 + 전문 검색.
+
+새 글(또는 제목이 바뀐 글)이 목록에 나오면 본문을 한 번만 받아 private/archive.jsonl 에 한 줄씩 덧붙이고,
+메모리의 역색인(n-gram → 글)도 그 자리에서 갱신함. 검색은 BM25 점수 순.
+
+- 토큰: 한글은 글자 2개씩(바이그램), 영문/숫자는 단어 단위 → 띄어쓰기/조사가 달라도 찾아짐
+  ("장학금신청" 으로 "장학금 신청 안내" 를 찾음)
+- 파일에는 글마다 토큰 빈도도 같이 저장 → 불러올 때 다시 토큰화하지 않음
+- 같은 글의 새 버전은 뒤에 덧붙이고 (나중 줄이 이김), 지난 줄이 많이 쌓이면 파일을 새로 씀
+- 본문 전체라서 커밋되는 state/ 가 아니라 private/ 에 둠 (Actions 에서는 캐시로 유지, 없어지면 다시 받음)
+
+사용법:
+    python archive.py 장학 신청            # 검색
+    python archive.py --source dorm 점검
+    python archive.py --stats
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+import state_store
+
+# ▼ 설정 ▼
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE', '1') != '0'
+ARCHIVE_FILE = "archive.jsonl"
+MAX_FETCH = int(os.environ.get('ARCHIVE_MAX_FETCH', '20'))  # 실행 한 번에 받을 본문 수 (나머지는 다음 실행에서)
+FETCH_WORKERS = int(os.environ.get('ARCHIVE_FETCH_WORKERS', '4'))
+BODY_LIMIT = 20000  # 본문은 이 글자 수까지만 보관
+LOAD_BATCH = 20  # 쉬면서 읽을 때 한 번에 읽는 줄 수
+TITLE_WEIGHT = 3  # 제목 토큰은 본문보다 이만큼 더 쳐줌
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 60
+
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text):
+    """ 한글 연속 구간 → 바이그램 (한 글자면 그대로), 영문/숫자 → 단어 """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    grams = []
+    for run in TOKEN_PATTERN.findall(text):
+        if run[0].isascii() or len(run) == 1:
+            grams.append(run)
+        else:
+            grams.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+def archive_path():
+    """ 예전처럼 state/ 에 있으면 private/ 로 옮김 (본문이 매 실행 커밋되어 저장소가 커짐) """
+    path = state_store.private_path(ARCHIVE_FILE)
+    legacy = state_store.state_path(ARCHIVE_FILE)
+    if not os.path.exists(path) and os.path.exists(legacy):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.replace(legacy, path)
+        print(f"📦 {legacy} → {path} 로 옮김")
+    return path
+
+
+def doc_key(source, post_id):
+    return f"{source}:{post_id}"
+
+
+class Archive:
+    """ 보관된 글 + 역색인. 여러 소스가 동시에 쓰므로 잠금으로 보호 """
+
+    def __init__(self, path=None, pause=0):
+        """ pause: 처음 읽을 때 LOAD_BATCH 줄마다 쉬는 시간(초) - 다른 스레드가 GIL 을 잡을 수 있게 (bot_server.py) """
+        self.path = path or archive_path()
+        self.docs = {}  # key → 글 (terms 포함)
+        self.postings = {}  # 토큰 → {key: 빈도}
+        self.total_length = 0
+        self.lines = 0  # 파일 줄 수 (지난 버전 포함)
+        self.offset = 0  # 파일에서 어디까지 읽었는지 (바이트)
+        self.inode = None
+        self.pending = []
+        self.lock = threading.Lock()
+        self.refresh(pause)
+
+    def refresh(self, pause=0):
+        """
+        파일에서 아직 안 읽은 줄만 색인에 반영 (다른 프로세스가 덧붙인 글, bot_server.py 등).
+        파일을 새로 썼으면(압축) 처음부터 다시 읽음. 반환: 읽은 줄 수
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return 0
+        with self.lock:
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self.docs, self.postings, self.total_length, self.lines, self.offset = {}, {}, 0, 0, 0
+                self.inode = stat.st_ino
+            if stat.st_size == self.offset:
+                return 0
+            read = 0
+            # 한 줄씩 읽음 (파일 전체를 한 번에 디코딩하면 그동안 다른 스레드가 GIL 을 못 잡음)
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                for number, line in enumerate(f, 1):
+                    if not line.endswith(b"\n"):
+                        break  # 쓰는 중인 마지막 줄은 다음에 읽음
+                    self.offset += len(line)
+                    if pause and number % LOAD_BATCH == 0:
+                        time.sleep(pause)
+                    if not line.strip():
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다 끊긴 줄
+                    self.lines += 1
+                    self._index(doc)
+                    read += 1
+            return read
+
+    def __len__(self):
+        return len(self.docs)
+
+    def __contains__(self, key):
+        return key in self.docs
+
+    # ------------------------------------------------------
+    # 색인 갱신
+    # ------------------------------------------------------
+    def _index(self, doc):
+        self._unindex(doc["key"])
+        self.docs[doc["key"]] = doc
+        for gram, tf in doc["terms"].items():
+            self.postings.setdefault(gram, {})[doc["key"]] = tf
+        self.total_length += doc["length"]
+
+    def _unindex(self, key):
+        old = self.docs.pop(key, None)
+        if not old:
+            return
+        for gram in old["terms"]:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[gram]
+        self.total_length -= old["length"]
+
+    def needs(self, key, title):
+        """
+        아직 없거나 제목이 바뀐 글이면 True (본문을 받아야 함).
+        예전에 본문을 못 찾고 빈 본문으로 보관된 글도 다시 받음 (본문이 없는 소스의 글은 제외)
+        """
+        doc = self.docs.get(key)
+        return doc is None or doc["title"] != title or (not doc["body"] and doc.get("fetched", True))
+
+    def add(self, source, post_id, post, body):
+        fetched = body is not None
+        body = (body or "")[:BODY_LIMIT]
+        terms = Counter(tokenize(body))
+        for gram in tokenize(post["title"]):
+            terms[gram] += TITLE_WEIGHT
+        doc = {
+            "key": doc_key(source, post_id),
+            "source": source,
+            "id": post_id,
+            "title": post["title"],
+            "link": post.get("link"),
+            "date": post.get("date"),
+            "category": post.get("category"),
+            "body": body,
+            "hash": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+            "archived_at": int(time.time()),
+            "fetched": fetched,  # False: 소스가 본문을 주지 않음 (제목만 보관)
+            "length": sum(terms.values()),
+            "terms": dict(terms),
+        }
+        with self.lock:
+            self._index(doc)
+            self.pending.append(doc)
+        return doc
+
+    def rename(self, source, canonical):
+        """
+        source 글의 ID 를 canonical(ID) 로 바꾸고 파일을 새로 씀 (덧붙이면 예전 키 줄도 남아서).
+        이미 새 키로 보관된 글이 있으면 그쪽을 남김. 바뀐 개수 반환
+        """
+        with self.lock:
+            moved = [doc for doc in self.docs.values() if doc["source"] == source and canonical(doc["id"]) != doc["id"]]
+            for doc in moved:
+                self._unindex(doc["key"])
+                new_id = canonical(doc["id"])
+                if doc_key(source, new_id) not in self.docs:
+                    self._index(dict(doc, id=new_id, key=doc_key(source, new_id)))
+            if moved:
+                self._compact()
+            return len(moved)
+
+    def save(self):
+        """ 새로 추가된 글만 파일 끝에 덧붙임. 지난 버전 줄이 너무 많으면 전체를 새로 씀 """
+        with self.lock:
+            if not self.pending:
+                return 0
+            added = len(self.pending)
+            if self.lines + added > 2 * len(self.docs) + 100:
+                self._compact()
+            else:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for doc in self.pending:
+                        f.write(json.dumps(doc, ensure_ascii=False, sort_keys=True) + "\n")
+                self.lines += added
+                stat = os.stat(self.path)
+                self.offset, self.inode = stat.st_size, stat.st_ino
+            self.pending = []
+            return added
+
+    def _compact(self):
+        lines = [json.dumps(doc, ensure_ascii=False, sort_keys=True) for doc in self.docs.values()]
+        state_store.atomic_write_text(self.path, "".join(line + "\n" for line in lines))
+        self.lines = len(lines)
+        stat = os.stat(self.path)
+        self.offset, self.inode = stat.st_size, stat.st_ino
+
+    # ------------------------------------------------------
+    # 검색
+    # ------------------------------------------------------
+    def _query_grams(self, query):
+        grams = set(tokenize(query))
+        for gram in list(grams):
+            if len(gram) == 1 and "가" <= gram <= "힣":
+                # 한 글자 검색어 ("밥") → 그 글자가 들어간 바이그램도
+                grams.update(g for g in self.postings if gram in g)
+        return grams
+
+    def search(self, query, limit=10, source=None):
+        """ BM25 점수가 높은 순으로 [{key, source, title, link, date, score, snippet}] """
+        with self.lock:
+            n = len(self.docs)
+            if not n:
+                return []
+            avg_length = self.total_length / n
+            scores = {}
+            for gram in self._query_grams(query):
+                posting = self.postings.get(gram)
+                if not posting:
+                    continue
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, tf in posting.items():
+                    length = self.docs[key]["length"]
+                    norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+                    scores[key] = scores.get(key, 0.0) + idf * norm
+            if source:
+                scores = {k: v for k, v in scores.items() if self.docs[k]["source"] == source}
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [self._result(self.docs[key], score, query) for key, score in top]
+
+    def _result(self, doc, score, query):
+        return {
+            "key": doc["key"],
+            "source": doc["source"],
+            "title": doc["title"],
+            "link": doc["link"],
+            "date": doc["date"],
+            "score": round(score, 4),
+            "snippet": snippet(doc["body"], query),
+        }
+
+    def stats(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        by_source = Counter(doc["source"] for doc in self.docs.values())
+        return {"docs": len(self.docs), "terms": len(self.postings), "lines": self.lines,
+                "bytes": size, "by_source": dict(by_source)}
+
+
+def snippet(body, query, width=SNIPPET_CHARS):
+    """ 본문에서 검색어가 처음 나오는 곳 주변 (없으면 앞부분) """
+    text = " ".join((body or "").split())
+    start = 0
+    for word in query.split():
+        pos = text.lower().find(word.lower())
+        if pos >= 0:
+            start = max(0, pos - width // 3)
+            break
+    piece = text[start:start + width]
+    return ("…" if start else "") + piece + ("…" if start + width < len(text) else "")
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = Archive()
+    return _archive
+
+
+# ------------------------------------------------------
+# 실행기(sources.py)에서 호출
+# ------------------------------------------------------
+def update(source, posts, limit=None, bodies=None):
+    """
+    목록에 나온 글 중 보관함에 없거나 제목이 바뀐 글의 본문을 받아서 추가.
+    실행마다 limit(기본 ARCHIVE_MAX_FETCH) 개까지만, 받기 실패한 글은 다음 실행에서 다시 시도.
+    bodies: 이번 실행에서 이미 받은 본문 {글 ID: 본문} (중복 확인 등) → 다시 받지 않고 그대로 씀 (limit 에 안 셈)
+    반환: 추가한 글 수
+    """
+    store = get_archive()
+    bodies = bodies or {}
+    needed = [
+        p for p in posts
+        if source.should_archive(p) and store.needs(doc_key(source.name, source.fingerprint(p)), p["title"])
+    ]
+    ready = [p for p in needed if source.fingerprint(p) in bodies]
+    todo = [p for p in needed if source.fingerprint(p) not in bodies][:limit or MAX_FETCH]
+    if not ready and not todo:
+        return 0
+
+    added = 0
+    for post in ready:
+        store.add(source.name, source.fingerprint(post), post, bodies[source.fingerprint(post)])
+        added += 1
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="archive") as pool:
+        futures = [(post, pool.submit(metrics.bind(source.fetch_body), post)) for post in todo]
+        for post, future in futures:
+            try:
+                body = future.result()
+            except Exception as e:
+                metrics.count("archive_failed")
+                print(f"⚠️ 본문 받기 실패: {post['title']} ({e})")
+                continue
+            store.add(source.name, source.fingerprint(post), post, body)
+            added += 1
+    store.save()
+    metrics.count("archived", added)
+    print(f"🗄️ 본문 보관 {added}개 (보관함 {len(store)}개)")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공지 본문 검색")
+    parser.add_argument("query", nargs="*")
+    parser.add_argument("--source", help="소스 이름 (notice / dorm ...)")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--stats", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = get_archive()
+    load_ms = (time.perf_counter() - start) * 1000
+    if args.stats or not args.query:
+        print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+        print(f"불러오기 {load_ms:.0f}ms")
+        return
+
+    query = " ".join(args.query)
+    start = time.perf_counter()
+    results = store.search(query, limit=args.limit, source=args.source)
+    search_ms = (time.perf_counter() - start) * 1000
+    print(f"🔎 '{query}' {len(results)}건 ({search_ms:.1f}ms)")
+    for r in results:
+        print(f"[{r['score']:.2f}] ({r['source']}) {r['title']}\n    {r['link']}\n    {r['snippet']}")
+
+
+if __name__ == "__main__":
+    main()
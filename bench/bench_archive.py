@@ -0,0 +1,111 @@
+"""
+본문 보관함(archive.py) 검색 벤치마크 (네트워크 없음)
+
+1. fixture 공지 제목 + 가짜 본문으로 글 N개(기본 5000)를 보관함에 추가 → 파일 저장 → 다시 불러오기
+2. 검색어별 응답 시간 (중앙값 / p99)
+3. 글을 조금씩 나눠 추가(증분)한 보관함과 한 번에 만든 보관함의 검색 결과가 같은지 확인 (다르면 종료 코드 1)
+
+사용법:
+    python bench/bench_archive.py [--docs 5000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import archive  # noqa: E402
+import dorm_monitor  # noqa: E402
+import monitor  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+QUERIES = ["장학", "장학금 신청", "기숙사 점검", "수강", "졸업", "KLAS", "학사일정 안내", "밥", "근로 모집", "없는검색어"]
+
+
+def fixture_titles():
+    with open(os.path.join(FIXTURE_DIR, "notice.html"), "r", encoding="utf-8") as f:
+        titles = [p["title"] for p in monitor.extract_page(f.read())]
+    with open(os.path.join(FIXTURE_DIR, "getBbsList.json"), "r", encoding="utf-8") as f:
+        titles += [p["title"] for p in dorm_monitor.extract_posts(json.load(f))[0]]
+    return titles
+
+
+def synthetic_docs(count, rng):
+    titles = fixture_titles()
+    words = sorted({w for t in titles for w in t.replace("[", " ").replace("]", " ").split() if len(w) >= 2})
+    docs = []
+    for idx in range(count):
+        title = f"{rng.choice(titles)} ({idx})"
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(40, 200)))
+        source = "dorm" if idx % 5 == 0 else "notice"
+        docs.append((source, str(idx), {"title": title, "link": f"https://example.invalid/{idx}"}, body))
+    return docs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="본문 보관함 검색 벤치마크")
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    docs = synthetic_docs(args.docs, rng)
+    workdir = tempfile.mkdtemp(prefix="archive-bench-")
+
+    # ---- 한 번에 추가 ----
+    store = archive.Archive(os.path.join(workdir, "bulk.jsonl"))
+    start = time.perf_counter()
+    for source, post_id, post, body in docs:
+        store.add(source, post_id, post, body)
+    add_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    store.save()
+    save_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    store = archive.Archive(store.path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    # ---- 증분 추가 (실행마다 20개씩 + 같은 글 새 버전) ----
+    incremental = archive.Archive(os.path.join(workdir, "incremental.jsonl"))
+    for offset in range(0, len(docs), 20):
+        for source, post_id, post, body in docs[offset:offset + 20]:
+            incremental.add(source, post_id, dict(post, title=post["title"] + " (초안)"), body[:50])
+            incremental.add(source, post_id, post, body)
+        incremental.save()
+    incremental = archive.Archive(incremental.path)
+
+    mismatched = [q for q in QUERIES if store.search(q) != incremental.search(q)]
+
+    size = os.path.getsize(store.path) / 1024 / 1024
+    print(f"글 {len(store)}개 / 토큰 {len(store.postings)}종 / 파일 {size:.1f}MB")
+    print(f"  추가   {add_ms / len(docs) * 1000:>8.1f}us/글")
+    print(f"  저장   {save_ms:>8.0f}ms")
+    print(f"  불러오기 {load_ms:>6.0f}ms\n")
+
+    print(f"{'검색어':<16}{'결과':>6}{'중앙값(ms)':>12}{'p99(ms)':>10}")
+    worst = 0.0
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = store.search(query)
+            samples.append((time.perf_counter() - start) * 1000)
+        worst = max(worst, percentile(samples, 0.99))
+        print(f"{query:<16}{len(results):>6}{statistics.median(samples):>12.2f}{percentile(samples, 0.99):>10.2f}")
+
+    print(f"\n가장 느린 p99: {worst:.2f}ms")
+    if mismatched:
+        print(f"❌ 증분 보관함과 검색 결과가 다름: {mismatched}")
+        sys.exit(1)
+    print("✅ 증분으로 쌓은 보관함과 한 번에 만든 보관함의 검색 결과가 같음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+명령어 봇(bot_server.py) 응답 시간 벤치마크 (가짜 텔레그램 서버 사용, 네트워크 없음)
+
+1. 임시 state/ 에 fixture 로 식단/학사일정 캐시, 가짜 본문으로 보관함(기본 5000개)을 만듦
+2. 가짜 텔레그램에 사용자 N명이 /menu, /calendar, /search 를 섞어서 보냄 (getUpdates 롱 폴링)
+   중간에 보관함 파일을 새로 써서 (압축한 것처럼) 봇이 보관함 전체를 다시 읽게 함
+3. 사용자 메시지를 넣은 순간부터 봇 답장이 가짜 서버에 도착할 때까지의 시간 (중앙값 / p99)
+   모든 명령에 답장이 한 번씩 왔는지, p99 가 --max-p99 이하인지 확인 (아니면 종료 코드 1)
+
+사용법:
+    python bench/bench_bot.py [--users 300] [--per-user 3] [--docs 5000] [--max-p99 100]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import archive  # noqa: E402
+import bot_server  # noqa: E402
+import calendar_bot  # noqa: E402
+import http_client  # noqa: E402
+import state_store  # noqa: E402
+import telegram_dispatcher  # noqa: E402
+from bench_archive import synthetic_docs  # noqa: E402
+from fake_telegram import FakeTelegram  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+TODAY = date(2026, 10, 20)  # facility11.html 식단 주간
+COMMANDS = ["/menu", "/menu 내일", "/menu 금", "/calendar", "/search 장학금", "/search 기숙사 점검",
+            "/search 수강", "/search KLAS", "/search 밥", "/help"]
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def seed_state(docs, rng):
+    """ 모닝 브리핑 / 소스 실행기가 채워둔 것처럼 캐시 파일을 만듦 """
+    menu = calendar_bot.MenuCache()
+    menu.update(read_fixture("facility11.html"))
+    menu.save()
+    cache = calendar_bot.CalendarCache()
+    for y, m in calendar_bot.get_target_months(TODAY):
+        cache.update(y, m, read_fixture(f"list5_detail_{y}_{m:02d}.html"))
+    cache.save()
+    store = archive.Archive()
+    for source, post_id, post, body in synthetic_docs(docs, rng):
+        store.add(source, post_id, post, body)
+    store.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="명령어 봇 응답 시간 벤치마크")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--per-user", type=int, default=3, help="사용자당 명령 수 (채팅방별 몰아보내기 한도 이하)")
+    parser.add_argument("--docs", type=int, default=5000, help="보관함 글 수")
+    parser.add_argument("--rate", type=float, default=200, help="보내는 간격 (초당 명령 수)")
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--max-p99", type=float, default=100, help="p99 허용치(ms)")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    state_store.STATE_DIR = tempfile.mkdtemp(prefix="bot-bench-")
+    state_store.PRIVATE_DIR = os.path.join(state_store.STATE_DIR, "private")
+    seed_state(args.docs, rng)
+
+    start = time.perf_counter()
+    snapshot = bot_server.Snapshot()
+    load_ms = (time.perf_counter() - start) * 1000
+    loaded = snapshot.archive
+
+    sent_at = {}  # (채팅방, 순번) → 사용자 메시지를 넣은 시각
+    latencies = []
+    replies = {}
+    lock = threading.Lock()
+    pending = {}  # 채팅방 → 아직 답장을 못 받은 명령 순번 (채팅방 안에서는 순서대로 옴)
+
+    def on_message(chat_id, method, params):
+        now = time.perf_counter()
+        with lock:
+            replies[chat_id] = replies.get(chat_id, 0) + 1
+            queue = pending.get(chat_id)
+            if queue:
+                latencies.append((now - sent_at[(chat_id, queue.pop(0))]) * 1000)
+
+    http_client.configure(pool_maxsize=args.workers)
+    bot_server.POLL_TIMEOUT = 5
+    bot_server.RELOAD_INTERVAL = 0.5
+    with FakeTelegram(on_message=on_message) as fake:
+        dispatcher = telegram_dispatcher.Dispatcher(
+            token="bench", api_url=fake.url, workers=args.workers,
+            global_rate=args.rate * 2, chat_burst=args.per_user
+        )
+        server = bot_server.BotServer(snapshot, dispatcher, token="bench", api_url=fake.url, today=lambda: TODAY)
+        loop = asyncio.new_event_loop()
+        stop = []
+
+        async def serve():
+            stop.append(asyncio.Event())  # 이벤트는 봇 루프 안에서 만들어야 함
+            await server.serve(stop[0])
+
+        thread = threading.Thread(target=loop.run_until_complete, args=(serve(),), daemon=True)
+        thread.start()
+        time.sleep(0.2)  # 첫 롱 폴링 대기
+
+        chats = [str(500000 + idx) for idx in range(args.users)]
+        schedule = [(chat_id, n) for n in range(args.per_user) for chat_id in chats]
+        rng.shuffle(schedule)
+        schedule.sort(key=lambda item: item[1])  # 같은 채팅방 명령은 순서대로
+        start = time.perf_counter()
+        for idx, (chat_id, n) in enumerate(schedule):
+            if idx == len(schedule) // 3:
+                # 소스 실행기(다른 프로세스)가 보관함을 압축한 것처럼 파일을 새로 씀 → 다음 refresh 에서 전부 다시 읽음
+                shutil.copyfile(snapshot.archive.path, snapshot.archive.path + ".tmp")
+                os.replace(snapshot.archive.path + ".tmp", snapshot.archive.path)
+            # 일정한 간격으로 보냄 (한꺼번에 몰리면 대기열 시간만 재게 됨)
+            delay = start + idx / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            with lock:
+                pending.setdefault(chat_id, []).append(n)
+                sent_at[(chat_id, n)] = time.perf_counter()
+            fake.push_update(chat_id, rng.choice(COMMANDS))
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline and len(latencies) < len(schedule):
+            time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        loop.call_soon_threadsafe(stop[0].set)
+        thread.join(timeout=15)
+        dispatcher.close()
+
+    missing = sum(max(0, args.per_user - replies.get(c, 0)) for c in chats)
+    duplicate = sum(max(0, n - args.per_user) for n in replies.values())
+    print(f"캐시 불러오기 {load_ms:.0f}ms (보관함 {len(snapshot.archive)}개)"
+          f" / 압축 후 다시 읽기 {'끝남' if snapshot.archive is not loaded else '진행 중'}")
+    print(f"명령 {len(schedule)}개 / 사용자 {len(chats)}명 / {elapsed:.2f}초 ({len(latencies) / elapsed:.0f}개/초)")
+    print(f"  가짜 서버: {fake.stats}")
+    print(f"  전송기: {dispatcher.stats}")
+    p99 = percentile(latencies, 0.99) if latencies else float("inf")
+    if latencies:
+        print(f"  응답 시간: 중앙값 {statistics.median(latencies):.1f}ms / p99 {p99:.1f}ms / 최대 {max(latencies):.1f}ms")
+    print(f"  누락 {missing} / 중복 {duplicate}")
+    if missing or duplicate:
+        sys.exit(1)
+    if p99 > args.max_p99:
+        print(f"❌ p99 {p99:.1f}ms > {args.max_p99:.0f}ms")
+        sys.exit(1)
+    print(f"✅ 모든 명령에 한 번씩 답장, p99 {args.max_p99:.0f}ms 이하")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+모닝 브리핑 수집 시간 비교: 기존 순차 방식 vs 동시 수집(fetch_briefing_sources)
+
+사용법:
+    python bench/bench_briefing_fetch.py              # 실제 kw.ac.kr 에 요청
+    python bench/bench_briefing_fetch.py --simulate   # 네트워크 없이 지연만 흉내냄
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calendar_bot  # noqa: E402
+
+
+def simulate_latency(low, high):
+    """ fetch 함수들을 지연만 있는 가짜로 교체 (순차/동시 양쪽 모두 같은 함수를 부름) """
+    def fake_calendar(year, month, timeout=10):
+        time.sleep(min(random.uniform(low, high), timeout))
+        return ""
+
+    def fake_menu(timeout=10):
+        time.sleep(min(random.uniform(low, high), timeout))
+        return "<table class='tbl-list'></table>"
+
+    calendar_bot.fetch_calendar_data = fake_calendar
+    calendar_bot.fetch_menu_page = fake_menu
+
+
+def sequential(today):
+    fragments = [calendar_bot.fetch_calendar_data(y, m) for y, m in calendar_bot.get_target_months(today)]
+    try:
+        calendar_bot.fetch_menu_page()
+    except Exception:
+        pass
+    return fragments
+
+
+def concurrent(today):
+    return calendar_bot.fetch_briefing_sources(today)
+
+
+def measure(func, today, rounds):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(today)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--simulate", action="store_true", help="네트워크 대신 지연 시뮬레이션")
+    parser.add_argument("--latency", type=float, nargs=2, default=(0.5, 3.0), metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate_latency(*args.latency)
+
+    today = calendar_bot.get_korea_today()
+    results = {
+        "sequential": measure(sequential, today, args.rounds),
+        "concurrent": measure(concurrent, today, args.rounds),
+    }
+
+    print(f"{'mode':<12}{'min':>9}{'avg':>9}{'max':>9}")
+    for name, times in results.items():
+        print(f"{name:<12}{min(times):>8.2f}s{sum(times) / len(times):>8.2f}s{max(times):>8.2f}s")
+
+    seq_avg = sum(results["sequential"]) / args.rounds
+    con_avg = sum(results["concurrent"]) / args.rounds
+    if con_avg > 0:
+        print(f"\n⚡ 동시 수집이 평균 {seq_avg / con_avg:.1f}배 빠름")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+구독자 fan-out 벤치마크 (가짜 텔레그램 서버 사용, 네트워크 없음)
+
+1. 가짜 구독자 N명(기본 10000) 생성
+2. 글마다 받는 사람 찾기: 역색인(subscribers.Registry) vs 전체 구독자 순회 - 결과가 같은지 확인
+3. fixture 공지 글을 fan_out 으로 가짜 텔레그램에 전송하고,
+   받아야 할 채팅방이 빠짐없이/중복 없이 받았는지 확인 (다르면 종료 코드 1)
+
+사용법:
+    python bench/bench_fanout.py [--subscribers 10000] [--posts 8] [--throttle-rate 0.02]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import http_client  # noqa: E402
+import monitor  # noqa: E402
+import notice_rules  # noqa: E402
+import telegram_dispatcher  # noqa: E402
+from fake_telegram import FakeTelegram  # noqa: E402
+from subscribers import Registry  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+
+def load_posts(count, rng):
+    with open(os.path.join(FIXTURE_DIR, "notice.html"), "r", encoding="utf-8") as f:
+        posts = [p for p in monitor.extract_page(f.read()) if not p["excluded"]]
+    return rng.sample(posts, min(count, len(posts)))
+
+
+def synthetic_subscribers(count, vocabulary, categories, rng, blocked_rate):
+    subs = {}
+    blocked = set()
+    for idx in range(count):
+        chat_id = str(100000 + idx)
+        subs[chat_id] = {
+            "categories": rng.sample(categories, rng.randint(0, 2)),
+            "keywords": rng.sample(vocabulary, rng.randint(0, 3)),
+            "all": rng.random() < 0.01
+        }
+        if rng.random() < blocked_rate:
+            blocked.add(chat_id)
+    return subs, blocked
+
+
+def linear_recipients(subs, title, tags):
+    """ 역색인 없이 구독자 전부 확인 """
+    return {
+        chat_id for chat_id, sub in subs.items()
+        if sub["all"] or any(c in tags for c in sub["categories"]) or any(k in title for k in sub["keywords"])
+    }
+
+
+def time_per_post(func, posts, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for post in posts:
+            func(post)
+        samples.append((time.perf_counter() - start) / len(posts))
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구독자 fan-out 벤치마크")
+    parser.add_argument("--subscribers", type=int, default=10000)
+    parser.add_argument("--posts", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=5000, help="초당 전체 전송 수 (실제 텔레그램은 30)")
+    parser.add_argument("--throttle-rate", type=float, default=0.02, help="가짜 서버가 429 로 응답할 비율")
+    parser.add_argument("--fail-rate", type=float, default=0.01, help="가짜 서버가 502 로 응답할 비율")
+    parser.add_argument("--blocked-rate", type=float, default=0.005, help="봇을 차단한 구독자 비율")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    posts = load_posts(args.posts, rng)
+    categories = [rule["category"] for rule in notice_rules.load_rules()["categories"]] + ["기숙사"]
+    vocabulary = sorted({w for p in load_posts(100, rng) for w in p["title"].split() if len(w) >= 2})
+    subs, blocked = synthetic_subscribers(args.subscribers, vocabulary, categories, rng, args.blocked_rate)
+
+    start = time.perf_counter()
+    registry = Registry(subs, channel_id=None)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    def tags(post):
+        return (post["category"],)
+
+    for post in posts:
+        if registry.recipients(post["title"], tags(post)) != linear_recipients(subs, post["title"], tags(post)):
+            print(f"❌ 받는 사람이 다름: {post['title']}")
+            sys.exit(1)
+
+    index_ms = time_per_post(lambda p: registry.recipients(p["title"], tags(p)), posts, args.repeat)
+    linear_ms = time_per_post(lambda p: linear_recipients(subs, p["title"], tags(p)), posts, args.repeat)
+    matched = [len(registry.recipients(p["title"], tags(p))) for p in posts]
+    print(f"구독자 {len(subs)}명 / 글 {len(posts)}개 / 글당 평균 {statistics.mean(matched):.0f}명 매칭")
+    print(f"  색인 생성        {build_ms:>8.1f}ms")
+    print(f"  역색인 (글당)    {index_ms:>8.3f}ms")
+    print(f"  전체 순회 (글당) {linear_ms:>8.3f}ms  ({linear_ms / index_ms:.0f}배)\n")
+
+    # ---- 전송 ----
+    telegram_dispatcher.BACKOFF_BASE = 0.05
+    http_client.configure(pool_maxsize=args.workers)
+    with FakeTelegram(throttle_rate=args.throttle_rate, fail_rate=args.fail_rate, retry_after=0,
+                      blocked=blocked, seed=1) as fake:
+        dispatcher = telegram_dispatcher.Dispatcher(
+            token="bench", api_url=fake.url, workers=args.workers,
+            global_rate=args.rate, chat_rate=args.rate, chat_burst=len(posts) + 1
+        )
+        telegram_dispatcher._dispatcher = dispatcher
+
+        start = time.perf_counter()
+        delivered = telegram_dispatcher.fan_out(
+            posts,
+            lambda p: registry.recipients(p["title"], tags(p)),
+            lambda chat_id, p: monitor.send_telegram(p["title"], p["link"], p["info"], p["emoji"], chat_id),
+            lambda chat_id, chat_posts: monitor.send_digest(chat_posts, chat_id)
+        )
+        elapsed = time.perf_counter() - start
+        dispatcher.close()
+
+        # 받아야 할 메시지 수 (채팅방마다 글 수, threshold 넘으면 요약 1개)
+        expected = {}
+        for post in posts:
+            for chat_id in registry.recipients(post["title"], tags(post)):
+                if chat_id not in blocked:
+                    expected[chat_id] = expected.get(chat_id, 0) + 1
+        expected = {c: (1 if n > telegram_dispatcher.DIGEST_THRESHOLD else n) for c, n in expected.items()}
+        received = {c: len(texts) for c, texts in fake.by_chat().items()}
+        missing = sum(max(0, n - received.get(c, 0)) for c, n in expected.items())
+        duplicate = sum(max(0, n - expected.get(c, 0)) for c, n in received.items())
+
+    total = sum(received.values())
+    print(f"전송: 메시지 {total}개 / {elapsed:.2f}초 ({total / elapsed:.0f}개/초, 워커 {args.workers})")
+    print(f"  가짜 서버: {fake.stats}")
+    print(f"  전송기: {dispatcher.stats}")
+    print(f"  기록할 글: {len(delivered)}/{len(posts)} / 누락 {missing} / 중복 {duplicate}")
+    if missing or duplicate:
+        sys.exit(1)
+    print("✅ 모든 구독자가 빠짐없이, 한 번씩 받음")
+
+
+if __name__ == "__main__":
+    main()
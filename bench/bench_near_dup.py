@@ -0,0 +1,139 @@
+"""
+거의 같은 글 찾기(near_dup.py) 벤치마크 (네트워크 없음)
+
+1. fixture 공지 제목의 단어를 섞어 만든 글 N개(기본 20000)를 공지/기숙사 소스로 나눠 색인
+2. 새 글 Q개(절반은 저장된 글의 말머리/단어를 조금 바꾼 것, 절반은 새로 만든 것)마다
+   LSH 색인으로 찾기 vs 저장된 글 전부와 비교하기 - 시간, 후보 수
+3. 전부 비교해서 찾은 중복을 색인으로도 찾았는지 (재현율이 --min-recall 보다 낮으면 종료 코드 1)
+
+사용법:
+    python bench/bench_near_dup.py [--docs 20000] [--queries 500] [--min-recall 0.95]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import near_dup  # noqa: E402
+import state_store  # noqa: E402
+from bench_archive import fixture_titles  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+PREFIXES = ("", "[필독] ", "[학사] ", "[공지] ", "(재공지) ")
+
+
+def make_title(titles, words, rng):
+    """ fixture 제목 하나에서 단어 1~3개를 다른 단어로 바꿈 """
+    parts = near_dup.PREFIX_PATTERN.sub("", rng.choice(titles)).split()
+    for _ in range(rng.randint(1, 3)):
+        parts[rng.randrange(len(parts))] = rng.choice(words)
+    return " ".join(parts)
+
+
+def variant(title, rng):
+    """ 같은 글을 다른 게시판에 올린 것처럼: 말머리를 바꾸고 가끔 단어 하나를 뺌 """
+    parts = title.split()
+    if len(parts) > 4 and rng.random() < 0.3:
+        del parts[rng.randrange(1, len(parts))]
+    return rng.choice(PREFIXES[1:]) + " ".join(parts)
+
+
+def linear_match(index, source_name, tokens, now):
+    """ 색인 없이 저장된 글 전부와 비교 (best_match 와 같은 조건) """
+    cutoff = now - near_dup.WINDOW_DAYS * 86400
+    best = None
+    for entry in index.entries.values():
+        if entry["source"] == source_name or entry.get("dup") or entry["at"] < cutoff:
+            continue
+        other = near_dup.title_tokens(entry["title"])
+        if near_dup.numbers(tokens) != near_dup.numbers(other):
+            continue
+        score = near_dup.jaccard(tokens, other)
+        if score >= near_dup.TITLE_THRESHOLD and (best is None or score > best[0]):
+            best = (score, entry)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="거의 같은 글 찾기 벤치마크")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    state_store.STATE_DIR = tempfile.mkdtemp(prefix="near-dup-bench-")
+    state_store.PRIVATE_DIR = os.path.join(state_store.STATE_DIR, "private")
+    titles = fixture_titles()
+    words = sorted({w for t in titles for w in near_dup.PREFIX_PATTERN.sub("", t).split() if len(w) >= 2})
+    now = time.time()
+
+    index = near_dup.NearDupIndex()
+    stored = []
+    start = time.perf_counter()
+    for idx in range(args.docs):
+        source = "dorm" if idx % 5 == 0 else "notice"
+        title = make_title(titles, words, rng)
+        sig = near_dup.signature(near_dup.title_tokens(title))
+        if sig is None:
+            continue
+        index.add(source, str(idx), {"title": title}, (), sig, now - rng.random() * 86400)
+        stored.append((source, title))
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    index.save()
+    near_dup.NearDupIndex()
+    reload_ms = (time.perf_counter() - start) * 1000
+
+    queries = []
+    for n in range(args.queries):
+        if n % 2:
+            source, title = rng.choice(stored)
+            queries.append(("notice" if source == "dorm" else "dorm", variant(title, rng)))
+        else:
+            queries.append((rng.choice(("notice", "dorm")), make_title(titles, words, rng)))
+
+    lsh_times, linear_times, candidates = [], [], []
+    found = agreed = extra = 0
+    for source, title in queries:
+        tokens = near_dup.title_tokens(title)
+        sig = near_dup.signature(tokens)
+        if sig is None:
+            continue
+        start = time.perf_counter()
+        lsh = index.best_match(source, tokens, sig, now)
+        lsh_times.append((time.perf_counter() - start) * 1000)
+        candidates.append(len(index.candidates(sig)))
+        start = time.perf_counter()
+        linear = linear_match(index, source, tokens, now)
+        linear_times.append((time.perf_counter() - start) * 1000)
+        if linear:
+            found += 1
+            # 점수가 같은 글이 여러 개면 어느 쪽을 골라도 됨
+            agreed += bool(lsh and lsh[0] == linear[0])
+        elif lsh:
+            extra += 1
+
+    recall = agreed / found if found else 1.0
+    print(f"글 {len(index)}개 색인 {build_ms:.0f}ms / 저장+다시 불러오기 {reload_ms:.0f}ms / 구간 {len(index.buckets)}개")
+    print(f"새 글 {len(lsh_times)}개 확인:")
+    print(f"  LSH 색인:  중앙값 {statistics.median(lsh_times):.3f}ms / p99 {percentile(lsh_times, 0.99):.3f}ms"
+          f" / 후보 평균 {statistics.mean(candidates):.1f}개")
+    print(f"  전부 비교: 중앙값 {statistics.median(linear_times):.3f}ms / p99 {percentile(linear_times, 0.99):.3f}ms"
+          f" / 비교 {len(index)}개")
+    print(f"  중복 {found}건 중 색인으로 찾음 {agreed}건 (재현율 {recall:.1%}), 전부 비교에 없는 결과 {extra}건")
+    if extra or recall < args.min_recall:
+        print(f"❌ 재현율 {recall:.1%} < {args.min_recall:.0%}" if not extra else "❌ 전부 비교와 다른 결과")
+        sys.exit(1)
+    print("✅ 색인 결과가 전부 비교한 결과와 일치 (재현율 기준 이상)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+HTML 파서 백엔드 비교 (저장된 fixture 기준, 네트워크 없음)
+
+- 백엔드별로 추출 결과가 완전히 같은지 확인 (다르면 종료 코드 1)
+- 파싱 시간(중앙값)과 tracemalloc 최대 메모리를 전체 파싱/범위 파싱으로 나눠서 출력
+
+사용법:
+    python bench/bench_parsers.py [--repeat 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import calendar_bot  # noqa: E402
+import html_parser  # noqa: E402
+import monitor  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MENU_DAY = date(2026, 10, 21)  # facility11.html 에 들어있는 주간 중 하루
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def calendar_fragments():
+    names = sorted(n for n in os.listdir(FIXTURE_DIR) if n.startswith("list5_detail_"))
+    return [load_fixture(n) for n in names]
+
+
+NOTICE_HTML = load_fixture("notice.html")
+MENU_HTML = load_fixture("facility11.html")
+CALENDAR_FRAGMENTS = calendar_fragments()
+
+# (이름, 문서, 범위, 추출 함수)
+CASES = [
+    ("notice", NOTICE_HTML, ("div", "board-list-box"),
+     lambda backend: monitor.extract_posts(NOTICE_HTML, backend=backend)),
+    ("menu", MENU_HTML, ("table", "tbl-list"),
+     lambda backend: calendar_bot.parse_cafeteria_menu(MENU_HTML, MENU_DAY, backend=backend)),
+    ("calendar", "".join(CALENDAR_FRAGMENTS), "li",
+     lambda backend: calendar_bot.extract_calendar_items(CALENDAR_FRAGMENTS, backend=backend)),
+]
+
+
+def time_it(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 파서 백엔드 비교")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    backends = html_parser.available_backends()
+    print(f"사용 가능한 백엔드: {', '.join(backends)} (기본: {html_parser.default_backend()})\n")
+
+    mismatch = False
+    print(f"{'case':<10}{'backend':<13}{'parse(full)':>13}{'parse(scope)':>14}{'extract':>11}{'peak(full)':>12}{'peak(scope)':>13}")
+    for name, doc, scope, extract in CASES:
+        reference = extract("html.parser")
+        for backend in backends:
+            result = extract(backend)
+            if result != reference:
+                mismatch = True
+                print(f"❌ {name}: {backend} 결과가 html.parser 와 다름")
+
+            full_t = time_it(lambda: html_parser.parse(doc, backend=backend), args.repeat)
+            scope_t = time_it(lambda: html_parser.parse(doc, scope=scope, backend=backend), args.repeat)
+            extract_t = time_it(lambda: extract(backend), args.repeat)
+            full_m = peak_memory(lambda: html_parser.parse(doc, backend=backend))
+            scope_m = peak_memory(lambda: html_parser.parse(doc, scope=scope, backend=backend))
+            print(f"{name:<10}{backend:<13}{full_t * 1000:>11.2f}ms{scope_t * 1000:>12.2f}ms"
+                  f"{extract_t * 1000:>9.2f}ms{full_m / 1024:>10.0f}KB{scope_m / 1024:>11.0f}KB")
+
+    if "selectolax" in backends:
+        print("\n※ selectolax 는 C 메모리를 쓰기 때문에 tracemalloc 최대 메모리에 거의 잡히지 않음")
+
+    if mismatch:
+        sys.exit(1)
+    print("\n✅ 모든 백엔드의 추출 결과가 동일함")
+
+
+if __name__ == "__main__":
+    main()
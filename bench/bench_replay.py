@@ -0,0 +1,386 @@
+"""
+전체 흐름 재현/부하 테스트 (가짜 학교 사이트 + 가짜 텔레그램, 네트워크 없음)
+
+가짜 사이트(fake_sites.py)를 시나리오대로 바꿔가며 공지/기숙사 소스(sources.run_all)와
+모닝 브리핑(calendar_bot.run)을 쉬지 않고 반복 실행하고, 텔레그램에 도착한 메시지를 대조함.
+
+- 라운드마다 조회수가 오르고: 새 글, 몰아서 올라온 글(요약 메시지), 본문 수정 / 수정일만 바뀐 글,
+  공지와 기숙사에 같이 올라온 글(한 번만 와야 함), 느린 응답, 5xx(전부 실패 / 일부 실패) 를 섞음
+- 알려야 할 새 글과 본문 수정이 빠짐없이 한 번씩 도착했는지, 알리면 안 되는 것(필터 부서, 수정일만 바뀐 글,
+  이미 알린 글)이 오지 않았는지 확인 (다르면 종료 코드 1)
+- 처리량(라운드/초, 요청/초, 메시지/초)과 지연(라운드 실행 시간, 글이 올라온 뒤 알림 도착까지) 출력
+
+사용법:
+    python bench/bench_replay.py [--rounds 40] [--seed 5] [--tg-fail-rate 0.02] [--verbose]
+"""
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+# import 할 때 읽는 설정이라 먼저 지정 (상태/기록은 임시 폴더에)
+WORKDIR = tempfile.mkdtemp(prefix="replay-bench-")
+os.environ.update({
+    "STATE_DIR": os.path.join(WORKDIR, "state"),
+    "PRIVATE_STATE_DIR": os.path.join(WORKDIR, "private"),
+    "METRICS_DIR": os.path.join(WORKDIR, "metrics"),
+    "TELEGRAM_TOKEN": "bench",
+    "TELEGRAM_CHAT_ID": "-100777",
+    "BREAKER_COOLDOWN": "0.5",  # 장애 라운드가 끝나면 바로 다시 시도
+    "HEDGE_AFTER": "0.5",
+    "READ_TIMEOUT": "5",
+    "ARCHIVE_MAX_FETCH": "100",  # 첫 실행에 본문을 전부 보관 (수정 비교 기준)
+    "CALENDAR_TTL_CURRENT_HOURS": "0",  # 브리핑마다 이번 달 일정을 다시 받음
+    "BRIEFING_DEADLINE": "5",
+})
+
+import calendar_bot  # noqa: E402
+import dorm_monitor  # noqa: E402
+import http_client  # noqa: E402
+import monitor  # noqa: E402
+import request_policy  # noqa: E402
+import sources  # noqa: E402
+import telegram_dispatcher  # noqa: E402
+from fake_sites import NOTICE_PAGE_SIZE, FakeSites, default_body  # noqa: E402
+from fake_telegram import FakeTelegram  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+TODAY = date(2026, 10, 20)  # fixture 식단/학사일정 기준 날짜
+DORM_ROWS = int(dorm_monitor.REQUEST_DATA["rows"])
+CHANNEL = os.environ["TELEGRAM_CHAT_ID"]
+EXCLUDED_DEPTS = ("교수지원팀", "국제학생지원팀 국제학생")  # notice_rules.json 부서 필터
+NOTICE_DEPTS = ("학사팀", "장학복지팀", "국제교류팀", "학생복지팀", "대외협력팀")
+NOTICE_CATEGORIES = ("[학사]", "[일반]", "[등록/장학]", "[행사]", "[봉사]")
+TOPICS = ("수강신청 변경 기간", "국가장학금 추가 신청", "학생증 재발급", "동계 계절학기 개설", "진로 특강 참가자 모집",
+          "도서관 운영시간 변경", "교내 봉사단 모집", "세탁실 이용 안내", "택배 보관실 이전", "정기 소방점검")
+
+
+# ------------------------------------------------------
+# 시나리오
+# ------------------------------------------------------
+def build_scenario(rounds, rng):
+    """
+    라운드별 할 일 목록. 0 라운드는 기준점 잡기(알림 없음).
+    장애 구간은 라운드 번호 비율로 고정 → --rounds 를 바꿔도 비슷한 모양
+    """
+    plan = []
+    for r in range(rounds):
+        step = {"notice_new": 0, "dorm_new": 0, "notice_edit": 0, "notice_touch": 0, "dorm_edit": 0,
+                "twin": int(r % 7 == 3), "faults": {}, "briefing": r % 10 == 0}
+        if r:
+            step["notice_new"] = rng.choice((0, 0, 1, 1, 2))
+            step["dorm_new"] = rng.choice((0, 0, 0, 1))
+            step["notice_edit"] = int(rng.random() < 0.2)
+            step["notice_touch"] = int(rng.random() < 0.2)
+            step["dorm_edit"] = int(rng.random() < 0.1)
+        phase = r / rounds
+        if r and r % 8 == 0:
+            step["notice_new"] += 8  # 몰아서 → 요약 메시지
+            step["dorm_new"] += 6
+        if r and r % 25 == 0:
+            step["notice_new"] += 60  # 1페이지를 넘김 → 여러 페이지 이어 읽기 + 요약 길이 제한
+        if 0.2 <= phase < 0.25:
+            step["faults"]["kw.happydorm.or.kr/bbs/getBbsList.do"] = {"fail_rate": 1.0}
+        if 0.4 <= phase < 0.45:
+            step["faults"]["www.kw.ac.kr/ko/life/notice.jsp"] = {"fail_rate": 1.0}
+        if 0.5 <= phase < 0.6:
+            step["faults"]["www.kw.ac.kr/ko/life/notice.jsp"] = {"fail_rate": 0.3}
+            step["faults"]["kw.happydorm.or.kr/bbs/getBbsView.do"] = {"fail_rate": 0.5}
+        if 0.7 <= phase < 0.8:
+            step["faults"]["www.kw.ac.kr/ko/life/notice.jsp"] = {"latency": (0.05, 0.8)}
+            step["faults"]["kw.happydorm.or.kr/bbs/getBbsList.do"] = {"latency": (0.05, 0.3)}
+            step["faults"]["www.kw.ac.kr/KWBoard/list5_detail.jsp"] = {"latency": (0.05, 0.3)}
+        plan.append(step)
+    return plan
+
+
+class Expectations:
+    """ 알려야 하는 것 (종류, 소스, 제목) → 일어난 시각 """
+
+    def __init__(self):
+        self.items = {}
+        self.silent = set()  # 알리면 안 되는 것 (필터 부서 글, 수정일만 바뀐 글)
+        self.either = {}  # 둘 중 하나만 와야 하는 것 (두 소스에 같이 올라온 글) → 짝
+        self.serial = 0
+
+    def title(self, rng, kind):
+        self.serial += 1
+        return f"{rng.choice(TOPICS)} 안내 ({kind}-{self.serial:04d})"
+
+
+def apply_step(sites, step, day, rng, expect, created, delivered):
+    """
+    시나리오 한 라운드를 가짜 사이트에 반영하고, 알려야 할 것을 expect 에 기록.
+    delivered: 지금까지 새 글 알림이 도착한 (소스, 제목) - 수정은 이미 알린 글에만 의미가 있음
+    """
+    now = time.perf_counter()
+    sites.clear_faults()
+    for path, fault in step["faults"].items():
+        sites.set_fault(path, **fault)
+    sites.bump_views(rng)
+
+    for _ in range(step["notice_new"]):
+        excluded = rng.random() < 0.1
+        dept = rng.choice(EXCLUDED_DEPTS if excluded else NOTICE_DEPTS)
+        post = sites.add_notice(expect.title(rng, "공지"), rng.choice(NOTICE_CATEGORIES), dept, day)
+        key = ("new", "notice", f"{post['category']} {post['title']}")
+        if excluded:
+            expect.silent.add(key)
+        else:
+            expect.items[key] = now
+            created["notice"].append(post)
+    for _ in range(step["dorm_new"]):
+        row = sites.add_dorm(expect.title(rng, "기숙사"), day)
+        expect.items[("new", "dorm", row["SUBJECT"])] = now
+        created["dorm"].append(row)
+    for _ in range(step["twin"]):
+        # 같은 안내를 공지(말머리 있음)와 기숙사에 같은 본문으로
+        title = expect.title(rng, "공통")
+        body = default_body(title, expect.serial)
+        post = sites.add_notice(title, "[일반]", rng.choice(NOTICE_DEPTS), day, body=body)
+        row = sites.add_dorm(title, day, body=body)
+        pair = (("new", "notice", f"{post['category']} {post['title']}"), ("new", "dorm", row["SUBJECT"]))
+        for key, partner in (pair, pair[::-1]):
+            expect.items[key] = now
+            expect.either[key] = partner
+        created["notice"].append(post)
+        created["dorm"].append(row)
+
+    # 수정은 이미 알린 글 중 목록 첫 페이지에 보이는 글만 (수정 흔적은 목록에서 봄)
+    # 한 글은 하루에 한 번만 - 수정일이 날짜 단위라서
+    visible = {n["duid"] for n in sites.notices[:NOTICE_PAGE_SIZE]}
+    candidates = [
+        p for p in created["notice"]
+        if p["duid"] in visible and p["modified"] != day.isoformat()
+        and ("notice", f"{p['category']} {p['title']}") in delivered
+    ]
+    for post in rng.sample(candidates, min(len(candidates), step["notice_edit"] + step["notice_touch"])):
+        key = ("edit", "notice", f"{post['category']} {post['title']}")
+        if step["notice_edit"]:
+            step["notice_edit"] -= 1
+            sites.edit_notice(post["duid"], day, post["body"] + f"\n변경: 마감일이 {day.month}/{day.day} 로 연장되었습니다.")
+            print(f"✏️ 수정: {key[2]}")
+            expect.items[(key, day)] = now
+        else:
+            sites.edit_notice(post["duid"], day)
+            expect.silent.add((key, day))
+    top = {row["SEQ"] for row in sites.dorm_rows[:DORM_ROWS]}
+    candidates = [row for row in created["dorm"] if row["SEQ"] in top and ("dorm", row["SUBJECT"]) in delivered]
+    for row in rng.sample(candidates, min(len(candidates), step["dorm_edit"])):
+        body = sites.dorm_bodies[row["SEQ"]] + f"\n첨부파일 추가 ({day.isoformat()})"
+        sites.edit_dorm(row["SEQ"], body)
+        print(f"✏️ 수정: {row['SUBJECT']}")
+        expect.items[(("edit", "dorm", row["SUBJECT"]), day)] = now
+
+
+# ------------------------------------------------------
+# 도착한 메시지 해석
+# ------------------------------------------------------
+TAG_PATTERN = re.compile(r"<[^>]+>")
+HIDDEN_PATTERN = re.compile(r"^… 외 (\d+)건$")
+SOURCE_LABELS = {"공지": "notice", "기숙사 공지": "dorm"}
+
+
+def parse_message(text):
+    """ → (종류, 소스, [제목], 요약에서 생략된 수). 브리핑/알 수 없는 메시지는 종류만 """
+    lines = html.unescape(TAG_PATTERN.sub("", text)).split("\n")
+    first = lines[0]
+    bullets = [line[2:] for line in lines[1:] if line.startswith("• ")]
+    hidden = sum(int(m.group(1)) for m in map(HIDDEN_PATTERN.match, lines) if m)
+    if "모닝 브리핑" in first:
+        return "briefing", None, [], 0
+    if first.startswith("🔥"):
+        return "error", None, [], 0
+    m = re.match(r"^✏️ 수정된 (.+) \d+건$", first)
+    if m:
+        return "edit", SOURCE_LABELS.get(m.group(1)), bullets, hidden
+    m = re.match(r"^✏️ \[(.+) 수정\] (.*)$", first)
+    if m:
+        return "edit", SOURCE_LABELS.get(m.group(1)), [m.group(2)], 0
+    if re.match(r"^🏠 \[행복기숙사\] 새 공지 \d+건$", first):
+        return "new", "dorm", bullets, hidden
+    if first.startswith("🏠 [행복기숙사] "):
+        return "new", "dorm", [first[len("🏠 [행복기숙사] "):]], 0
+    if re.match(r"^📢 새 공지 \d+건$", first):
+        return "new", "notice", bullets, hidden
+    m = re.match(r"^\S+ \*(.*)\*$", first)
+    if m:
+        return "new", "notice", [m.group(1)], 0
+    return "unknown", None, [], 0
+
+
+def fast_paths():
+    """ 실행 기록(metrics runs.jsonl)에서 소스별 (빠른 경로 횟수, 실행 횟수) """
+    counts = {name: [0, 0] for name in ("notice", "dorm")}
+    path = os.path.join(os.environ["METRICS_DIR"], "runs.jsonl")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["job"] in counts:
+                    counts[record["job"]][0] += record["counters"].get("unchanged", 0)
+                    counts[record["job"]][1] += 1
+    return counts
+
+
+def check(received, expect):
+    """ 도착한 메시지 ↔ 알려야 할 것 대조 → (누락, 중복, 알리면 안 되는데 온 것, 지연 목록, 브리핑 수) """
+    pending = {}  # (종류, 소스, 제목) → [일어난 시각...] (같은 글의 수정은 여러 번일 수 있음)
+    for key, at in expect.items.items():
+        base = key[0] if isinstance(key[0], tuple) else key
+        pending.setdefault(base, []).append(at)
+    for times in pending.values():
+        times.sort()
+    silent = {key[0] if isinstance(key[0], tuple) else key for key in expect.silent}
+
+    duplicate, unexpected, latencies, briefings, hidden = [], [], [], 0, {}
+    for at, text in received:
+        kind, source, titles, omitted = parse_message(text)
+        if kind == "briefing":
+            briefings += 1
+            continue
+        if kind in ("error", "unknown"):
+            unexpected.append(text.split("\n")[0])
+            continue
+        if omitted:
+            hidden[(kind, source)] = hidden.get((kind, source), 0) + omitted
+        for title in titles:
+            key = (kind, source, title)
+            if pending.get(key):
+                latencies.append(at - pending[key].pop(0))
+                partner = expect.either.get(key)
+                if pending.get(partner):
+                    pending[partner].pop(0)
+            elif key in silent:
+                unexpected.append(f"{kind}/{source}: {title}")
+            else:
+                duplicate.append(f"{kind}/{source}: {title}")
+
+    # 둘 중 하나만 와야 하는 글이 둘 다 안 왔으면 하나로 셈
+    for key, partner in expect.either.items():
+        if key < partner and pending.get(key) and pending.get(partner):
+            pending[partner].pop(0)
+
+    # 요약 메시지 길이 제한으로 생략된 글은 개수로만 확인
+    missing = []
+    for (kind, source, title), times in pending.items():
+        for _ in times:
+            if hidden.get((kind, source)):
+                hidden[(kind, source)] -= 1
+            else:
+                missing.append(f"{kind}/{source}: {title}")
+    return missing, duplicate, unexpected, latencies, briefings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 흐름 재현/부하 테스트")
+    parser.add_argument("--rounds", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--tg-fail-rate", type=float, default=0.02, help="가짜 텔레그램이 502 로 응답할 비율")
+    parser.add_argument("--tg-throttle-rate", type=float, default=0.02, help="가짜 텔레그램이 429 로 응답할 비율")
+    parser.add_argument("--verbose", action="store_true", help="실행 로그 그대로 출력")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    plan = build_scenario(args.rounds, rng)
+    expect = Expectations()
+    created = {"notice": [], "dorm": []}
+    received = []
+    received_lock = threading.Lock()
+
+    def on_message(chat_id, method, params):
+        if chat_id == CHANNEL:
+            with received_lock:
+                received.append((time.perf_counter(), params.get("text", "")))
+
+    calendar_bot.get_korea_today = lambda: TODAY
+    # 저장소의 예전 기록 파일(data.txt 등)은 가져오지 않음 - 빈 상태에서 시작
+    monitor.NoticeSource.legacy_path = None
+    dorm_monitor.DormSource.legacy_path = None
+    request_policy.BACKOFF_BASE = 0.05
+    telegram_dispatcher.BACKOFF_BASE = 0.05
+    http_client.configure()
+
+    round_times, briefing_times = [], []
+    with FakeSites(FIXTURE_DIR, seed=args.seed) as sites, \
+            FakeTelegram(fail_rate=args.tg_fail_rate, throttle_rate=args.tg_throttle_rate, retry_after=0,
+                         seed=args.seed, on_message=on_message) as telegram:
+        sites.install()
+        telegram_dispatcher._dispatcher = telegram_dispatcher.Dispatcher(
+            api_url=telegram.url, global_rate=1000, chat_rate=1000, chat_burst=100
+        )
+        start = time.perf_counter()
+        for r, step in enumerate(plan):
+            day = TODAY + timedelta(days=r)
+            summary = (f"공지 +{step['notice_new']:<3} 기숙사 +{step['dorm_new']:<2} 공통 +{step['twin']} "
+                       f"수정 {step['notice_edit'] + step['dorm_edit']}")
+            with received_lock:
+                delivered = {
+                    (source, title)
+                    for kind, source, titles, _ in (parse_message(text) for _, text in received) if kind == "new"
+                    for title in titles
+                }
+            apply_step(sites, step, day, rng, expect, created, delivered)
+            log = io.StringIO()
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+                round_start = time.perf_counter()
+                results = sources.run_all()
+                round_times.append(time.perf_counter() - round_start)
+                if step["briefing"]:
+                    briefing_start = time.perf_counter()
+                    calendar_bot.run()
+                    briefing_times.append(time.perf_counter() - briefing_start)
+            failed = [name for name, ok in results.items() if not ok]
+            faults = ", ".join(f"{p.split('/')[-1]} {f}" for p, f in step["faults"].items())
+            print(f"[{r:>3}] {summary} / {round_times[-1] * 1000:>6.0f}ms" + (f" / 실패 {failed}" if failed else "") + (f" / {faults}" if faults else ""))
+
+        # 장애 없이 한 번 더 - 마지막 라운드에 실패한 소스도 따라잡음
+        sites.clear_faults()
+        time.sleep(float(os.environ["BREAKER_COOLDOWN"]))
+        with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+            sources.run_all()
+        elapsed = time.perf_counter() - start
+        telegram_dispatcher.get_dispatcher().close()
+
+    missing, duplicate, unexpected, latencies, briefings = check(received, expect)
+    requests_total = sum(s["requests"] for s in sites.stats.values())
+    print(f"\n라운드 {len(plan)}개 / {elapsed:.1f}초 ({len(plan) / elapsed:.1f}라운드/초)")
+    print(f"  가짜 사이트: 요청 {requests_total}개 ({requests_total / elapsed:.0f}개/초)")
+    for path, entry in sorted(sites.stats.items()):
+        print(f"    {path:<42}{entry['requests']:>6} (실패 {entry['failed']})")
+    print(f"  가짜 텔레그램: 메시지 {len(received)}개 ({len(received) / elapsed:.1f}개/초) / {telegram.stats}")
+    print(f"  라운드 실행 시간: 중앙값 {statistics.median(round_times) * 1000:.0f}ms / p99 {percentile(round_times, 0.99) * 1000:.0f}ms")
+    # 조회수는 매 라운드 바뀌므로, 글이 안 바뀐 라운드에 빠른 경로를 타는지 확인
+    for name, (fast, runs) in fast_paths().items():
+        print(f"  [{name}] 목록 변경 없음(빠른 경로) {fast}/{runs}회")
+    if briefing_times:
+        print(f"  모닝 브리핑: {len(briefing_times)}회 / 중앙값 {statistics.median(briefing_times) * 1000:.0f}ms")
+    if latencies:
+        print(f"  글이 올라온 뒤 알림까지: 중앙값 {statistics.median(latencies) * 1000:.0f}ms / "
+              f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms / 최대 {max(latencies) * 1000:.0f}ms ({len(latencies)}건)")
+    print(f"  누락 {len(missing)} / 중복 {len(duplicate)} / 보내면 안 되는 메시지 {len(unexpected)} / 브리핑 {briefings}/{len(briefing_times)}")
+    for label, items in (("누락", missing), ("중복", duplicate), ("잘못 보냄", unexpected)):
+        for item in items[:10]:
+            print(f"    {label}: {item}")
+    if missing or duplicate or unexpected or briefings != len(briefing_times):
+        sys.exit(1)
+    print("✅ 모든 새 글/수정이 빠짐없이 한 번씩 도착함")
+
+
+if __name__ == "__main__":
+    main()
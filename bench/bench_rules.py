@@ -0,0 +1,138 @@
+"""
+공지 분류 규칙 엔진(notice_rules) vs 예전 if-elif 체인 비교 (네트워크 없음)
+
+- 현재 규칙으로 예전 get_emoji / 부서 필터와 결과가 같은지 확인 (다르면 종료 코드 1)
+- 규칙 수를 늘려가며 글 하나당 분류 시간 비교: 키워드마다 `in` 검사 vs 컴파일된 정규식 한 번
+
+사용법:
+    python bench/bench_rules.py [--repeat 20] [--sizes 10 100 500 1000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parser  # noqa: E402
+import notice_rules  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SYLLABLES = "가나다라마바사아자차카타파하강남동령문별산얼운정진청학사장수업국제"
+
+
+def legacy_get_emoji(title):
+    """ 규칙 엔진 이전의 monitor.get_emoji 그대로 """
+    if "장학" in title or "대출" in title: return "💰"
+    elif "학사" in title or "수업" in title or "복학" in title: return "📅"
+    elif "행사" in title or "축제" in title or "특강" in title: return "🎉"
+    elif "채용" in title or "모집" in title or "인턴" in title: return "👔"
+    elif "국제" in title or "교환" in title: return "✈️"
+    elif "봉사" in title: return "❤️"
+    elif "대회" in title or "공모" in title: return "🏆"
+    else: return "📢"
+
+
+def legacy_excluded(info):
+    return "교수지원팀" in info or "국제학생" in info
+
+
+def naive_classify(rules, title, info):
+    """ 같은 규칙을 키워드마다 `in` 으로 검사 (규칙 수에 비례해서 느려짐) """
+    emoji = rules["default"]["emoji"]
+    for rule in rules["categories"]:
+        if any(k in title for k in rule["keywords"]):
+            emoji = rule["emoji"]
+            break
+    excluded = any(k in info for rule in rules["exclude"] for k in rule["keywords"])
+    return emoji, excluded
+
+
+def fixture_posts():
+    with open(os.path.join(FIXTURE_DIR, "notice.html"), "r", encoding="utf-8") as f:
+        root = html_parser.parse(f.read(), scope=("div", "board-list-box"))
+    posts = []
+    for item in root.select(".board-list-box ul li"):
+        a_tag = item.select_one("div.board-text > a")
+        info_tag = item.select_one("p.info")
+        if a_tag:
+            posts.append((" ".join(a_tag.text().split()), info_tag.text() if info_tag else ""))
+    return posts
+
+
+def random_word(rng, low=2, high=4):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(low, high)))
+
+
+def synthetic_rules(base, size, rng):
+    """ 기존 규칙 뒤에 키워드 size 개짜리 가짜 카테고리/제외 규칙을 덧붙임 """
+    rules = {"default": base["default"], "categories": list(base["categories"]), "exclude": list(base["exclude"])}
+    for idx in range(size // 5):
+        rules["categories"].append({"category": f"c{idx}", "emoji": "🔖", "keywords": [random_word(rng) for _ in range(4)]})
+        rules["exclude"].append({"name": f"e{idx}", "keywords": [random_word(rng, 3, 5)]})
+    return rules
+
+
+def synthetic_posts(count, rng):
+    return [(" ".join(random_word(rng) for _ in range(rng.randint(4, 10))), "|".join(random_word(rng) for _ in range(4)))
+            for _ in range(count)]
+
+
+def per_post_us(func, posts, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for title, info in posts:
+            func(title, info)
+        samples.append((time.perf_counter() - start) / len(posts))
+    return statistics.median(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="공지 분류 규칙 엔진 비교")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 500, 1000], help="추가 키워드 수")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base = notice_rules.load_rules()
+    engine = notice_rules.RuleEngine(base)
+    posts = fixture_posts() + synthetic_posts(500, rng)
+
+    mismatch = 0
+    for title, info in posts:
+        result = engine.classify(title, info)
+        if (result["emoji"], result["excluded"]) != (legacy_get_emoji(title), legacy_excluded(info)):
+            mismatch += 1
+            print(f"❌ 결과 다름: {title!r} / {info!r}")
+    print(f"현재 규칙 {len(posts)}개 글: 예전 체인과 {'동일' if not mismatch else f'{mismatch}건 다름'}\n")
+
+    legacy_us = per_post_us(lambda t, i: (legacy_get_emoji(t), legacy_excluded(i)), posts, args.repeat)
+    engine_us = per_post_us(engine.classify, posts, args.repeat)
+    print(f"{'keywords':>9}{'if-chain':>12}{'naive in':>12}{'compiled':>12}{'compile':>11}")
+    print(f"{'current':>9}{legacy_us:>10.2f}us{'-':>12}{engine_us:>10.2f}us{'-':>11}")
+
+    for size in args.sizes:
+        rules = synthetic_rules(base, size, rng)
+        start = time.perf_counter()
+        big = notice_rules.RuleEngine(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+        naive_us = per_post_us(lambda t, i: naive_classify(rules, t, i), posts, args.repeat)
+        big_us = per_post_us(big.classify, posts, args.repeat)
+
+        for title, info in posts:
+            result = big.classify(title, info)
+            if (result["emoji"], result["excluded"]) != naive_classify(rules, title, info):
+                mismatch += 1
+                print(f"❌ 키워드 {size}개 규칙에서 결과 다름: {title!r}")
+                break
+        print(f"{size:>9}{'-':>12}{naive_us:>10.2f}us{big_us:>10.2f}us{compile_ms:>9.1f}ms")
+
+    if mismatch:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+bench/test_*.py 용 pytest 설정 (네트워크 없음)
+
+벤치 스크립트와 같이 저장소 루트 모듈을 바로 import 하고, 상태 파일은 임시 폴더에 씀.
+
+사용법:
+    python -m pytest -q bench
+"""
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+
+@pytest.fixture(autouse=True)
+def state_dirs(tmp_path, monkeypatch):
+    """ 테스트가 저장소의 state/, private/ 를 건드리지 않게 """
+    import state_store
+    monkeypatch.setattr(state_store, "STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(state_store, "PRIVATE_DIR", str(tmp_path / "private"))
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,315 @@
+"""
+로컬 가짜 학교 사이트 (부하 테스트/재현용, bench_replay.py 에서 사용)
+
+fixtures/ 의 저장된 페이지로 시작해서, 글 추가/수정과 느린 응답/5xx 를 스크립트로 바꿀 수 있음.
+
+    www.kw.ac.kr        /ko/life/notice.jsp (목록 tpage, 글 보기 BoardMode=view&DUID=)
+                        /KWBoard/list5_detail.jsp (학사일정 sy, sm)
+                        /ko/life/facility11.jsp (식단표)
+    kw.happydorm.or.kr  /bbs/getBbsList.do, /bbs/getBbsView.do
+
+install(session) 을 부르면 그 세션에서 위 두 호스트로 가는 요청이 이 서버로 감
+(코드의 URL 은 그대로라서 링크/지문/호스트별 통계가 실제와 같음).
+"""
+import html
+import json
+import random
+import re
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import http_client
+
+KW_HOST = "www.kw.ac.kr"
+DORM_HOST = "kw.happydorm.or.kr"
+NOTICE_PATH = "/ko/life/notice.jsp"
+CALENDAR_PATH = "/KWBoard/list5_detail.jsp"
+MENU_PATH = "/ko/life/facility11.jsp"
+DORM_LIST_PATH = "/bbs/getBbsList.do"
+DORM_VIEW_PATH = "/bbs/getBbsView.do"
+NOTICE_PAGE_SIZE = 50
+
+NOTICE_ITEM = re.compile(
+    r'<li>\s*<div class="board-text">\s*<a href="[^"]*DUID=(\d+)[^"]*">\s*'
+    r'<strong class="category">(.*?)</strong>\s*(.*?)\s*'
+    r'(<span class="ico-new">신규게시글</span>)?\s*(<span class="ico-file">Attachment</span>)?\s*</a>\s*</div>\s*'
+    r'<p class="info">\s*<span>조회 (\d+)</span>\s*<span>작성일</span> <span>(.*?)</span>\s*'
+    r'<span>수정일</span> <span>(.*?)</span>\s*<span>(.*?)</span>\s*</p>\s*</li>',
+    re.S
+)
+
+
+def _read(fixture_dir, name):
+    with open(f"{fixture_dir}/{name}", "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def default_body(title, seed):
+    rng = random.Random(seed)
+    lines = [f"{title} 관련 안내드립니다."]
+    lines += [f"{idx + 1}. 세부 사항 {rng.randint(100, 999)} - 자세한 내용은 담당 부서로 문의 바랍니다." for idx in range(rng.randint(2, 5))]
+    return "\n".join(lines)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakeSites:
+    def __init__(self, fixture_dir, port=0, seed=None):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.faults = {}  # 경로 → {"latency": (최소, 최대), "fail_rate": 비율}
+        self.stats = {}  # 경로 → {"requests", "failed"}
+        self._load(fixture_dir)
+        self.server = _Server(("127.0.0.1", port), self._handler())
+        self.thread = None
+
+    # --------------------------------------------------
+    # 저장된 페이지 → 모델
+    # --------------------------------------------------
+    def _load(self, fixture_dir):
+        page = _read(fixture_dir, "notice.html")
+        first, last = NOTICE_ITEM.search(page), None
+        for last in NOTICE_ITEM.finditer(page):
+            pass
+        self.notice_head = page[:first.start()]
+        self.notice_tail = page[last.end():]
+        self.notices = []  # 최신 글이 앞
+        for duid, category, title, new, file, views, posted, modified, dept in NOTICE_ITEM.findall(page):
+            title = html.unescape(title)
+            self.notices.append({
+                "duid": int(duid), "category": html.unescape(category), "title": title, "is_new": bool(new),
+                "file": bool(file), "views": int(views), "posted": posted, "modified": modified,
+                "dept": html.unescape(dept), "body": default_body(title, duid)
+            })
+
+        listing = json.loads(_read(fixture_dir, "getBbsList.json"))
+        self.dorm_envelope = {k: v for k, v in listing.items() if k != "data"}
+        self.dorm_pinned = listing["data"]["noticeList"]
+        self.dorm_rows = listing["data"]["list"]
+        self.dorm_bodies = {row["SEQ"]: default_body(row["SUBJECT"], row["SEQ"]) for row in self.dorm_pinned + self.dorm_rows}
+
+        self.calendar = {}
+        for y, m in ((2026, 10), (2026, 11), (2026, 12), (2027, 1)):
+            self.calendar[(y, m)] = _read(fixture_dir, f"list5_detail_{y}_{m:02d}.html")
+        self.menu = _read(fixture_dir, "facility11.html")
+
+    # --------------------------------------------------
+    # 시나리오에서 호출 (글 추가/수정, 장애 주입)
+    # --------------------------------------------------
+    def add_notice(self, title, category="[일반]", dept="학사팀", day=None, body=None):
+        with self.lock:
+            duid = max(n["duid"] for n in self.notices) + 1
+            day = (day or date.today()).isoformat()
+            post = {"duid": duid, "category": category, "title": title, "is_new": True, "file": False, "views": 0,
+                    "posted": day, "modified": day, "dept": dept, "body": body or default_body(title, duid)}
+            self.notices.insert(0, post)
+            return post
+
+    def edit_notice(self, duid, day, body=None):
+        """ 수정일을 바꾸고, body 를 주면 본문도 바꿈 (안 주면 수정일만 바뀐 글) """
+        with self.lock:
+            post = next(n for n in self.notices if n["duid"] == duid)
+            post["modified"] = day.isoformat()
+            if body is not None:
+                post["body"] = body
+            return post
+
+    def add_dorm(self, title, day=None, body=None):
+        with self.lock:
+            seq = max(row["SEQ"] for row in self.dorm_pinned + self.dorm_rows) + 1
+            row = {"SEQ": seq, "BBS_ID": "notice", "SUBJECT": title, "REGDATE": (day or date.today()).isoformat(),
+                   "WRITER": "행복기숙사", "HIT": 0, "NOTICE_YN": "N",
+                   "CONTENTS_SUMMARY": "자세한 내용은 첨부파일을 확인하세요.", "FILE_CNT": 0}
+            self.dorm_rows.insert(0, row)
+            self.dorm_bodies[seq] = body or default_body(title, seq)
+            return row
+
+    def bump_views(self, rng):
+        """ 실제 게시판처럼 조회수가 계속 올라감 (변경 감지가 조회수에 속지 않는지 확인용) """
+        with self.lock:
+            for post in self.notices:
+                post["views"] += rng.randint(0, 5)
+            for row in self.dorm_pinned + self.dorm_rows:
+                row["HIT"] += rng.randint(0, 5)
+
+    def edit_dorm(self, seq, body, files_delta=1):
+        """ 기숙사 목록에는 수정일이 없어서 첨부 개수로 수정이 드러남 """
+        with self.lock:
+            row = next(r for r in self.dorm_pinned + self.dorm_rows if r["SEQ"] == seq)
+            row["FILE_CNT"] += files_delta
+            self.dorm_bodies[seq] = body
+            return row
+
+    def set_fault(self, path, latency=None, fail_rate=0.0):
+        """ path: "www.kw.ac.kr/ko/life/notice.jsp" 처럼 호스트 포함. latency: (최소, 최대) 초 """
+        with self.lock:
+            self.faults[path] = {"latency": latency, "fail_rate": fail_rate}
+
+    def clear_faults(self):
+        with self.lock:
+            self.faults = {}
+
+    # --------------------------------------------------
+    # 응답 만들기
+    # --------------------------------------------------
+    def _notice_list(self, page):
+        items = []
+        for n in self.notices[(page - 1) * NOTICE_PAGE_SIZE:page * NOTICE_PAGE_SIZE]:
+            items.append(
+                "<li>\n"
+                "          <div class=\"board-text\">\n"
+                f"            <a href=\"{NOTICE_PATH}?BoardMode=view&amp;DUID={n['duid']}&amp;tpage={page}"
+                "&amp;searchKey=1&amp;searchVal=&amp;srCategoryId=\">\n"
+                f"              <strong class=\"category\">{html.escape(n['category'])}</strong>\n"
+                f"              {html.escape(n['title'])}\n"
+                + ("              <span class=\"ico-new\">신규게시글</span>\n" if n["is_new"] else "")
+                + ("              <span class=\"ico-file\">Attachment</span>\n" if n["file"] else "")
+                + "            </a>\n"
+                "          </div>\n"
+                "          <p class=\"info\">\n"
+                f"            <span>조회 {n['views']}</span>\n"
+                f"            <span>작성일</span> <span>{n['posted']}</span>\n"
+                f"            <span>수정일</span> <span>{n['modified']}</span>\n"
+                f"            <span>{html.escape(n['dept'])}</span>\n"
+                "          </p>\n"
+                "        </li>"
+            )
+        return self.notice_head + "\n        ".join(items) + self.notice_tail
+
+    def _notice_view(self, duid):
+        post = next((n for n in self.notices if n["duid"] == duid), None)
+        if post is None:
+            return 404, "text/html", "<html><body>없는 글</body></html>"
+        paragraphs = "".join(f"<p>{html.escape(line)}</p>" for line in post["body"].splitlines())
+        return 200, "text/html", (
+            f"<html><body><div class=\"board-view-box\"><h3>{html.escape(post['title'])}</h3>"
+            f"<div class=\"contents\">{paragraphs}</div></div></body></html>"
+        )
+
+    def respond(self, host, path, params):
+        """ (HTTP 상태, Content-Type, 본문) """
+        with self.lock:
+            if host == KW_HOST and path == NOTICE_PATH:
+                if params.get("BoardMode") == "view":
+                    return self._notice_view(int(params.get("DUID") or 0))
+                return 200, "text/html", self._notice_list(max(1, int(params.get("tpage") or 1)))
+            if host == KW_HOST and path == CALENDAR_PATH:
+                fragment = self.calendar.get((int(params.get("sy") or 0), int(params.get("sm") or 0)), "")
+                return 200, "text/html", fragment
+            if host == KW_HOST and path == MENU_PATH:
+                return 200, "text/html", self.menu
+            if host == DORM_HOST and path == DORM_LIST_PATH:
+                rows = int(params.get("rows") or 20)
+                data = {"noticeList": self.dorm_pinned, "list": self.dorm_rows[:rows]}
+                return 200, "application/json", json.dumps(dict(self.dorm_envelope, data=data), ensure_ascii=False)
+            if host == DORM_HOST and path == DORM_VIEW_PATH:
+                seq = int(params.get("seq") or 0)
+                body = self.dorm_bodies.get(seq)
+                contents = "".join(f"<p>{html.escape(line)}</p>" for line in (body or "").splitlines())
+                return 200, "application/json", json.dumps({"result": "success", "data": {"SEQ": seq, "CONTENTS": contents}},
+                                                           ensure_ascii=False)
+        return 404, "text/html", "<html><body>Not Found</body></html>"
+
+    def _inject(self, key):
+        """ 장애 주입 - 지연(초), 실패 여부 """
+        with self.lock:
+            entry = self.stats.setdefault(key, {"requests": 0, "failed": 0})
+            entry["requests"] += 1
+            fault = self.faults.get(key)
+            if not fault:
+                return 0.0, False
+            delay = self.rng.uniform(*fault["latency"]) if fault["latency"] else 0.0
+            failed = self.rng.random() < fault["fail_rate"]
+            if failed:
+                entry["failed"] += 1
+            return delay, failed
+
+    # --------------------------------------------------
+    # 서버
+    # --------------------------------------------------
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def install(self, session=None):
+        """ 세션(기본: http_client 공유 세션)에서 학교 사이트 요청을 이 서버로 돌림 """
+        session = session or http_client.get_session()
+        for host in (KW_HOST, DORM_HOST):
+            adapter = _Redirect(self.url, host)
+            session.mount(f"https://{host}/", adapter)
+            session.mount(f"http://{host}/", adapter)
+        return session
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (실제 사이트처럼 연결 재사용)
+
+            def do_GET(self):
+                self._reply({})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8")
+                self._reply({k: v[0] for k, v in parse_qs(body).items()})
+
+            def _reply(self, params):
+                # /<호스트>/<경로>?<쿼리>
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip("/").partition("/")
+                path = "/" + path
+                params = dict({k: v[0] for k, v in parse_qs(parts.query).items()}, **params)
+                delay, failed = fake._inject(host + path)
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    status, content_type, text = 503, "text/html", "<html><body>Service Unavailable</body></html>"
+                else:
+                    status, content_type, text = fake.respond(host, path, params)
+                data = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class _Redirect(http_client.PooledAdapter):
+    """ https://<host>/경로 → <가짜 서버>/<host>/경로 """
+
+    def __init__(self, base_url, host):
+        super().__init__(pool_connections=1, pool_maxsize=http_client.POOL_MAXSIZE)
+        self.prefix = f"{base_url}/{host}"
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.prefix}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
@@ -0,0 +1,189 @@
+"""
+로컬 가짜 텔레그램 Bot API (벤치마크/부하 테스트용)
+
+TELEGRAM_API_URL 을 이 서버 주소로 바꾸면 실제 텔레그램 대신 여기로 전송됨.
+받은 메시지를 채팅방별로 기록하고, 일정 비율로 429/5xx 를 돌려줄 수 있음.
+push_update() 로 넣은 사용자 메시지는 getUpdates(롱 폴링)로 돌려줌 (bot_server.py 테스트용).
+
+사용법:
+    python bench/fake_telegram.py --port 8081 --throttle-rate 0.05
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_TOKEN=test python monitor.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 기본값(5)이면 동시 요청이 많을 때 연결이 끊김
+
+
+class FakeTelegram:
+    def __init__(self, port=0, fail_rate=0.0, throttle_rate=0.0, retry_after=1, latency=0.0, blocked=(), seed=None,
+                 on_message=None):
+        self.fail_rate = fail_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.latency = latency
+        self.blocked = set(str(c) for c in blocked)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.messages = []  # (chat_id, method, params) - 성공으로 응답한 것만
+        self.stats = {"requests": 0, "ok": 0, "throttled": 0, "failed": 0, "blocked": 0}
+        self.on_message = on_message  # on_message(chat_id, method, params) - 성공으로 응답할 때마다
+        self.updates = []  # getUpdates 로 돌려줄 사용자 메시지
+        self.updates_cond = threading.Condition(self.lock)
+        self.server = _Server(("127.0.0.1", port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def by_chat(self):
+        """ 채팅방 → 받은 메시지 본문 목록 """
+        result = {}
+        with self.lock:
+            for chat_id, _, params in self.messages:
+                result.setdefault(chat_id, []).append(params.get("text", ""))
+        return result
+
+    def _respond(self, method, params):
+        """ (HTTP 상태, 응답 JSON) """
+        chat_id = params.get("chat_id")
+        with self.lock:
+            self.stats["requests"] += 1
+            roll = self.rng.random()
+            if chat_id in self.blocked:
+                self.stats["blocked"] += 1
+                return 403, {"ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user"}
+            if roll < self.throttle_rate:
+                self.stats["throttled"] += 1
+                return 429, {"ok": False, "error_code": 429, "description": f"Too Many Requests: retry after {self.retry_after}",
+                             "parameters": {"retry_after": self.retry_after}}
+            if roll < self.throttle_rate + self.fail_rate:
+                self.stats["failed"] += 1
+                return 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"}
+            self.stats["ok"] += 1
+            self.messages.append((chat_id, method, params))
+            message_id = len(self.messages)
+        if self.on_message:
+            self.on_message(chat_id, method, params)
+        return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": chat_id}}}
+
+    def push_update(self, chat_id, text):
+        """ 사용자가 봇에게 메시지를 보낸 것처럼 getUpdates 대기열에 넣음 → update_id """
+        with self.updates_cond:
+            update_id = len(self.updates) + 1
+            self.updates.append({
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": int(chat_id), "type": "private"},
+                    "from": {"id": int(chat_id), "is_bot": False, "first_name": "test"},
+                    "text": text,
+                },
+            })
+            self.updates_cond.notify_all()
+        return update_id
+
+    def _get_updates(self, params):
+        """ offset 이후 메시지. 없으면 timeout 초까지 기다림 (롱 폴링) """
+        offset = int(params.get("offset") or 0)
+        deadline = time.monotonic() + float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        with self.updates_cond:
+            while True:
+                # update_id 는 1부터 차례대로라서 offset-1 이 목록 위치
+                pending = self.updates[max(offset - 1, 0):][:limit]
+                left = deadline - time.monotonic()
+                if pending or left <= 0:
+                    return 200, {"ok": True, "result": pending}
+                self.updates_cond.wait(left)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8")
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    params = json.loads(body or "{}")
+                else:
+                    params = {k: v[0] for k, v in parse_qs(body).items()}
+                if "chat_id" in params:
+                    params["chat_id"] = str(params["chat_id"])
+                self._reply(params)
+
+            def do_GET(self):
+                query = self.path.partition("?")[2]
+                self._reply({k: v[0] for k, v in parse_qs(query).items()})
+
+            def _reply(self, params):
+                # /bot<token>/<method>
+                method = self.path.split("?")[0].rsplit("/", 1)[-1]
+                if method == "getUpdates":
+                    status, payload = fake._get_updates(params)
+                    return self._send(status, payload)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, payload = fake._respond(method, params)
+                self._send(status, payload)
+
+            def _send(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 텔레그램 Bot API")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="502 로 응답할 비율")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 로 응답할 비율")
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    args = parser.parse_args()
+
+    fake = FakeTelegram(args.port, args.fail_rate, args.throttle_rate, latency=args.latency).start()
+    print(f"🤖 가짜 텔레그램 API: {fake.url} (Ctrl+C 로 종료)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   {fake.stats}")
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
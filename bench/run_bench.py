@@ -0,0 +1,212 @@
+"""
+추출 로직 마이크로 벤치마크 (저장된 fixture 기준, 네트워크 없음)
+
+각 추출 함수의 실행 시간과 메모리 할당(tracemalloc)을 재고, 커밋끼리 비교할 수 있게 JSON 으로 저장.
+
+사용법:
+    python bench/run_bench.py                         # bench/results/<커밋>.json 저장
+    python bench/run_bench.py --only notice --repeat 200
+    python bench/run_bench.py --compare bench/results/old.json bench/results/new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import calendar_bot  # noqa: E402
+import dorm_monitor  # noqa: E402
+import html_parser  # noqa: E402
+import monitor  # noqa: E402
+
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+RESULT_DIR = os.path.join(BENCH_DIR, "results")
+
+# fixture 들이 저장된 시점 기준의 "오늘"
+FIXTURE_TODAY = date(2026, 10, 21)
+
+REGRESSION_THRESHOLD = 0.10  # 10% 넘게 느려지면 표시
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def build_cases():
+    """ 이름 → 인자 없이 호출 가능한 함수 """
+    notice_html = load_fixture("notice.html")
+    menu_html = load_fixture("facility11.html")
+    dorm_json_text = load_fixture("getBbsList.json")
+    dorm_json = json.loads(dorm_json_text)
+    _, dorm_schema = dorm_monitor.walk_posts(dorm_json)
+    fragments = [load_fixture(n) for n in sorted(os.listdir(FIXTURE_DIR)) if n.startswith("list5_detail_")]
+
+    root = html_parser.parse(notice_html, scope=("div", "board-list-box"))
+    info_texts = [tag.text("|", strip=True) for tag in root.select("p.info")]
+    month_fragments = [(int(n[13:17]), int(n[18:20]), load_fixture(n))
+                       for n in sorted(os.listdir(FIXTURE_DIR)) if n.startswith("list5_detail_")]
+    month_items = [(y, m, calendar_bot.extract_calendar_items([f])) for y, m, f in month_fragments]
+    # 연도 보정(11~2월) 분기를 타는 조각
+    year_edge_items = [(y, m, items) for y, m, items in month_items if m >= 11 or m <= 2]
+    cached_events = [e for y, m, f in month_fragments for e in calendar_bot.parse_month_events(f, y, m)]
+    months = [(y, m) for y, m, _ in month_fragments]
+    fetched = {(y, m): f for y, m, f in month_fragments}
+
+    def find_all_dorm_posts():
+        found = []
+        dorm_monitor.find_posts_recursively(dorm_json, found)
+        return found
+
+    def resolve_dates(items_by_month):
+        return [calendar_bot.resolve_month_dates(d, y, m) for y, m, items in items_by_month for d, _ in items]
+
+    # 브리핑(run)과 같은 경로: 받은 조각을 캐시에 반영하고 합쳐서 메시지 생성
+    calendar_cache = calendar_bot.CalendarCache()
+
+    def build_message(cold):
+        if cold:
+            calendar_cache.months = {}  # 매번 전부 다시 파싱
+        events, _ = calendar_bot.collect_month_events(calendar_cache, months, fetched, FIXTURE_TODAY)
+        return calendar_bot.build_calendar_message(events, FIXTURE_TODAY)
+
+    menu_cache = calendar_bot.MenuCache()
+    menu_cache.update(menu_html)  # 메모리에서만 갱신 (save 안 함)
+
+    return {
+        "notice.extract_posts": lambda: monitor.extract_posts(notice_html),
+        "notice.parse_info_meta": lambda: [monitor.parse_info_meta(t) for t in info_texts],
+        "dorm.json_decode": lambda: json.loads(dorm_json_text),
+        "dorm.find_posts_recursively": find_all_dorm_posts,
+        "dorm.extract_posts": lambda: dorm_monitor.extract_posts(dorm_json),
+        "dorm.walk_posts": lambda: dorm_monitor.walk_posts(dorm_json),
+        "dorm.extract_with_schema": lambda: dorm_monitor.extract_with_schema(dorm_json, dorm_schema),
+        "dorm.extract_posts_schema": lambda: dorm_monitor.extract_posts(dorm_json, dorm_schema),
+        "calendar.extract_items": lambda: calendar_bot.extract_calendar_items(fragments),
+        "calendar.resolve_dates": lambda: resolve_dates(month_items),
+        "calendar.resolve_dates_year_edge": lambda: resolve_dates(year_edge_items),
+        "calendar.build_message": lambda: build_message(cold=True),
+        "calendar.build_message_unchanged": lambda: build_message(cold=False),
+        "calendar.parse_months": lambda: [calendar_bot.parse_month_events(f, y, m) for y, m, f in month_fragments],
+        "calendar.build_message_cached": lambda: calendar_bot.build_calendar_message(cached_events, FIXTURE_TODAY),
+        "menu.parse": lambda: calendar_bot.parse_cafeteria_menu(menu_html, FIXTURE_TODAY),
+        "menu.parse_week": lambda: calendar_bot.parse_weekly_menu(menu_html),
+        "menu.lookup_cached": lambda: calendar_bot.format_menu(menu_cache.menu(FIXTURE_TODAY)),
+    }
+
+
+def measure(func, repeat, warmup=3):
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    # 할당 추적은 시간 측정과 따로 (tracemalloc 이 켜져 있으면 느려짐)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    allocated_blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    del result
+
+    return {
+        "repeat": repeat,
+        "min_us": min(samples) * 1e6,
+        "median_us": statistics.median(samples) * 1e6,
+        "mean_us": statistics.mean(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "peak_bytes": peak,
+        "retained_blocks": allocated_blocks,
+    }
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    cases = build_cases()
+    if args.only:
+        cases = {k: v for k, v in cases.items() if any(o in k for o in args.only)}
+
+    results = {}
+    print(f"{'case':<34}{'median':>11}{'min':>11}{'peak':>10}{'blocks':>8}")
+    for name, func in cases.items():
+        r = measure(func, args.repeat)
+        results[name] = r
+        print(f"{name:<34}{r['median_us']:>9.1f}us{r['min_us']:>9.1f}us{r['peak_bytes'] / 1024:>8.1f}KB{r['retained_blocks']:>8}")
+
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "html_parser": html_parser.default_backend(),
+        "results": results,
+    }
+
+    output = args.output or os.path.join(RESULT_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=1)
+    print(f"\n💾 결과 저장: {output}")
+
+
+def compare(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    print(f"기준 {base['commit']} → 비교 {new['commit']}\n")
+    print(f"{'case':<34}{'base':>11}{'new':>11}{'change':>9}{'peak':>9}")
+    regressions = 0
+    for name, n in new["results"].items():
+        b = base["results"].get(name)
+        if not b:
+            print(f"{name:<34}{'-':>11}{n['median_us']:>9.1f}us{'new':>9}")
+            continue
+        change = n["median_us"] / b["median_us"] - 1 if b["median_us"] else 0.0
+        peak_change = n["peak_bytes"] / b["peak_bytes"] - 1 if b["peak_bytes"] else 0.0
+        mark = " ⚠️" if change > REGRESSION_THRESHOLD else ""
+        regressions += bool(mark)
+        print(f"{name:<34}{b['median_us']:>9.1f}us{n['median_us']:>9.1f}us{change:>+8.1%}{peak_change:>+8.1%}{mark}")
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추출 로직 마이크로 벤치마크")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--only", nargs="*", help="이름에 이 문자열이 들어간 케이스만 실행")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: bench/results/<커밋>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 JSON 비교")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare))
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+명령어 봇: 보관함을 압축(파일을 새로 씀)해도 검색이 예전 보관함으로 계속 되고, 다시 읽은 것을 바꿔 끼우는지
+"""
+import os
+import shutil
+
+import archive
+import bot_server
+
+
+def add_docs(store, titles, start=0):
+    for idx, title in enumerate(titles, start):
+        store.add("notice", str(idx), {"title": title, "link": f"https://example.com/{idx}", "date": "2026-10-20"},
+                  f"{title} 본문")
+    store.save()
+
+
+def test_compacted_archive_is_swapped_in():
+    writer = archive.Archive()
+    add_docs(writer, ["장학금 신청 안내", "기숙사 점검 안내"])
+    snapshot = bot_server.Snapshot()
+    loaded = snapshot.archive
+    assert [r["title"] for r in snapshot.search("장학금")] == ["장학금 신청 안내"]
+
+    # 덧붙은 줄만 있으면 같은 보관함에 반영
+    add_docs(writer, ["수강신청 일정"], start=2)
+    assert snapshot.refresh() == 1
+    assert snapshot.archive is loaded
+
+    # 다른 프로세스가 압축한 것처럼 새 파일로 바꿈 → 따로 읽어서 바꿔 끼움
+    shutil.copyfile(loaded.path, loaded.path + ".tmp")
+    os.replace(loaded.path + ".tmp", loaded.path)
+    assert snapshot.refresh() == 3
+    assert snapshot.archive is not loaded
+    assert snapshot.search("수강신청")[0]["title"] == "수강신청 일정"
+
+
+def test_only_search_runs_off_the_event_loop():
+    assert bot_server.is_search("/search 장학금")
+    assert bot_server.is_search("/search@kw_bot 장학금")
+    assert not bot_server.is_search("/menu 내일")
+    assert not bot_server.is_search("장학금")
+    assert not bot_server.is_search(None)
@@ -0,0 +1,30 @@
+"""
+학사일정 날짜: 해를 넘는 일정의 연도를 요청한 (연, 월) 기준으로 정하는지 (오늘 날짜와 무관)
+"""
+from datetime import date
+
+import calendar_bot
+
+
+def test_december_fragment_with_january_event():
+    assert calendar_bot.resolve_month_dates("01.05(화)", 2026, 12) == (date(2027, 1, 5), date(2027, 1, 5))
+
+
+def test_january_fragment_with_december_event():
+    assert calendar_bot.resolve_month_dates("12.28(월)", 2027, 1) == (date(2026, 12, 28), date(2026, 12, 28))
+
+
+def test_range_crossing_new_year():
+    expected = (date(2026, 12, 28), date(2027, 1, 8))
+    assert calendar_bot.resolve_month_dates("12.28(월) ~ 01.08(금)", 2026, 12) == expected
+    assert calendar_bot.resolve_month_dates("12.28(월) ~ 01.08(금)", 2027, 1) == expected
+
+
+def test_plain_dates_and_garbage():
+    assert calendar_bot.resolve_month_dates("10.19(월) ~ 10.23(금)", 2026, 10) == (date(2026, 10, 19), date(2026, 10, 23))
+    assert calendar_bot.resolve_month_dates("02.30", 2026, 2) is None
+    assert calendar_bot.resolve_month_dates("미정", 2026, 10) is None
+
+
+def test_months_to_fetch_roll_over_the_year():
+    assert calendar_bot.get_target_months(date(2026, 11, 30)) == [(2026, 11), (2026, 12), (2027, 1)]
@@ -0,0 +1,67 @@
+"""
+변경 감지 해시에 쓰는 영역: 조회수만 바뀌면 그대로, 글이 바뀌면 달라지는지
+"""
+import json
+import os
+import re
+
+import dorm_monitor
+import monitor
+import state_store
+from change_detect import ChangeDetector
+from conftest import load_fixture
+
+
+def test_notice_view_counts_do_not_change_region():
+    page = load_fixture("notice.html")
+    bumped = re.sub(r"조회 (\d+)", lambda m: f"조회 {int(m.group(1)) + 7}", page)
+    assert bumped != page
+    assert monitor.notice_region(bumped) == monitor.notice_region(page)
+
+    renamed = page.replace("여름 인턴십 참가자 모집 (3차)", "여름 인턴십 참가자 모집 (4차)", 1)
+    assert renamed != page
+    assert monitor.notice_region(renamed) != monitor.notice_region(page)
+
+
+def test_dorm_view_counts_do_not_change_region():
+    result = json.loads(load_fixture("getBbsList.json"))
+    text = json.dumps(result, ensure_ascii=False)
+    for row in result["data"]["noticeList"] + result["data"]["list"]:
+        row["HIT"] += 7
+    bumped = json.dumps(result, ensure_ascii=False)
+    assert bumped != text
+    assert dorm_monitor.stable_region(bumped) == dorm_monitor.stable_region(text)
+
+    result["data"]["list"][0]["FILE_CNT"] += 1
+    edited = json.dumps(result, ensure_ascii=False)
+    assert dorm_monitor.stable_region(edited) != dorm_monitor.stable_region(text)
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, headers=None):
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_unchanged_run_does_not_write_state():
+    detector = ChangeDetector("notice")
+    assert not detector.is_unchanged(FakeResponse("목록 1"))
+    detector.commit()
+    path = state_store.state_path("change_notice.json")
+    saved = state_store.load_json("change_notice.json", {})
+    assert set(saved) == {"etag", "last_modified", "hash"}
+
+    # 목록이 그대로인 실행 → 파일을 다시 쓰지 않음 (state/ 에 커밋할 변경이 안 생김)
+    os.utime(path, ns=(0, 0))
+    again = ChangeDetector("notice")
+    assert again.is_unchanged(FakeResponse("목록 1"))
+    again.commit()
+    assert os.stat(path).st_mtime_ns == 0
+
+    # 바뀐 목록을 다 처리하면 기준만 새로 저장
+    changed = ChangeDetector("notice")
+    assert not changed.is_unchanged(FakeResponse("목록 2"))
+    changed.commit()
+    assert state_store.load_json("change_notice.json", {})["hash"] != saved["hash"]
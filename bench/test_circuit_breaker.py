@@ -0,0 +1,56 @@
+"""
+호스트 차단기: 연속 실패하면 열리고, cooldown 뒤 한 번 시도해서 성공하면 닫히고 실패하면 다시 열리는지
+"""
+import time
+
+import state_store
+from request_policy import BREAKER_FILE, CircuitBreaker
+
+HOST = "www.example.ac.kr"
+
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=600)
+    breaker.record_failure(HOST, "timeout")
+    breaker.record_failure(HOST, "timeout")
+    assert breaker.allow(HOST)
+    breaker.record_failure(HOST, "HTTP 503")
+    assert not breaker.allow(HOST)
+    assert 590 < breaker.retry_in(HOST) <= 600
+    assert breaker.allow("other.example.com")
+
+    # 다음 실행에서도 열린 채로 시작
+    saved = state_store.load_json(BREAKER_FILE, {})
+    assert saved[HOST]["failures"] == 3
+    assert not CircuitBreaker(threshold=3, cooldown=600).allow(HOST)
+
+
+def test_half_open_success_closes():
+    breaker = CircuitBreaker(threshold=2, cooldown=600)
+    for _ in range(2):
+        breaker.record_failure(HOST, "timeout")
+    later = time.time() + 601
+    assert breaker.allow(HOST, now=later)  # cooldown 후 한 번 시도
+    breaker.record_success(HOST)
+    assert breaker.allow(HOST)
+    assert breaker.hosts[HOST]["failures"] == 0
+
+    # 닫힌 뒤에는 다시 threshold 번 실패해야 열림
+    breaker.record_failure(HOST, "timeout")
+    assert breaker.allow(HOST)
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(threshold=2, cooldown=600)
+    for _ in range(2):
+        breaker.record_failure(HOST, "timeout")
+    assert breaker.allow(HOST, now=time.time() + 601)
+    breaker.record_failure(HOST, "timeout")
+    assert not breaker.allow(HOST)  # cooldown 을 처음부터 다시
+    assert breaker.allow(HOST, now=time.time() + 601)
+
+
+def test_success_without_failures_does_not_write_state():
+    breaker = CircuitBreaker(threshold=2, cooldown=600)
+    breaker.record_success(HOST)
+    assert state_store.load_json(BREAKER_FILE, None) is None
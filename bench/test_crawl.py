@@ -0,0 +1,109 @@
+"""
+공지 밀린 글 읽기(monitor.crawl): 멈춤 조건, 2페이지 이후 받기 실패, 다음 실행에서 이어 읽기
+"""
+import pytest
+
+import monitor
+import state_store
+from change_detect import ChangeDetector
+from conftest import FIXTURE_DIR
+from fake_sites import FakeSites
+
+
+@pytest.fixture
+def sites(monkeypatch):
+    """ 저장된 목록(50개) 앞에 새 글 60개 → 1페이지는 전부 새 글, 2페이지 중간부터 아는 글 """
+    sites = FakeSites(FIXTURE_DIR, seed=1)
+    sites.server.server_close()
+    known = {str(n["duid"]) for n in sites.notices}
+    for idx in range(60):
+        sites.add_notice(f"밀린 공지 {idx}")
+    sites.known = known
+    sites.requested = []
+    sites.failing = set()
+
+    def fetch_page(page):
+        sites.requested.append(page)
+        if page in sites.failing:
+            raise ConnectionError(f"{page}페이지 연결 실패")
+        return sites._notice_list(page)
+
+    monkeypatch.setattr(monitor, "fetch_page", fetch_page)
+    return sites
+
+
+def ids(posts):
+    return {p["id"] for p in posts}
+
+
+def test_stops_at_first_page_whose_last_post_is_known(sites):
+    posts, pages_read, complete = monitor.crawl(sites._notice_list(1), sites.known, max_pages=5, depth=1)
+    assert (pages_read, complete) == (2, True)
+    assert sites.requested == [2]
+    new = ids(posts) - sites.known
+    assert len(new) == 60
+
+
+def test_first_run_reads_only_the_first_page(sites):
+    posts, pages_read, complete = monitor.crawl(sites._notice_list(1), set())
+    assert (pages_read, complete) == (1, True)
+    assert sites.requested == []
+    assert len(posts) == 50
+
+
+def test_max_pages_caps_the_crawl(sites):
+    _, pages_read, complete = monitor.crawl(sites._notice_list(1), sites.known, max_pages=1)
+    assert (pages_read, complete) == (1, True)
+    assert sites.requested == []
+
+
+def test_failed_catch_up_page_keeps_first_page_posts(sites):
+    sites.failing = {2}
+    posts, pages_read, complete = monitor.crawl(sites._notice_list(1), sites.known, max_pages=5, depth=2)
+    assert (pages_read, complete) == (1, False)
+    assert len(ids(posts) - sites.known) == 50
+
+
+def test_next_run_resumes_past_pages_already_seen(sites):
+    first_page = sites._notice_list(1)
+    # 지난 실행: 1페이지만 읽고 끊김 → 1페이지 글은 "본 글"
+    seen = sites.known | ids(monitor.extract_page(first_page))
+    _, pages_read, _ = monitor.crawl(first_page, seen, max_pages=5, depth=1)
+    assert pages_read == 1  # 이어 읽기 표시가 없으면 2페이지의 밀린 글 10개를 영영 못 봄
+
+    posts, pages_read, complete = monitor.crawl(first_page, seen, max_pages=5, depth=1, resume=1)
+    assert (pages_read, complete) == (2, True)
+    assert len(ids(posts) - seen) == 10
+
+
+def test_notice_source_records_and_clears_catch_up(sites):
+    class Response:
+        text = sites._notice_list(1)
+
+    source = monitor.NoticeSource()
+    sites.failing = {2}
+    source.extract(Response, sites.known)
+    assert state_store.load_json(monitor.CATCHUP_FILE, 0) == 1
+
+    sites.failing = set()
+    seen = sites.known | ids(monitor.extract_page(Response.text))
+    posts = source.extract(Response, seen)
+    assert len(ids(posts) - seen) == 10
+    assert state_store.load_json(monitor.CATCHUP_FILE, 0) == 0
+
+
+def test_unchanged_list_is_read_again_while_catching_up(sites):
+    class Response:
+        status_code = 200
+        headers = {}
+        text = sites._notice_list(1)
+        content = text.encode("utf-8")
+
+    detector = ChangeDetector("notice")
+    source = monitor.NoticeSource()
+    assert not source.is_unchanged(Response, detector)
+    detector.commit()
+    assert source.is_unchanged(Response, detector)
+
+    state_store.save_json(monitor.CATCHUP_FILE, 1)
+    assert not source.is_unchanged(Response, detector)
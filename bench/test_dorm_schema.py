@@ -0,0 +1,47 @@
+"""
+기숙사 스키마: 배울 때 비어 있던 리스트, 예전 형식(수정일/첨부 필드 없음)으로 저장된 스키마
+"""
+import copy
+import json
+
+import dorm_monitor
+from conftest import load_fixture
+
+
+def fixture_json():
+    return json.loads(load_fixture("getBbsList.json"))
+
+
+def test_list_empty_when_learned_is_still_read():
+    result = fixture_json()
+    pinned = result["data"]["noticeList"]
+    result["data"]["noticeList"] = []
+    _, schema = dorm_monitor.walk_posts(result)
+    assert ["list", ["data", "noticeList"]] in schema["paths"]
+
+    # 나중에 고정 공지가 올라옴 → 저장된 스키마 그대로 읽어도 빠지지 않음
+    later = copy.deepcopy(result)
+    later["data"]["noticeList"] = [dict(pinned[0], SEQ=99999, SUBJECT="긴급 단수 안내")]
+    posts, _, learned = dorm_monitor.extract_posts(later, schema)
+    assert learned is None
+    assert posts[0]["id"] == "99999"
+    assert posts[0]["title"] == "긴급 단수 안내"
+
+
+def test_old_schema_is_relearned_with_edit_fields():
+    result = fixture_json()
+    old_schema = {
+        "paths": [["list", ["data", "noticeList"]], ["list", ["data", "list"]]],
+        "fields": {"seq": "SEQ", "subject": "SUBJECT", "date": "REGDATE"},
+    }
+    assert not dorm_monitor.schema_is_current(old_schema)
+
+    posts, _, learned = dorm_monitor.extract_posts(result, old_schema)
+    assert dorm_monitor.schema_is_current(learned)
+    assert learned["fields"]["files"] == "FILE_CNT"
+    assert all(post["files"] is not None for post in posts)
+
+    # 다시 배운 스키마로는 전체 탐색 없이 같은 글을 읽음
+    again, _, relearned = dorm_monitor.extract_posts(result, learned)
+    assert relearned is None
+    assert [p["id"] for p in again] == [p["id"] for p in posts]
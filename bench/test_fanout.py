@@ -0,0 +1,59 @@
+"""
+일부 채팅방만 실패한 글을 다음 실행에서 다시 보낼 때, 이미 받은 채팅방에는 다시 가지 않는지
+"""
+from concurrent.futures import Future
+
+import telegram_dispatcher
+
+
+def done(result):
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class FakeSender:
+    """ 채팅방별 응답을 정해두고 보낸 기록을 남김 """
+
+    def __init__(self, statuses=None):
+        self.statuses = statuses or {}
+        self.calls = []
+
+    def send_one(self, chat_id, post):
+        self.calls.append((chat_id, post["id"]))
+        status = self.statuses.get(chat_id)
+        return done({"ok": status is None, "status": status})
+
+    def send_digest(self, chat_id, posts):
+        raise AssertionError("요약으로 보내면 안 됨")
+
+
+def fan_out(sender, posts, sent):
+    return telegram_dispatcher.fan_out(
+        posts, lambda post: ["A", "B", "C"], sender.send_one, sender.send_digest,
+        threshold=5, key=lambda post: post["id"], sent=sent,
+    )
+
+
+def test_partial_failure_retries_only_failed_chat():
+    post = {"id": "1", "title": "장학금 신청 안내"}
+    sent = {}
+
+    first = FakeSender({"B": 502})
+    assert fan_out(first, [post], sent) == []  # B 가 못 받았으므로 끝나지 않은 글
+    assert sent == {"1": {"A", "C"}}
+
+    retry = FakeSender()
+    assert fan_out(retry, [post], sent) == [post]
+    assert retry.calls == [("B", "1")]
+    assert sent == {"1": {"A", "B", "C"}}
+
+
+def test_permanent_failure_is_not_retried():
+    post = {"id": "2", "title": "기숙사 점검"}
+    sent = {}
+
+    # 403(봇 차단)은 다시 보내도 똑같이 실패하므로 끝난 것으로 침
+    sender = FakeSender({"B": 403})
+    assert fan_out(sender, [post], sent) == [post]
+    assert sent == {"2": {"A", "B", "C"}}
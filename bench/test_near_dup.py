@@ -0,0 +1,55 @@
+"""
+거의 같은 글: 본문 비교가 필요한 후보는 본문을 동시에 받고, 받은 본문을 보관함에서 다시 받지 않는지
+"""
+import threading
+
+import archive
+import near_dup
+import sources
+
+
+class FakeSource(sources.Source):
+    """ 본문 받은 횟수를 셈. 두 글을 동시에 받지 않으면 barrier 에서 막혀 실패 """
+
+    def __init__(self, name, bodies, barrier=None):
+        self.name = name
+        self.bodies = bodies
+        self.barrier = barrier
+        self.fetched = []
+
+    def fetch_body(self, post):
+        if self.barrier:
+            self.barrier.wait(timeout=5)
+        self.fetched.append(post["id"])
+        return self.bodies[post["id"]]
+
+
+def post(post_id, title):
+    return {"id": post_id, "title": title, "link": f"https://example.com/{post_id}", "date": "2026-10-20"}
+
+
+def test_candidate_bodies_are_fetched_once_in_parallel(monkeypatch):
+    monkeypatch.setattr(archive, "_archive", None)
+    monkeypatch.setattr(near_dup, "_dup_index", None)
+    monkeypatch.setattr(archive, "ARCHIVE_ENABLED", True)
+
+    originals = [post("d1", "2학기 기숙사 입사 신청 안내"), post("d2", "동계 방학 중 기숙사 잔류 신청 안내")]
+    dorm = FakeSource("dorm", {"d1": "입사 신청 기간은 8월 1일부터 5일까지 포털에서 신청",
+                               "d2": "잔류 신청은 12월 10일까지 생활관 홈페이지에서"})
+    assert near_dup.find_twins(dorm, originals, now=1000) == {}
+    archive.update(dorm, originals)
+
+    copies = [post("n1", "[학생] 2학기 기숙사 입사 신청 안내"), post("n2", "(필독) 동계 방학 중 기숙사 잔류 신청 안내")]
+    notice = FakeSource("notice", {"n1": "입사 신청 기간은 8월 1일부터 5일까지 포털에서 신청",
+                                   "n2": "잔류 신청은 12월 10일까지 생활관 홈페이지에서"},
+                        barrier=threading.Barrier(2))
+    bodies = {}
+    twins = near_dup.find_twins(notice, copies, now=2000, bodies=bodies)
+    assert {key: twin["id"] for key, twin in twins.items()} == {"n1": "d1", "n2": "d2"}
+    assert set(bodies) == {"n1", "n2"}
+
+    # 보관할 때는 확인하느라 받은 본문을 그대로 씀
+    notice.barrier = None
+    assert archive.update(notice, copies, bodies=bodies) == 2
+    assert sorted(notice.fetched) == ["n1", "n2"]
+    assert archive.get_archive().docs[archive.doc_key("notice", "n1")]["body"] == bodies["n1"]
@@ -0,0 +1,30 @@
+"""
+텔레그램 전송 실패가 실행 기록(runs.jsonl, Actions 아티팩트)에 봇 토큰을 남기지 않는지
+"""
+import json
+
+import metrics
+import telegram_dispatcher
+
+TOKEN = "123456:SECRETTOKEN"
+
+
+def test_network_error_is_redacted(monkeypatch):
+    monkeypatch.setattr(telegram_dispatcher, "MAX_ATTEMPTS", 1)
+    # 닫힌 포트 → requests 예외 메시지에 /bot<토큰>/sendMessage 가 들어감
+    dispatcher = telegram_dispatcher.Dispatcher(token=TOKEN, api_url="http://127.0.0.1:9")
+    try:
+        result = dispatcher.submit(1, "안녕").result()
+    finally:
+        dispatcher.close()
+    assert not result["ok"]
+    assert result["error"].startswith("ConnectionError")
+    assert TOKEN not in result["error"]
+
+
+def test_run_record_is_redacted():
+    run = metrics.Run("briefing")
+    run.fail(OSError(f"Max retries exceeded with url: /bot{TOKEN}/sendMessage"))
+    assert run.status == "error"
+    assert TOKEN not in json.dumps(run.to_dict())
+    assert "/bot***/sendMessage" in run.error
@@ -0,0 +1,52 @@
+"""
+이미 본 글 기록: 기간이 지난 ID 와 개수 초과분(가장 오래 안 보인 것부터)을 지우는지, 예전 ID 를 새 ID 로 바꾸는지
+"""
+from state_store import SeenStore
+
+DAY = 86400
+
+
+def test_old_ids_are_evicted():
+    seen = SeenStore("notice", max_age_days=30)
+    seen.add("old", now=1000)
+    seen.add("recent", now=1000 + 20 * DAY)
+    assert seen.evict(now=1000 + 40 * DAY) == 1
+    assert "old" not in seen
+    assert "recent" in seen
+
+
+def test_over_limit_drops_least_recently_seen():
+    seen = SeenStore("notice", max_items=2)
+    seen.add("a", now=100)
+    seen.add("b", now=200)
+    seen.add("c", now=300)
+    seen.add("a", now=400)  # 목록에 다시 보임 → 가장 최근
+    assert seen.evict(now=500) == 1
+    assert list(seen) == ["c", "a"]
+
+
+def test_saved_ids_survive_reload():
+    seen = SeenStore("notice")
+    seen.add("1")
+    seen.add("2")
+    assert seen.save() == 0
+
+    again = SeenStore("notice")
+    assert list(again) == ["1", "2"]
+    assert again.add("3")
+    assert not again.add("2")
+
+
+def test_rename_merges_to_latest():
+    seen = SeenStore("notice", max_age_days=1)
+    seen.add("장학금|https://example.com/view?duid=7&searchKey=1", now=100)
+    seen.add("5", now=200)
+    seen.add("장학금(수정)|https://example.com/view?duid=7", now=300)
+    canonical = lambda post_id: post_id.rpartition("duid=")[2].split("&")[0] if "duid=" in post_id else post_id
+    assert seen.rename(canonical) == 2
+    assert list(seen) == ["5", "7"]  # 합쳐진 ID 는 나중에 본 쪽 자리로
+    assert seen.rename(canonical) == 0
+
+    # 합쳐진 ID 는 더 최근 시각(300)을 가짐 → 250 이전 것만 만료
+    assert seen.evict(now=250 + DAY) == 1
+    assert list(seen) == ["7"]
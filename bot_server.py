@@ -0,0 +1,335 @@
+"""
+명령어 봇: 학생이 봇에게 보낸 명령에 바로 답함 (getUpdates 롱 폴링, asyncio).
+
+    /menu [내일|월~일|YYYY-MM-DD]   학식
+    /calendar                       오늘의 일정 + 다가오는 일정
+    /search 검색어                   지난 공지 검색 (archive.py)
+
+학교 사이트에는 요청하지 않고 state/ 의 캐시(menu_cache.json, calendar_cache.json)와 private/archive.jsonl 만 읽음.
+캐시는 모닝 브리핑 / 소스 실행기가 채우고, 이 서버는 파일이 바뀌면 백그라운드에서 다시 읽음.
+답장은 telegram_dispatcher 로 보냄 (채팅방별 순서/속도 제한 그대로).
+
+사용법:
+    TELEGRAM_TOKEN=... python bot_server.py
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_TOKEN=test python bot_server.py   # 가짜 텔레그램
+"""
+import asyncio
+import html
+import os
+import signal
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, timedelta
+
+import archive
+import calendar_bot
+import http_client
+import metrics
+import state_store
+import telegram_dispatcher
+
+# ▼ 설정 ▼
+POLL_TIMEOUT = int(os.environ.get('BOT_POLL_TIMEOUT', '25'))  # 롱 폴링 대기(초)
+RELOAD_INTERVAL = float(os.environ.get('BOT_RELOAD_INTERVAL', '30'))  # 캐시 파일이 바뀌었는지 확인하는 주기(초)
+STATS_INTERVAL = float(os.environ.get('BOT_STATS_INTERVAL', '300'))  # 처리 통계 출력 주기(초)
+SEARCH_LIMIT = 5
+# 보관함을 다시 읽을 때 20줄(약 3ms)마다 쉬는 시간(초) - 읽는 동안 답장 스레드가 GIL 을 못 잡으면 응답이 다 밀림
+RELOAD_PAUSE = float(os.environ.get('BOT_RELOAD_PAUSE', '0.005'))
+SEARCH_CACHE_SIZE = 256  # 같은 검색어("장학금" 등)는 보관함이 바뀔 때까지 결과를 재사용
+DAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+HELP_TEXT = (
+    "🤖 <b>광운대 알리미 봇</b>\n\n"
+    "/menu - 오늘 학식 (/menu 내일, /menu 금)\n"
+    "/calendar - 오늘의 학사일정과 다가오는 일정\n"
+    "/search 검색어 - 지난 공지 검색 (예: /search 장학금)"
+)
+
+
+class Snapshot:
+    """
+    state/ 의 캐시를 메모리에 들고 있음. refresh() 는 바뀐 파일만 다시 읽음.
+    답장은 작업 스레드 여러 개에서 동시에 만들므로 검색 결과 캐시는 잠금으로 보호
+    """
+
+    def __init__(self):
+        self.menu = calendar_bot.MenuCache()
+        self.calendar = calendar_bot.CalendarCache()
+        self.archive = archive.Archive()
+        self.mtimes = self._mtimes()
+        self.search_cache = OrderedDict()
+        self.search_lock = threading.Lock()
+
+    @staticmethod
+    def _mtimes():
+        mtimes = {}
+        for name in (calendar_bot.MENU_CACHE_FILE, calendar_bot.CALENDAR_CACHE_FILE):
+            try:
+                mtimes[name] = os.path.getmtime(state_store.state_path(name))
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    def refresh(self):
+        """ 작업 스레드에서 호출. 새로 읽을 때는 새 객체를 만든 뒤 바꿔 끼우므로 읽는 쪽은 기다리지 않음 """
+        mtimes = self._mtimes()
+        if mtimes[calendar_bot.MENU_CACHE_FILE] != self.mtimes[calendar_bot.MENU_CACHE_FILE]:
+            self.menu = calendar_bot.MenuCache()
+        if mtimes[calendar_bot.CALENDAR_CACHE_FILE] != self.mtimes[calendar_bot.CALENDAR_CACHE_FILE]:
+            self.calendar = calendar_bot.CalendarCache()
+        self.mtimes = mtimes
+        if self._archive_rewritten():
+            # 압축으로 파일을 새로 씀 → 전부 다시 읽는 동안(글 5000개에 1초 정도) 보관함 잠금을 잡고 있으면
+            # 검색이 다 막히므로, 따로 읽은 뒤 바꿔 끼움
+            fresh = archive.Archive(self.archive.path, pause=RELOAD_PAUSE)
+            self.archive = fresh
+            added = len(fresh)
+        else:
+            # 덧붙은 줄만 읽음 (몇 줄이라 잠금은 잠깐)
+            added = self.archive.refresh()
+        if added:
+            with self.search_lock:
+                self.search_cache = OrderedDict()
+        return added
+
+    def _archive_rewritten(self):
+        try:
+            stat = os.stat(self.archive.path)
+        except OSError:
+            return False
+        return stat.st_ino != self.archive.inode or stat.st_size < self.archive.offset
+
+    def search(self, query):
+        key = " ".join(query.lower().split())
+        with self.search_lock:
+            results = self.search_cache.get(key)
+            if results is not None:
+                self.search_cache.move_to_end(key)
+                return results
+            cache = self.search_cache
+        # 검색은 잠금 밖에서 (다른 검색어 답장이 기다리지 않게)
+        results = self.archive.search(query, limit=SEARCH_LIMIT)
+        with self.search_lock:
+            if cache is self.search_cache:  # 그 사이 보관함이 바뀌었으면 저장하지 않음
+                cache[key] = results
+                if len(cache) > SEARCH_CACHE_SIZE:
+                    cache.popitem(last=False)
+        return results
+
+
+# ------------------------------------------------------
+# 명령 → 답장 (네트워크 없이 호출 가능)
+# ------------------------------------------------------
+def parse_day(arg, today):
+    """ "", "오늘", "내일", "월"~"일", "YYYY-MM-DD" → date (모르는 값이면 None) """
+    arg = arg.strip()
+    if arg in ("", "오늘"):
+        return today
+    if arg == "내일":
+        return today + timedelta(days=1)
+    if arg[:1] in DAY_NAMES and len(arg) <= 3:
+        # 이번 주(월~일)의 그 요일
+        monday = today - timedelta(days=today.weekday())
+        return monday + timedelta(days=DAY_NAMES.index(arg[:1]))
+    try:
+        return date.fromisoformat(arg)
+    except ValueError:
+        return None
+
+
+def answer_menu(snapshot, arg, today):
+    day = parse_day(arg, today)
+    if day is None:
+        return "날짜를 모르겠어요. 예: /menu, /menu 내일, /menu 금, /menu 2026-10-23", "HTML"
+    header = f"🍚 *{day.month}/{day.day}({DAY_NAMES[day.weekday()]}) 학식*\n\n"
+    if not snapshot.menu.covers(day):
+        return header + "아직 그 주 식단이 저장되지 않았어요. (매일 아침 브리핑 때 갱신)", "Markdown"
+    return header + calendar_bot.format_menu(snapshot.menu.menu(day)), "Markdown"
+
+
+def answer_calendar(snapshot, today):
+    events = []
+    cached = False
+    for y, m in calendar_bot.get_target_months(today):
+        month_events = snapshot.calendar.events(y, m)
+        if month_events is not None:
+            cached = True
+            events.extend(month_events)
+    if not cached:
+        return "학사일정이 아직 저장되지 않았어요. (매일 아침 브리핑 때 갱신)", "HTML"
+    return "📆 *학사일정*\n\n" + calendar_bot.build_calendar_message(events, today), "Markdown"
+
+
+def answer_search(snapshot, query):
+    query = query.strip()
+    if not query:
+        return "검색어를 같이 보내주세요. 예: /search 장학금", "HTML"
+    results = snapshot.search(query)
+    if not results:
+        return f"🔎 '{html.escape(query)}' 검색 결과가 없어요.", "HTML"
+    lines = [f"🔎 <b>'{html.escape(query)}'</b> 검색 결과", ""]
+    for r in results:
+        date_text = f" ({html.escape(r['date'])})" if r.get("date") else ""
+        link = html.escape(r["link"] or "", quote=True)
+        lines.append(f"• <a href=\"{link}\">{html.escape(r['title'])}</a>{date_text}")
+        if r["snippet"]:
+            lines.append(f"  <i>{html.escape(r['snippet'])}</i>")
+    return "\n".join(lines), "HTML"
+
+
+def parse_command(text):
+    """ "/menu@봇이름 내일" → ("/menu", "내일") (그룹에서는 /menu@봇이름 으로 옴) """
+    command, _, arg = text.partition(" ")
+    return command.split("@")[0].lower(), arg
+
+
+def is_search(text):
+    return bool(text) and text.startswith("/") and parse_command(text)[0] == "/search"
+
+
+def answer(snapshot, text, today):
+    """ 메시지 → (답장, parse_mode). 명령이 아니면 None """
+    if not text or not text.startswith("/"):
+        return None
+    command, arg = parse_command(text)
+    if command == "/menu":
+        return answer_menu(snapshot, arg, today)
+    if command == "/calendar":
+        return answer_calendar(snapshot, today)
+    if command == "/search":
+        return answer_search(snapshot, arg)
+    return HELP_TEXT, "HTML"
+
+
+# ------------------------------------------------------
+# 롱 폴링 서버
+# ------------------------------------------------------
+class BotServer:
+    def __init__(self, snapshot=None, dispatcher=None, token=None, api_url=None, today=None):
+        self.snapshot = snapshot or Snapshot()
+        self.dispatcher = dispatcher or telegram_dispatcher.get_dispatcher()
+        self.token = token if token is not None else telegram_dispatcher.TOKEN
+        self.api_url = (api_url or telegram_dispatcher.TELEGRAM_API_URL).rstrip("/")
+        self.today = today or calendar_bot.get_korea_today  # 테스트에서 날짜 고정용
+        self.offset = None
+        self.tasks = set()
+        self.latencies = deque(maxlen=10000)  # 메시지 받은 뒤 답장 전송 완료까지(초)
+        self.stats = {"updates": 0, "replies": 0, "failed": 0, "poll_errors": 0}
+
+    def get_updates(self):
+        """ 작업 스레드에서 호출 (requests 는 blocking) """
+        params = {"timeout": POLL_TIMEOUT, "allowed_updates": ["message"]}
+        if self.offset is not None:
+            params["offset"] = self.offset
+        res = http_client.post(f"{self.api_url}/bot{self.token}/getUpdates", json=params, timeout=(5, POLL_TIMEOUT + 10))
+        body = res.json()
+        if not body.get("ok"):
+            raise RuntimeError(body.get("description") or f"HTTP {res.status_code}")
+        return body["result"]
+
+    async def handle(self, update):
+        start = time.perf_counter()
+        message = update.get("message") or {}
+        chat_id = (message.get("chat") or {}).get("id")
+        text = message.get("text")
+        if is_search(text):
+            # 검색(BM25)은 수 ms 걸리고 보관함 잠금을 기다릴 수도 있으므로 작업 스레드에서
+            # (이벤트 루프에서 돌리면 다른 답장이 다 기다림). 나머지 명령은 메모리 조회라 바로 답함
+            reply = await asyncio.to_thread(answer, self.snapshot, text, self.today())
+        else:
+            reply = answer(self.snapshot, text, self.today())
+        if reply is None or chat_id is None:
+            return
+        text, parse_mode = reply
+        result = await asyncio.wrap_future(self.dispatcher.submit(
+            chat_id, text, parse_mode=parse_mode, disable_web_page_preview=True
+        ))
+        self.latencies.append(time.perf_counter() - start)
+        self.stats["replies" if result["ok"] else "failed"] += 1
+
+    async def poll(self, stop):
+        failures = 0
+        while not stop.is_set():
+            try:
+                updates = await asyncio.to_thread(self.get_updates)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                self.stats["poll_errors"] += 1
+                delay = min(30, 2 ** failures)
+                print(f"⚠️ getUpdates 실패 ({metrics.redact(str(e))}) - {delay}초 후 다시 시도")
+                await asyncio.sleep(delay)
+                continue
+            for update in updates:
+                self.offset = update["update_id"] + 1
+                self.stats["updates"] += 1
+                # 답장은 기다리지 않고 바로 다음 폴링 (느린 채팅방이 다른 사람을 막지 않게)
+                task = asyncio.create_task(self.handle(update))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def reload(self, stop):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=RELOAD_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                added = await asyncio.to_thread(self.snapshot.refresh)
+            except Exception as e:
+                # 파일을 쓰는 중이었거나 깨진 경우 - 지금 들고 있는 캐시로 계속 답함
+                print(f"⚠️ 캐시 다시 읽기 실패 ({e})")
+                continue
+            if added:
+                print(f"🗄️ 보관함 {added}개 반영 (총 {len(self.snapshot.archive)}개)")
+
+    async def report(self, stop):
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=STATS_INTERVAL)
+            except asyncio.TimeoutError:
+                print(self.summary())
+
+    def summary(self):
+        if not self.latencies:
+            return f"🤖 {self.stats}"
+        return (f"🤖 {self.stats} / 응답 중앙값 {statistics.median(self.latencies) * 1000:.1f}ms"
+                f" / p99 {metrics.percentile(self.latencies, 0.99) * 1000:.1f}ms")
+
+    async def serve(self, stop):
+        print(f"🤖 명령어 봇 시작 (보관함 {len(self.snapshot.archive)}개)")
+        workers = [
+            asyncio.create_task(self.poll(stop)),
+            asyncio.create_task(self.reload(stop)),
+            asyncio.create_task(self.report(stop)),
+        ]
+        await stop.wait()
+        # 진행 중인 롱 폴링은 끊지 않고 버림 (offset 을 안 넘겼으니 다음에 다시 받음)
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=10)
+        print(self.summary())
+
+
+async def main_async():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows
+    server = BotServer()
+    if not server.token:
+        print("❌ TELEGRAM_TOKEN 이 없습니다.")
+        return
+    await server.serve(stop)
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
@@ -1,10 +1,17 @@
 import os
-import requests
 import json
-from bs4 import BeautifulSoup
 from datetime import date, datetime, timedelta
+import hashlib
 import re
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait
+import http_client
+import telegram_dispatcher
+import html_parser
+import metrics
+import request_policy
+import state_store
 
 # ▼ 설정 ▼
 CALENDAR_API_URL = "https://www.kw.ac.kr/KWBoard/list5_detail.jsp"
@@ -13,24 +20,21 @@ MENU_URL = "https://www.kw.ac.kr/ko/life/facility11.jsp"
 NOTICE_URL = "https://www.kw.ac.kr/ko/life/notice.jsp"
 FEEDBACK_GROUP_URL = "https://t.me/+p-QVo1Z6e5AxNTdl"
 
-TOKEN = os.environ.get('TELEGRAM_TOKEN')
 CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
 
+# 브리핑 전체 수집 마감 시간(초) - 이 안에 도착한 데이터만 사용
+BRIEFING_DEADLINE = float(os.environ.get('BRIEFING_DEADLINE', '15'))
+MENU_ERROR_MSG = "⚠️ 식단 정보를 불러오는데 실패했습니다."
+
 def send_telegram(message, buttons=None):
-    if TOKEN and CHAT_ID:
-        try:
-            url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-            payload = {
-                "chat_id": CHAT_ID,
-                "text": message,
-                "parse_mode": "Markdown",
-                "disable_web_page_preview": True
-            }
-            if buttons:
-                payload['reply_markup'] = json.dumps(buttons)
-            requests.post(url, data=payload)
-        except Exception as e:
-            print(f"텔레그램 전송 실패: {e}")
+    """ 전송 큐를 거쳐 보내고, 끝날 때까지 기다려서 결과 dict 반환 """
+    params = {
+        "parse_mode": "Markdown",
+        "disable_web_page_preview": True
+    }
+    if buttons:
+        params['reply_markup'] = json.dumps(buttons)
+    return telegram_dispatcher.get_dispatcher().submit(CHAT_ID, message, **params).result()
 
 def get_korea_today():
     """서버 시간(UTC)에 9시간을 더해 한국 날짜를 반환"""
@@ -46,113 +50,153 @@ def get_day_kor(date_obj):
 # -----------------------------------------------------------
 # [기능 1] 학식 (Requests)
 # -----------------------------------------------------------
-def get_cafeteria_menu():
-    try:
-        # print(f"🍚 학식 정보 요청: {MENU_URL}") # 로그 줄임
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(MENU_URL, headers=headers, verify=False, timeout=10)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        
-        today_str = get_korea_today().strftime("%Y-%m-%d")
-        
-        table = soup.select_one("table.tbl-list")
-        if not table: return "❌ 식단표 없음"
+def fetch_menu_page(timeout=None):
+    res = request_policy.get(MENU_URL, hedge=True, read_timeout=timeout, verify=False)
+    return res.text
 
-        headers = table.select("thead th")
-        target_idx = -1
-        
-        for idx, th in enumerate(headers):
-            if today_str in th.get_text():
-                target_idx = idx
-                break
-        
-        # [수정] 멘트 변경
-        if target_idx == -1:
-            return "😴 오늘은 운영하지 않아요."
+def parse_weekly_menu(page_html, backend=None):
+    """ 식단표 페이지 HTML → 한 주 전체 {"YYYY-MM-DD": [{"category", "menu"}, ...]} (표가 없으면 None) """
+    # 식단표 표만 파싱
+    root = html_parser.parse(page_html, scope=("table", "tbl-list"), backend=backend)
 
-        menu_rows = table.select("tbody tr")
-        menu_list = []
-        
-        for row in menu_rows:
-            cols = row.select("td")
-            if len(cols) <= target_idx: continue
-            
-            category = cols[0].get_text("\n", strip=True).split("판매시간")[0].strip()
-            menu_content = cols[target_idx].get_text("\n", strip=True)
-            
+    table = root.select_one("table.tbl-list")
+    if not table: return None
+
+    # 열 번호 → 날짜 (헤더가 "월2026-10-19" 형태)
+    columns = {}
+    for idx, th in enumerate(table.select("thead th")):
+        found = re.search(r'\d{4}-\d{2}-\d{2}', th.text())
+        if found and found.group() not in columns.values():
+            columns[idx] = found.group()
+
+    week = {day: [] for day in columns.values()}
+    for row in table.select("tbody tr"):
+        cols = row.select("td")
+        if not cols: continue
+
+        category = cols[0].text("\n", strip=True).split("판매시간")[0].strip()
+        for idx, day in columns.items():
+            if idx >= len(cols): continue
+            menu_content = cols[idx].text("\n", strip=True)
             if menu_content:
-                menu_list.append(f"🍱 *{category}*\n{menu_content}")
+                week[day].append({"category": category, "menu": menu_content})
+    return week
 
-        return "\n\n".join(menu_list) if menu_list else "🍙 등록된 식단 내용이 없습니다."
+def format_menu(entries):
+    """ 하루치 메뉴 목록 → 메시지 텍스트 (None 이면 운영 안 하는 날) """
+    # [수정] 멘트 변경
+    if entries is None:
+        return "😴 오늘은 운영하지 않아요."
+    menu_list = [f"🍱 *{e['category']}*\n{e['menu']}" for e in entries]
+    return "\n\n".join(menu_list) if menu_list else "🍙 등록된 식단 내용이 없습니다."
 
-    except Exception as e:
-        return "⚠️ 식단 정보를 불러오는데 실패했습니다."
+def parse_cafeteria_menu(page_html, today=None, backend=None):
+    """ 식단표 페이지 HTML에서 오늘 메뉴만 뽑아 텍스트로 반환 """
+    week = parse_weekly_menu(page_html, backend=backend)
+    if week is None: return "❌ 식단표 없음"
+
+    today_str = (today or get_korea_today()).strftime("%Y-%m-%d")
+    return format_menu(week.get(today_str))
 
 # -----------------------------------------------------------
 # [기능 2] 학사일정 (API Reverse Engineering)
 # -----------------------------------------------------------
-def fetch_calendar_data(year, month):
+def fetch_calendar_data(year, month, timeout=None):
+    """ 실패하면 빈 문자열 (캐시가 있으면 collect_month_events 에서 캐시로 대신함) """
     try:
         data = {'sy': str(year), 'sm': str(month)}
-        res = requests.post(CALENDAR_API_URL, data=data, verify=False, timeout=10)
+        # 조회용 POST 라서 재시도해도 안전함
+        res = request_policy.post(CALENDAR_API_URL, idempotent=True, read_timeout=timeout, data=data, verify=False)
         return res.text 
-    except:
+    except Exception as e:
+        print(f"⚠️ 학사일정 {year}-{month:02d} 수집 실패: {e}")
         return ""
 
-def get_academic_calendar():
-    today = get_korea_today()
-    
-    target_months = [
+def get_target_months(today):
+    """ 이번 달부터 3개월치 (연, 월) 목록 """
+    return [
         (today.year, today.month),
         ((today.replace(day=1) + timedelta(days=32)).year, (today.replace(day=1) + timedelta(days=32)).month),
         ((today.replace(day=1) + timedelta(days=62)).year, (today.replace(day=1) + timedelta(days=62)).month)
     ]
 
-    all_list_items = []
-    for y, m in target_months:
-        html_fragment = fetch_calendar_data(y, m)
-        if html_fragment:
-            soup = BeautifulSoup(html_fragment, 'html.parser')
-            items = soup.find_all("li")
-            all_list_items.extend(items)
+def extract_calendar_items(fragments, backend=None):
+    """ 월별 HTML 조각들에서 (날짜 문자열, 일정 제목) 목록을 뽑음. 빈 조각은 건너뛰고 중복은 제거 """
+    calendar_items = []
+    seen_events = set() 
 
+    for html_fragment in fragments:
+        if not html_fragment:
+            continue
+        # <li> 만 파싱
+        root = html_parser.parse(html_fragment, scope="li", backend=backend)
+        for item in root.select("li"):
+            date_tag = item.select_one("strong")
+            title_tag = item.select_one("p")
+            
+            if not date_tag or not title_tag: continue
+            
+            raw_date = date_tag.text(strip=True)
+            title = title_tag.text(strip=True)
+            
+            unique_key = f"{raw_date}_{title}"
+            if unique_key in seen_events: continue
+            seen_events.add(unique_key)
+            calendar_items.append((raw_date, title))
+
+    return calendar_items
+
+def resolve_month_dates(raw_date, year, month):
+    """
+    "10.19(월) ~ 10.23(금)" 같은 문자열을 (시작일, 종료일)로.
+    연도는 "오늘"이 아니라 이 조각을 요청한 (연, 월) 기준으로 정함
+    → 결과가 오늘 날짜와 무관하므로 캐시에 그대로 저장할 수 있음
+    """
+    dates = re.findall(r'(\d{2}\.\d{2})', raw_date)
+    if not dates: return None
+
+    try:
+        s_mon = int(dates[0].split('.')[0])
+        calc_year = year
+        # 12월 조각의 "01.05", 1월 조각의 "12.28" 처럼 해를 넘는 일정
+        if month >= 11 and s_mon <= 2:
+            calc_year += 1
+        elif month <= 2 and s_mon >= 11:
+            calc_year -= 1
+
+        s_date = datetime.strptime(f"{calc_year}.{dates[0]}", "%Y.%m.%d").date()
+        e_date = s_date
+        if len(dates) > 1:
+            e_date = datetime.strptime(f"{calc_year}.{dates[1]}", "%Y.%m.%d").date()
+            # "12.28 ~ 01.08" 처럼 끝나는 날이 다음 해인 경우
+            if e_date < s_date:
+                e_date = e_date.replace(year=e_date.year + 1)
+    except ValueError:
+        return None
+    return s_date, e_date
+
+def parse_month_events(html_fragment, year, month, backend=None):
+    """ 한 달치 조각 → 날짜 계산까지 끝난 일정 목록 """
+    events = []
+    for raw_date, title in extract_calendar_items([html_fragment], backend=backend):
+        resolved = resolve_month_dates(raw_date, year, month)
+        if not resolved: continue
+        events.append({"raw_date": raw_date, "title": title, "start": resolved[0], "end": resolved[1]})
+    return events
+
+def build_calendar_message(events, today):
+    """ 일정 목록(시작일/종료일 계산 완료)으로 오늘의 일정 + 가장 가까운 다가오는 일정 메시지 """
     today_events = []
     upcoming_events = []
-    seen_events = set() 
+    seen_events = set()
 
-    for item in all_list_items:
-        date_tag = item.find("strong")
-        title_tag = item.find("p")
-        
-        if not date_tag or not title_tag: continue
-        
-        raw_date = date_tag.get_text(strip=True)
-        title = title_tag.get_text(strip=True)
-        
+    for event in events:
+        raw_date, title = event["raw_date"], event["title"]
+        # 여러 달 조각에 걸쳐 있는 일정은 한 번만
         unique_key = f"{raw_date}_{title}"
         if unique_key in seen_events: continue
         seen_events.add(unique_key)
-        
-        dates = re.findall(r'(\d{2}\.\d{2})', raw_date)
-        if not dates: continue
-        
-        current_year = today.year 
-        try:
-            msg_s_mon = int(dates[0].split('.')[0])
-            calc_year = current_year
-            
-            if today.month >= 11 and msg_s_mon <= 2:
-                calc_year += 1
-            elif today.month <= 2 and msg_s_mon >= 11:
-                calc_year -= 1
-            
-            s_date = datetime.strptime(f"{calc_year}.{dates[0]}", "%Y.%m.%d").date()
-            if len(dates) > 1:
-                e_date = datetime.strptime(f"{calc_year}.{dates[1]}", "%Y.%m.%d").date()
-            else:
-                e_date = s_date
-        except:
-            continue
+        s_date, e_date = event["start"], event["end"]
 
         # 오늘의 일정
         if s_date <= today <= e_date:
@@ -195,6 +239,179 @@ def get_academic_calendar():
         
     return "\n".join(events_text) if events_text else "• 예정된 주요 학사일정이 없습니다."
 
+# -----------------------------------------------------------
+# [기능 4] 월별 학사일정 캐시
+# 지난/다음 달 일정은 거의 안 바뀌므로, 파싱과 날짜 계산까지 끝낸 결과를
+# (연, 월)별로 저장해두고 TTL 이 지났을 때만 다시 요청함
+# -----------------------------------------------------------
+CALENDAR_CACHE_FILE = "calendar_cache.json"
+CALENDAR_TTL_CURRENT = float(os.environ.get('CALENDAR_TTL_CURRENT_HOURS', '6')) * 3600  # 이번 달
+CALENDAR_TTL_OTHER = float(os.environ.get('CALENDAR_TTL_OTHER_HOURS', '168')) * 3600  # 그 외 달
+
+class CalendarCache:
+    def __init__(self):
+        self.months = state_store.load_json(CALENDAR_CACHE_FILE, {})
+
+    @staticmethod
+    def key(year, month):
+        return f"{year}-{month:02d}"
+
+    def is_fresh(self, year, month, today, now=None):
+        entry = self.months.get(self.key(year, month))
+        if not entry:
+            return False
+        ttl = CALENDAR_TTL_CURRENT if (year, month) == (today.year, today.month) else CALENDAR_TTL_OTHER
+        return (now or time.time()) - entry["fetched_at"] < ttl
+
+    def events(self, year, month):
+        """ 캐시된 일정 (없으면 None) """
+        entry = self.months.get(self.key(year, month))
+        if entry is None:
+            return None
+        return [
+            dict(e, start=date.fromisoformat(e["start"]), end=date.fromisoformat(e["end"]))
+            for e in entry["events"]
+        ]
+
+    def update(self, year, month, html_fragment, now=None):
+        """ 새로 받은 조각 반영. 내용 해시가 같으면 다시 파싱하지 않음 """
+        key = self.key(year, month)
+        digest = hashlib.sha256(html_fragment.encode("utf-8")).hexdigest()
+        entry = self.months.get(key)
+        if entry and entry["hash"] == digest:
+            entry["fetched_at"] = now or time.time()
+            return self.events(year, month)
+
+        events = parse_month_events(html_fragment, year, month)
+        self.months[key] = {
+            "fetched_at": now or time.time(),
+            "hash": digest,
+            "events": [dict(e, start=e["start"].isoformat(), end=e["end"].isoformat()) for e in events]
+        }
+        return events
+
+    def prune(self, today):
+        """ 지난 달 항목은 더 안 쓰므로 삭제 """
+        current = self.key(today.year, today.month)
+        for key in [k for k in self.months if k < current]:
+            del self.months[key]
+
+    def save(self):
+        state_store.save_json(CALENDAR_CACHE_FILE, self.months)
+
+def collect_month_events(cache, months, fragments, today):
+    """
+    캐시 + 새로 받은 조각을 합쳐서 일정 목록을 만듦.
+    fragments: 이번에 받은 {(연, 월): HTML} (못 받은 달은 빈 문자열)
+    반환: (일정 목록, {못 받은 달: "캐시 사용" 또는 "빠짐"})
+    """
+    events = []
+    stale = {}
+    for y, m in months:
+        fragment = fragments.get((y, m))
+        if fragment:
+            events.extend(cache.update(y, m, fragment))
+            continue
+        cached = cache.events(y, m)
+        if (y, m) in fragments:
+            # 요청은 했는데 못 받음 → 유통기한 지난 캐시라도 사용
+            stale[cache.key(y, m)] = "캐시 사용" if cached is not None else "빠짐"
+        if cached is not None:
+            events.extend(cached)
+    cache.prune(today)
+    return events, stale
+
+# -----------------------------------------------------------
+# [기능 5] 주간 학식 캐시
+# 식단표 페이지에는 한 주 전체가 들어 있으므로 한 번만 파싱해서 날짜별로 저장해두고,
+# 캐시된 주간 안의 날짜는 요청 없이 바로 꺼내씀. 페이지 해시가 바뀌었을 때만 다시 파싱
+# -----------------------------------------------------------
+MENU_CACHE_FILE = "menu_cache.json"
+# 0 이면 캐시된 주간은 다시 확인하지 않음. 설정하면 그 시간마다 다시 받아서 해시 비교
+MENU_MAX_AGE = float(os.environ.get('MENU_MAX_AGE_HOURS', '0')) * 3600
+
+class MenuCache:
+    def __init__(self):
+        self.data = state_store.load_json(MENU_CACHE_FILE, {})
+
+    def covers(self, day):
+        """ 캐시된 주(월~일)에 들어 있는 날인지 """
+        week = self.data.get("week")
+        return bool(week) and week[0] <= day.isoformat() <= week[1]
+
+    def needs_fetch(self, day, now=None):
+        if not self.covers(day):
+            return True
+        # 식단이 아직 안 올라온 날은 다시 확인
+        if self.data["days"].get(day.isoformat()) == []:
+            return True
+        return MENU_MAX_AGE > 0 and (now or time.time()) - self.data["fetched_at"] >= MENU_MAX_AGE
+
+    def update(self, page_html, now=None):
+        """ 새로 받은 페이지 반영. 내용이 바뀌어서 다시 파싱했으면 True """
+        digest = hashlib.sha256(page_html.encode("utf-8")).hexdigest()
+        if self.data.get("hash") == digest:
+            self.data["fetched_at"] = now or time.time()
+            return False
+
+        week = parse_weekly_menu(page_html)
+        if not week:
+            # 표나 날짜를 못 찾은 페이지로 기존 캐시를 덮어쓰지 않음
+            return False
+        first_day = date.fromisoformat(min(week))
+        monday = first_day - timedelta(days=first_day.weekday())
+        self.data = {
+            "fetched_at": now or time.time(),
+            "hash": digest,
+            "week": [monday.isoformat(), (monday + timedelta(days=6)).isoformat()],
+            "days": week
+        }
+        return True
+
+    def menu(self, day):
+        """ 그 날 메뉴 목록 (캐시에 없거나 운영 안 하는 날은 None) """
+        return self.data.get("days", {}).get(day.isoformat())
+
+    def save(self):
+        state_store.save_json(MENU_CACHE_FILE, self.data)
+
+# -----------------------------------------------------------
+# [기능 3] 동시 수집 (학사일정 3개월 + 학식을 한 번에 요청)
+# -----------------------------------------------------------
+def fetch_briefing_sources(today, deadline=BRIEFING_DEADLINE, months=None, menu=True):
+    """
+    학사일정 월별 요청과 학식 요청을 동시에 보내고, 마감 시간까지 도착한 것만 모음.
+    months: 요청할 (연, 월) 목록 (기본: 이번 달부터 3개월)
+    menu: False 면 학식은 요청하지 않음 (캐시 사용)
+    반환: ({(연, 월): HTML 조각}, 학식 HTML 또는 None, 늦거나 실패한 항목 이름 목록)
+    """
+    months = get_target_months(today) if months is None else months
+    pool = ThreadPoolExecutor(max_workers=len(months) + 1)
+    # 개별 요청 타임아웃도 마감 시간에 맞춰서, 늦은 스레드가 종료를 붙잡지 않게 함
+    month_futures = [pool.submit(metrics.bind(fetch_calendar_data), y, m, deadline) for y, m in months]
+    menu_future = pool.submit(metrics.bind(fetch_menu_page), deadline) if menu else None
+
+    done, _ = wait([f for f in month_futures + [menu_future] if f], timeout=deadline)
+    pool.shutdown(wait=False)
+
+    missing = []
+    fragments = {}
+    for (y, m), future in zip(months, month_futures):
+        fragment = future.result() if future in done else ""
+        if not fragment:
+            missing.append(f"{y}-{m:02d}")
+        fragments[(y, m)] = fragment
+
+    menu_html = None
+    if menu_future in done and menu_future.exception() is None:
+        menu_html = menu_future.result()
+    elif menu_future is not None:
+        missing.append("menu")
+
+    return fragments, menu_html, missing
+
+@metrics.instrument("briefing")
+@request_policy.budgeted(BRIEFING_DEADLINE)
 def run():
     try:
         today = get_korea_today()
@@ -204,8 +421,50 @@ def run():
         
         print(f"🚀 모닝 브리핑 실행 ({today_str})")
         
-        calendar_msg = get_academic_calendar()
-        menu_msg = get_cafeteria_menu()
+        # 캐시가 아직 유효한 달은 요청하지 않음
+        cache = CalendarCache()
+        months = get_target_months(today)
+        months_to_fetch = [(y, m) for y, m in months if not cache.is_fresh(y, m, today)]
+        print(f"📦 학사일정 캐시 사용: {len(months) - len(months_to_fetch)}/{len(months)}개월")
+
+        menu_cache = MenuCache()
+        fetch_menu = menu_cache.needs_fetch(today)
+        if not fetch_menu:
+            print("📦 학식 캐시 사용")
+
+        with metrics.stage("fetch"):
+            fragments, menu_html, missing = fetch_briefing_sources(today, months=months_to_fetch, menu=fetch_menu)
+        metrics.count("months_fetched", len(months_to_fetch))
+        metrics.count("missing", len(missing))
+        if missing:
+            print(f"⏰ 마감 시간({BRIEFING_DEADLINE:.0f}초) 내 수집 실패: {', '.join(missing)}")
+
+        with metrics.stage("parse"):
+            events, stale = collect_month_events(cache, months, fragments, today)
+            calendar_msg = build_calendar_message(events, today)
+        for key, reason in stale.items():
+            print(f"📦 학사일정 {key}: 새로 못 받음 ({reason})")
+            metrics.stale(f"calendar {key}", reason)
+        metrics.count("events", len(events))
+        menu_msg = MENU_ERROR_MSG
+        try:
+            with metrics.stage("parse"):
+                if menu_html is not None:
+                    menu_cache.update(menu_html)
+                if menu_cache.covers(today):
+                    menu_msg = format_menu(menu_cache.menu(today))
+                elif menu_html is not None:
+                    # 받은 페이지가 이번 주가 아님 → 기존 문구 그대로
+                    menu_msg = parse_cafeteria_menu(menu_html, today)
+        except Exception:
+            pass
+        if "menu" in missing:
+            metrics.stale("menu", "캐시 사용" if menu_cache.covers(today) else "빠짐")
+
+        with metrics.stage("state"):
+            cache.save()
+            if menu_html is not None:
+                menu_cache.save()
         
         # [수정] 제목 변경 (광운대 삭제), 날씨 삭제
         final_msg = f"☀️ *모닝 브리핑* {today_str}\n\n" \
@@ -214,6 +473,9 @@ def run():
                     f"🥄 *오늘의 학식*\n\n" \
                     f"{menu_msg}\n" \
                     f" "
+        # 새로 못 받은 정보가 있으면 구독자에게도 알림
+        if stale or "menu" in missing:
+            final_msg += "\n_⚠️ 학교 홈페이지 응답이 없어 일부는 이전에 받은 정보이거나 빠져 있어요_"
         
         # [수정] 버튼 이름 변경 (피드백)
         keyboard = {
@@ -231,12 +493,21 @@ def run():
 
         # print(final_msg) # 로그 너무 길면 생략 가능
         print("📨 텔레그램 전송 중...")
-        send_telegram(final_msg, buttons=keyboard)
-        print("✅ 전송 완료")
+        with metrics.stage("send"):
+            result = send_telegram(final_msg, buttons=keyboard)
+        metrics.count("send_retries", max(result.get("attempts", 1) - 1, 0))
+        if result["ok"]:
+            print("✅ 전송 완료")
+        else:
+            # 오류 문자열 대신 상태 코드만 (실행 기록은 아티팩트로 올라감)
+            metrics.fail(f"전송 실패: HTTP {result['status'] or '없음'}")
+            print(f"❌ 전송 실패: {result['error']}")
+        http_client.print_stats()
 
     except Exception as e:
-        error_msg = f"🔥 [비상] 봇 실행 중 오류 발생!\n\n{str(e)}\n\n{traceback.format_exc()}"
+        error_msg = metrics.redact(f"🔥 [비상] 봇 실행 중 오류 발생!\n\n{str(e)}\n\n{traceback.format_exc()}")
         print(error_msg)
+        metrics.fail(e)
         send_telegram(error_msg)
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import hashlib
+
+import state_store
+
+# ▼ 설정 ▼
+# 소스마다 파일을 따로 둬서 여러 모니터가 동시에 돌아도 서로 덮어쓰지 않게 함
+CHANGE_STATE_FILE = "change_{name}.json"
+# 비교 기준만 저장 (state/ 는 커밋되므로, 실행 횟수 같은 매번 바뀌는 값은 metrics 로)
+FIELDS = ("etag", "last_modified", "hash")
+
+
+class ChangeDetector:
+    """
+    파싱 전에 "바뀐 게 있나?"만 먼저 확인하는 단계.
+    서버가 ETag/Last-Modified 를 주면 조건부 요청(304)으로, 아니면 본문 해시 비교로 판단.
+    파일은 비교 기준이 바뀌었을 때만 씀 (그대로인 실행은 state/ 에 커밋할 변경을 만들지 않음)
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._file = CHANGE_STATE_FILE.format(name=name)
+        saved = state_store.load_json(self._file, {})
+        # 예전 파일의 누적 실행 횟수(runs, fast_path)는 버림
+        self.entry = {k: saved.get(k) for k in FIELDS}
+        self._pending = None
+
+    def request_headers(self):
+        headers = {}
+        if self.entry.get("etag"):
+            headers["If-None-Match"] = self.entry["etag"]
+        if self.entry.get("last_modified"):
+            headers["If-Modified-Since"] = self.entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, response, region=None, digest=None):
+        """
+        304 응답이거나, 관심 영역의 해시가 지난번과 같으면 True.
+        region: 응답 본문(str)에서 비교할 부분만 잘라내는 함수 (없으면 본문 전체)
+        digest: 본문을 스트리밍으로 읽으면서 미리 계산한 sha256 hex (있으면 본문을 다시 안 읽음)
+        """
+        if response.status_code == 304:
+            unchanged = True
+        else:
+            if digest is None:
+                body = region(response.text) if region else response.content
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                digest = hashlib.sha256(body).hexdigest()
+            unchanged = digest == self.entry.get("hash")
+            self._pending = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "hash": digest,
+            }
+
+        return unchanged
+
+    def commit(self):
+        """ 파싱/전송/저장이 다 끝난 뒤에 호출 - 이번 응답을 다음 비교 기준으로 저장 """
+        pending, self._pending = self._pending, None
+        if pending and pending != self.entry:
+            self.entry = pending
+            self._save()
+
+    def abandon(self):
+        """ 처리를 다 못 끝냈을 때 - 다음 실행에서 다시 파싱하도록 기준은 그대로 둠 """
+        self._pending = None
+
+    def _save(self):
+        state_store.save_json(self._file, self.entry)
@@ -0,0 +1,156 @@
+"""
+상주 실행 모드: 게시판 소스(sources.py) 전부 + calendar_bot 브리핑을 한 프로세스에서 각자 주기로 실행.
+
+GitHub Actions 처럼 매번 체크아웃 + pip install + 파이썬 시작을 하지 않으므로
+1분 간격으로 돌려도 부담이 적음 (목록이 그대로면 change_detect 빠른 경로로 끝남).
+
+사용법:
+    python daemon.py                    # 전부 실행
+    python daemon.py --only notice dorm # 일부만 (소스 이름 / briefing)
+"""
+import argparse
+import asyncio
+import functools
+import os
+import random
+import signal
+import time
+from datetime import datetime, timedelta
+
+import calendar_bot
+import sources
+import telegram_dispatcher
+
+# ▼ 설정 ▼
+MONITOR_INTERVAL = float(os.environ.get('MONITOR_INTERVAL', '60'))  # 초
+DORM_INTERVAL = float(os.environ.get('DORM_INTERVAL', '60'))  # 초
+SOURCE_INTERVAL = float(os.environ.get('SOURCE_INTERVAL', '60'))  # 그 외 소스 (초)
+INTERVALS = {"notice": MONITOR_INTERVAL, "dorm": DORM_INTERVAL}
+BRIEFING_TIME = os.environ.get('BRIEFING_TIME', '08:00')  # 한국 시간 HH:MM
+JITTER = float(os.environ.get('DAEMON_JITTER', '0.1'))  # 주기의 ±10% 만큼 흔들어서 요청이 몰리지 않게
+SHUTDOWN_TIMEOUT = float(os.environ.get('DAEMON_SHUTDOWN_TIMEOUT', '60'))  # 종료 시 실행 중인 작업 대기 시간
+
+
+def seconds_until_kst(hhmm):
+    """ 다음 한국 시간 HH:MM 까지 남은 초 """
+    hour, minute = (int(x) for x in hhmm.split(":"))
+    now = datetime.utcnow() + timedelta(hours=9)
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class Job:
+    """ 주기(interval) 또는 매일 정해진 시각(daily_at)에 실행되는 작업 하나 """
+
+    def __init__(self, name, func, interval=None, daily_at=None, jitter=JITTER):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.daily_at = daily_at
+        self.jitter = jitter
+        self.task = None
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.last_duration = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def next_delay(self, first=False):
+        if self.daily_at:
+            # 정해진 시각 + 최대 1분 흔들기
+            return seconds_until_kst(self.daily_at) + random.uniform(0, 60)
+        if first:
+            # 시작하자마자 전부 동시에 요청하지 않도록 살짝 흩어줌
+            return random.uniform(0, self.interval * self.jitter)
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def run_once(self):
+        """ 작업 스레드에서 실행됨 - 어떤 실패도 데몬을 죽이지 않게 잡음 """
+        start = time.monotonic()
+        try:
+            if self.func() is False:
+                # sources.run_source 는 실패하면 False (오류는 이미 출력됨)
+                self.failures += 1
+        except (Exception, SystemExit) as e:
+            self.failures += 1
+            print(f"❌ [{self.name}] 실행 실패: {e!r}")
+        finally:
+            self.runs += 1
+            self.last_duration = time.monotonic() - start
+            print(f"⏱️ [{self.name}] {self.last_duration:.1f}초 (실행 {self.runs} / 실패 {self.failures} / 건너뜀 {self.skipped})")
+
+
+async def schedule(job, stop):
+    """ 정해진 박자대로 작업을 띄움. 이전 실행이 아직 안 끝났으면 이번 차례는 건너뜀 """
+    first = True
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=job.next_delay(first))
+            break
+        except asyncio.TimeoutError:
+            pass
+        first = False
+
+        if job.running:
+            job.skipped += 1
+            print(f"⏭️ [{job.name}] 이전 실행이 아직 진행 중이라 건너뜀")
+            continue
+
+        job.task = asyncio.create_task(asyncio.to_thread(job.run_once))
+
+
+def build_jobs(only=None):
+    jobs = [
+        Job(source.name, functools.partial(sources.run_source, source),
+            interval=INTERVALS.get(source.name, SOURCE_INTERVAL))
+        for source in sources.load_sources()
+    ]
+    jobs.append(Job("briefing", calendar_bot.run, daily_at=BRIEFING_TIME))
+    if only:
+        jobs = [job for job in jobs if job.name in only]
+    return jobs
+
+
+async def main_async(jobs):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass  # Windows
+
+    for job in jobs:
+        when = f"매일 {job.daily_at} (KST)" if job.daily_at else f"{job.interval:.0f}초마다"
+        print(f"📅 [{job.name}] {when}")
+
+    schedulers = [asyncio.create_task(schedule(job, stop)) for job in jobs]
+    await stop.wait()
+    print("🛑 종료 신호 받음 - 실행 중인 작업을 기다리는 중...")
+
+    await asyncio.gather(*schedulers)
+    running = [job.task for job in jobs if job.running]
+    if running:
+        done, pending = await asyncio.wait(running, timeout=SHUTDOWN_TIMEOUT)
+        if pending:
+            print(f"⚠️ {len(pending)}개 작업이 {SHUTDOWN_TIMEOUT:.0f}초 안에 끝나지 않음")
+
+    # 큐에 남은 텔레그램 전송도 마저 보냄
+    await asyncio.to_thread(telegram_dispatcher.get_dispatcher().flush, SHUTDOWN_TIMEOUT)
+    print("👋 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모니터 상주 실행")
+    parser.add_argument("--only", nargs="*", help="실행할 작업 (소스 이름 또는 briefing)")
+    args = parser.parse_args()
+    asyncio.run(main_async(build_jobs(args.only)))
+
+
+if __name__ == "__main__":
+    main()
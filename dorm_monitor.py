@@ -1,40 +1,91 @@
 import os
-import requests
+import re
 import json
-import urllib3
+import hashlib
 import html
+import html_parser
+import http_client
+import metrics
+import request_policy
+import sources
+import telegram_dispatcher
+import state_store
 
-# SSL 인증서 경고 무시
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # ▼ 설정 ▼
 API_URL = "https://kw.happydorm.or.kr/bbs/getBbsList.do"
 VIEW_URL = "https://kw.happydorm.or.kr/60/6010.do"
+# 글 하나의 상세 JSON (본문 보관용, archive.py) - 본문 필드 이름은 BODY_KEYS 중 하나
+BODY_API_URL = os.environ.get('DORM_BODY_API_URL', 'https://kw.happydorm.or.kr/bbs/getBbsView.do')
+BODY_KEYS = ("contents", "content", "nttcn")
+# 목록의 수정일 필드 후보 (수정 감지용, edit_tracker.py)
+MODIFIED_KEYS = ("upddate", "update_date", "moddate", "mod_date", "updt_dt")
 
-TOKEN = os.environ.get('TELEGRAM_TOKEN')
 CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
 
-def send_telegram(title, date, link):
-    if TOKEN and CHAT_ID:
-        try:
-            safe_title = html.escape(title)
-            msg = f"🏠 <b>[행복기숙사] {safe_title}</b>\n\n" \
-                  f"| 작성일 {date}"
-            
-            url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-            keyboard = {
-                "inline_keyboard": [[{"text": "👉 기숙사 공지 보러가기", "url": link}]]
-            }
-            payload = {
-                "chat_id": CHAT_ID,
-                "text": msg,
-                "parse_mode": "HTML", 
-                "reply_markup": json.dumps(keyboard),
-                "disable_notification": True 
-            }
-            requests.post(url, data=payload)
-        except Exception as e:
-            print(f"텔레그램 전송 실패: {e}")
+SCHEMA_FILE = "dorm_schema.json"
+# 스키마 형식이 바뀌면 올림 - 예전 스키마는 전체 탐색으로 다시 배움 (2: 수정일/첨부 필드, 비어 있던 리스트 경로)
+SCHEMA_VERSION = 2
+# 1 이면 ijson 으로 응답을 스트리밍 파싱 (ijson 설치 + 스키마를 배운 뒤에만 동작)
+STREAM_JSON = os.environ.get('DORM_STREAM_JSON') == '1'
+
+# 조회수처럼 매번 바뀌는 필드 - 변경 감지 해시에서 뺌
+VOLATILE_FIELD_PATTERN = re.compile(r'"(?:hit|readcnt|read_cnt|view_cnt|viewcnt)"\s*:\s*"?\d*"?', re.I)
+
+# 구독자가 기숙사 글을 받으려면 categories 에 이 태그를 넣음 (subscribers.py 참고)
+DORM_TAGS = ("기숙사",)
+
+# [설정] 일반 공지는 20개만 요청 (고정 공지는 서버가 주는 대로 다 받음)
+REQUEST_DATA = {
+    'cPage': '1',
+    'rows': '20',
+    'bbs_locgbn': 'KW',
+    'bbs_id': 'notice',
+    'sType': '',
+    'sWord': ''
+}
+
+REQUEST_HEADERS = {
+    "Origin": "https://kw.happydorm.or.kr",
+    "Referer": "https://kw.happydorm.or.kr/60/6010.do"
+}
+
+def send_telegram(title, date, link, chat_id=None):
+    """ 전송 큐에 넣고 Future 를 돌려줌 """
+    safe_title = html.escape(title)
+    msg = f"🏠 <b>[행복기숙사] {safe_title}</b>\n\n" \
+          f"| 작성일 {date}"
+    
+    keyboard = {
+        "inline_keyboard": [[{"text": "👉 기숙사 공지 보러가기", "url": link}]]
+    }
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id or CHAT_ID, msg,
+        parse_mode="HTML", 
+        reply_markup=json.dumps(keyboard),
+        disable_notification=True 
+    )
+
+def send_digest(posts, chat_id=None):
+    """ 새 글이 한꺼번에 많을 때 - 목록 하나로 묶어서 전송 """
+    msg = telegram_dispatcher.build_digest(
+        f"🏠 <b>[행복기숙사] 새 공지 {len(posts)}건</b>",
+        [(p['title'], p['link']) for p in posts]
+    )
+    keyboard = {
+        "inline_keyboard": [[{"text": "👉 기숙사 공지 보러가기", "url": VIEW_URL}]]
+    }
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id or CHAT_ID, msg,
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=json.dumps(keyboard),
+        disable_notification=True
+    )
 
 # [핵심 기능] 성공했던 "재귀 탐색" 함수 복구!
 # 키 이름(noticeList 등)을 몰라도, 내용물(seq, subject)이 있으면 무조건 찾아냅니다.
@@ -62,91 +113,311 @@ def find_posts_recursively(data, found_posts):
         for item in data:
             find_posts_recursively(item, found_posts)
 
-def run():
-    print(f"🚀 행복기숙사 공지 스캔 시작...")
-
-    # [설정] 일반 공지는 20개만 요청 (고정 공지는 서버가 주는 대로 다 받음)
-    data = {
-        'cPage': '1',
-        'rows': '20', 
-        'bbs_locgbn': 'KW',
-        'bbs_id': 'notice',
-        'sType': '', 
-        'sWord': ''
-    }
+# ------------------------------------------------------
+# 스키마 학습: 지난번에 글을 찾은 위치(키 경로)와 필드 이름을 기억해뒀다가
+# 다음부터는 그 자리만 바로 읽음. 구조가 바뀌었을 때만 전체 탐색.
+# ------------------------------------------------------
+def match_post_fields(data):
+    """ 게시글처럼 생긴 dict 면 {"seq", "subject", "date", "modified", "files"} 실제 키 이름, 아니면 None """
+    keys = {k.lower(): k for k in data.keys()}
+    seq_key = keys.get('seq')
+    subj_key = keys.get('subject') or keys.get('title') or keys.get('nttsj')
+    if not (seq_key and subj_key):
+        return None
+    date_key = 'regdate' if 'regdate' in data else ('REGDATE' if 'REGDATE' in data else None)
+    # 수정 감지용 (없으면 None)
+    modified_key = next((keys[k] for k in MODIFIED_KEYS if k in keys), None)
+    return {"seq": seq_key, "subject": subj_key, "date": date_key, "modified": modified_key, "files": keys.get('file_cnt'),
+            "summary": keys.get('contents_summary') or keys.get('summary')}
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36",
-        "Origin": "https://kw.happydorm.or.kr",
-        "Referer": "https://kw.happydorm.or.kr/60/6010.do"
+def make_post(data, fields):
+    return {
+        'id': str(data[fields["seq"]]),
+        'title': data[fields["subject"]],
+        'date': (data.get(fields["date"]) if fields["date"] else None) or '날짜 미상',
+        # 필드를 못 찾았으면 None (예전 형식 스키마는 collect_posts 에서 다시 배움)
+        'modified': data.get(fields["modified"]) if fields.get("modified") else None,
+        'files': data.get(fields["files"]) if fields.get("files") else None,
+        # 상세 API 에서 본문을 못 받을 때 대신 보관
+        'summary': data.get(fields["summary"]) if fields.get("summary") else None
     }
 
+def walk_posts(data):
+    """
+    find_posts_recursively 와 같은 결과를 재귀 없이(명시적 스택으로) 찾으면서,
+    글이 들어있던 위치를 스키마로 기록함.
+    지금은 비어 있는 리스트도 기록함 (상단 고정 공지 목록처럼 나중에 글이 생길 수 있어서).
+    반환: (게시글 목록, 스키마)
+    """
+    found_posts = []
+    paths = []
+    empty_lists = []
+    fields = None
+    stack = [(data, ())]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, dict):
+            node_fields = match_post_fields(node)
+            if node_fields:
+                found_posts.append(make_post(node, node_fields))
+                fields = fields or node_fields
+                # 리스트 안의 글이면 리스트 경로를, 아니면 글 자체의 경로를 기억
+                container = path[:-1] if path and isinstance(path[-1], int) else path
+                kind = "list" if container != path else "item"
+                if [kind, list(container)] not in paths:
+                    paths.append([kind, list(container)])
+                continue
+            children = list(node.items())
+        elif isinstance(node, list):
+            if not node:
+                empty_lists.append(["list", list(path)])
+            children = list(enumerate(node))
+        else:
+            continue
+        # 재귀 버전과 같은 순서로 방문하도록 거꾸로 쌓음
+        for key, value in reversed(children):
+            stack.append((value, path + (key,)))
+
+    schema = {"version": SCHEMA_VERSION, "paths": paths + empty_lists, "fields": fields} if found_posts else None
+    return found_posts, schema
+
+def lookup(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+def extract_with_schema(data, schema):
+    """ 기억해둔 위치에서 바로 글을 읽음. 구조가 안 맞으면 None """
+    fields = schema["fields"]
+    found_posts = []
     try:
-        res = requests.post(API_URL, data=data, headers=headers, verify=False, timeout=10)
+        for kind, path in schema["paths"]:
+            target = lookup(data, path)
+            rows = target if kind == "list" else [target]
+            if not isinstance(rows, list):
+                return None
+            for row in rows:
+                if not (isinstance(row, dict) and fields["seq"] in row and fields["subject"] in row):
+                    return None
+                found_posts.append(make_post(row, fields))
+    except (KeyError, IndexError, TypeError):
+        return None
+    return found_posts or None
+
+def schema_is_current(schema):
+    """
+    지금 형식의 스키마인지. 예전에 저장된 스키마는 구조가 맞아도 수정일/첨부 필드나
+    비어 있던 리스트 경로가 빠져 있어서 (수정 감지가 꺼진 채로 남음) 다시 배워야 함
+    """
+    return bool(schema) and schema.get("version") == SCHEMA_VERSION and {"modified", "files"} <= set(schema["fields"])
+
+def collect_posts(result, schema=None):
+    """ 반환: (게시글 목록, 새로 배운 스키마 - 기존 스키마가 통했으면 None) """
+    if schema and not schema_is_current(schema):
+        print("🧭 예전 형식의 스키마 - 전체 탐색으로 다시 배웁니다")
+        schema = None
+    if schema:
+        found_posts = extract_with_schema(result, schema)
+        if found_posts is not None:
+            return found_posts, None
+        print("⚠️ 응답 구조가 바뀜 - 전체 탐색으로 다시 찾고 스키마를 새로 저장합니다")
+    return walk_posts(result)
+
+# JSON 응답 → 최신 게시글 20개 (네트워크 없이 호출 가능)
+# 반환: (게시글 목록, 정리 전 발견 개수, 새로 배운 스키마 또는 None)
+def extract_posts(result, schema=None):
+    # 1. 지난번 위치에서 바로 읽기 (안 되면 전체 탐색)
+    all_found_posts, learned = collect_posts(result, schema)
+    final_posts, found_count = finalize_posts(all_found_posts)
+    return final_posts, found_count, learned
+
+def finalize_posts(all_found_posts):
+    # 2. 데이터 정제 및 리스트 생성
+    current_posts = []
+    for post in all_found_posts:
+        if not post['id']: continue
         
+        # 링크 추가
+        post['link'] = VIEW_URL
+        current_posts.append(post)
+
+    # 3. 중복 제거 (ID 기준)
+    # 딕셔너리 컴프리헨션을 이용해 중복 ID 제거
+    unique_posts_dict = {p['id']: p for p in current_posts}
+    unique_posts = list(unique_posts_dict.values())
+
+    # 4. [핵심] ID 내림차순 정렬 (최신글이 맨 위로)
+    # 8340(고정)이 8335(일반)보다 숫자가 크므로, 정렬하면 자연스럽게 맨 위로 옵니다.
+    unique_posts.sort(key=lambda x: int(x['id']), reverse=True)
+
+    # 5. [설정 적용] 상위 20개만 자르기
+    return unique_posts[:20], len(all_found_posts)
+
+# ------------------------------------------------------
+# 변경 감지용 (조회수 제외)
+# ------------------------------------------------------
+def stable_region(text):
+    return VOLATILE_FIELD_PATTERN.sub("", text)
+
+def posts_digest(posts):
+    """ 스트리밍 모드: 읽은 글의 바뀌면 안 되는 필드만으로 해시 """
+    rows = [[p['id'], p['title'], p['date'], p.get('modified'), p.get('files')] for p in posts]
+    return hashlib.sha256(json.dumps(rows, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+# ------------------------------------------------------
+# 스트리밍 모드 (ijson): 응답을 통째로 메모리에 올리지 않고,
+# 스키마 위치의 글만 조각조각 읽음. 스키마를 알고 있을 때만 사용 가능.
+# ------------------------------------------------------
+def stream_posts(chunks, schema, on_chunk=None):
+    """ 반환: 게시글 목록 (구조가 안 맞으면 None) """
+    fields = schema["fields"]
+    collected = {}
+    coroutines = []
+    for kind, path in schema["paths"]:
+        prefix = ".".join(str(k) if isinstance(k, str) else "item" for k in path)
+        if kind == "list":
+            prefix = f"{prefix}.item" if prefix else "item"
+        rows = collected.setdefault(prefix, ijson.sendable_list())
+        coroutines.append(ijson.items_coro(rows, prefix))
+
+    for chunk in chunks:
+        if on_chunk:
+            on_chunk(chunk)
+        for coro in coroutines:
+            coro.send(chunk)
+    for coro in coroutines:
+        coro.close()
+
+    found_posts = []
+    for rows in collected.values():
+        for row in rows:
+            if not (isinstance(row, dict) and fields["seq"] in row and fields["subject"] in row):
+                return None
+            found_posts.append(make_post(row, fields))
+    return found_posts or None
+
+# ------------------------------------------------------
+# 글 본문 (검색 보관함용)
+# ------------------------------------------------------
+def extract_body(result):
+    """ 상세 JSON 에서 본문(HTML 일 수 있음) 을 찾아 텍스트로. 못 찾으면 빈 문자열 """
+    stack = [result]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key.lower() in BODY_KEYS and isinstance(value, str):
+                    return html_parser.parse(value).text("\n", strip=True)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return ""
+
+def fetch_body(seq, summary=None):
+    """
+    상세 API 의 본문. 상세 API 가 안 되면(404, JSON 아님, 본문 필드 없음) 목록의 요약(CONTENTS_SUMMARY),
+    그것도 없으면 예외 (빈 본문으로 보관되면 다시 받지 않음)
+    """
+    data = {'bbs_locgbn': REQUEST_DATA['bbs_locgbn'], 'bbs_id': REQUEST_DATA['bbs_id'], 'seq': seq}
+    res = request_policy.post(BODY_API_URL, idempotent=True, data=data, headers=REQUEST_HEADERS, verify=False)
+    body = ""
+    if res.ok:
         try:
-            result = res.json()
+            body = extract_body(res.json())
         except ValueError:
-            print(f"❌ 응답이 JSON이 아닙니다!")
-            return
+            body = ""
+    if body:
+        return body
+    if summary:
+        return summary
+    raise ValueError(f"본문을 찾지 못함 (HTTP {res.status_code})")
 
-        # 1. 성공했던 방식(재귀 탐색)으로 모든 게시글 긁어오기
-        all_found_posts = []
-        find_posts_recursively(result, all_found_posts)
-        
-        print(f"🔍 발견된 전체 데이터: {len(all_found_posts)}개 (고정+일반 포함)")
+# ------------------------------------------------------
+# 소스 플러그인 (sources.py 가 변경 감지/비교/전송/저장을 맡음)
+# ------------------------------------------------------
+@sources.register
+class DormSource(sources.Source):
+    name = "dorm"
+    label = "기숙사 공지"
+    legacy_path = "dorm_data.txt"
+    tags = DORM_TAGS
 
-        # 2. 데이터 정제 및 리스트 생성
-        current_posts = []
-        for post in all_found_posts:
-            if not post['id']: continue
-            
-            # 링크 추가
-            post['link'] = VIEW_URL
-            current_posts.append(post)
+    def fetch(self, detector):
+        """ → {"response", "schema", "digest", "streamed"} (digest/streamed 는 스트리밍일 때만) """
+        print(f"🚀 행복기숙사 공지 스캔 시작...")
+        headers = dict(REQUEST_HEADERS, **detector.request_headers())
+        schema = state_store.load_json(SCHEMA_FILE, None)
+        page = {"schema": schema, "digest": None, "streamed": None}
+
+        if STREAM_JSON and ijson and schema_is_current(schema):
+            # 스트리밍: 받으면서 스키마 위치의 글만 파싱, 해시는 읽은 글의 필드로 (조회수 제외)
+            # 받는 것과 파싱이 겹쳐 있으므로 둘 다 fetch 로 기록됨
+            # 목록 조회라서 POST 지만 다시 보내도 안전함
+            res = request_policy.post(API_URL, idempotent=True, data=REQUEST_DATA, headers=headers, verify=False, stream=True)
+            digest = hashlib.sha256()
+
+            def on_chunk(chunk):
+                digest.update(chunk)
+                metrics.count("stream_bytes", len(chunk))
 
-        # 3. 중복 제거 (ID 기준)
-        # 딕셔너리 컴프리헨션을 이용해 중복 ID 제거
-        unique_posts_dict = {p['id']: p for p in current_posts}
-        unique_posts = list(unique_posts_dict.values())
+            page["streamed"] = stream_posts(res.iter_content(chunk_size=64 * 1024), schema, on_chunk=on_chunk)
+            # 구조가 바뀌어 못 읽었으면 (다음 실행에서 전체 탐색) 받은 바이트 해시
+            page["digest"] = posts_digest(page["streamed"]) if page["streamed"] is not None else digest.hexdigest()
+        else:
+            res = request_policy.post(API_URL, idempotent=True, data=REQUEST_DATA, headers=headers, verify=False)
+        page["response"] = res
+        return page
 
-        # 4. [핵심] ID 내림차순 정렬 (최신글이 맨 위로)
-        # 8340(고정)이 8335(일반)보다 숫자가 크므로, 정렬하면 자연스럽게 맨 위로 옵니다.
-        unique_posts.sort(key=lambda x: int(x['id']), reverse=True)
+    def is_unchanged(self, page, detector):
+        # 응답 본문(조회수 제외)이 지난번과 같으면 JSON 디코딩/탐색 없이 종료
+        return detector.is_unchanged(page["response"], stable_region, digest=page["digest"])
 
-        # 5. [설정 적용] 상위 20개만 자르기
-        final_posts = unique_posts[:20]
+    def extract(self, page, seen):
+        learned = None
+        if page["digest"] is not None:
+            if page["streamed"] is None:
+                # 구조가 바뀜 → 스트림은 이미 다 읽었으므로 다음 실행에서 전체 탐색
+                state_store.save_json(SCHEMA_FILE, None)
+                raise sources.SkipRun("응답 구조가 바뀜 - 스키마를 지우고 다음 실행에서 전체 탐색합니다")
+            final_posts, found_count = finalize_posts(page["streamed"])
+        else:
+            with metrics.stage("parse"):
+                try:
+                    result = page["response"].json()
+                except ValueError:
+                    raise ValueError("응답이 JSON이 아닙니다!")
+                final_posts, found_count, learned = extract_posts(result, page["schema"])
 
+        if learned:
+            state_store.save_json(SCHEMA_FILE, learned)
+            print(f"🧭 스키마 저장: {learned['paths']}")
+        print(f"🔍 발견된 전체 데이터: {found_count}개 (고정+일반 포함)")
         if final_posts:
             print(f"📝 저장 범위: 상단 {final_posts[0]['id']} ... 하단 {final_posts[-1]['id']} (총 {len(final_posts)}개)")
-        
-        old_posts = []
-        if os.path.exists("dorm_data.txt"):
-            with open("dorm_data.txt", "r", encoding="utf-8") as f:
-                old_posts = [line.strip() for line in f.readlines() if line.strip()]
+        return final_posts
 
-        save_data = []
-        
-        # 알림 전송 및 저장
-        for post in final_posts:
-            save_data.append(post["id"])
-            if not old_posts: continue
-            
-            if post["id"] not in old_posts:
-                print(f"🚀 새 기숙사 공지: {post['title']} (ID: {post['id']})")
-                send_telegram(post['title'], post['date'], post['link'])
+    def send_one(self, chat_id, post):
+        return send_telegram(post['title'], post['date'], post['link'], chat_id)
 
-        if not old_posts:
-             print("🚀 첫 실행: 기준점 잡기 완료")
+    def send_digest(self, chat_id, posts):
+        return send_digest(posts, chat_id)
 
-        with open("dorm_data.txt", "w", encoding="utf-8") as f:
-            for pid in save_data:
-                f.write(pid + "\n")
-        
-        print("💾 dorm_data.txt 업데이트 완료")
+    def fetch_body(self, post):
+        return fetch_body(post['id'], post.get('summary'))
+
+    def version(self, post):
+        # API 에 수정일이 있으면 수정일, 첨부 개수가 바뀌어도 수정으로 봄
+        parts = []
+        if post.get('modified'):
+            parts.append(f"수정일 {post['modified']}")
+        if post.get('files') is not None:
+            parts.append(f"첨부 {post['files']}개")
+        return " / ".join(parts) or None
 
-    except Exception as e:
-        print(f"❌ 오류 발생: {e}")
+
+def run():
+    sources.run_source(DormSource())
+    http_client.print_stats()
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,227 @@
+"""
+이미 알린 글의 수정 감지.
+
+글마다 목록에 보이는 "버전"(공지: 수정일, 기숙사: 수정일/첨부 개수)과 본문 해시를
+state/versions_<소스>.json 에 기록해두고,
+- 버전이 그대로인 글 → 아무것도 안 함 (목록 요청 외 비용 없음)
+- 버전이 바뀐 글 → 본문만 다시 받아 해시 비교, 본문이 실제로 바뀌었으면 "수정됨" 메시지
+  (지난 본문이 보관함(archive.py)에 있으면 바뀐 줄도 같이 보여줌)
+
+sources.run_source 가 새 글 처리와 같은 실행 안에서 호출함.
+"""
+import difflib
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import archive
+import metrics
+import state_store
+import telegram_dispatcher
+
+# ▼ 설정 ▼
+EDIT_TRACKING = os.environ.get('EDIT_TRACKING', '1') != '0'
+MAX_FETCH = int(os.environ.get('EDIT_MAX_FETCH', '10'))  # 실행 한 번에 다시 받을 본문 수
+FETCH_WORKERS = int(os.environ.get('EDIT_FETCH_WORKERS', '4'))
+MAX_DIFF_LINES = 3  # 메시지에 보여줄 추가/삭제 줄 수 (각각)
+DIFF_LINE_CHARS = 80
+
+
+def body_hash(body):
+    """ 보관함(archive.py)과 같은 방식 - 보관된 글의 hash 와 바로 비교 가능 """
+    return hashlib.sha256((body or "")[:archive.BODY_LIMIT].encode("utf-8")).hexdigest()
+
+
+EMPTY_HASH = body_hash("")
+
+
+class VersionStore:
+    """ 글 ID → {"version": 목록상 버전, "hash": 본문 해시(모르면 None)} """
+
+    def __init__(self, name):
+        self.file = f"versions_{name}.json"
+        self.entries = state_store.load_json(self.file, {})
+        self.dirty = False
+
+    def get(self, post_id):
+        return self.entries.get(post_id)
+
+    def record(self, post_id, version, hash=None):
+        old = self.entries.get(post_id) or {}
+        entry = {"version": version, "hash": hash or old.get("hash")}
+        if entry != old:
+            self.entries[post_id] = entry
+            self.dirty = True
+
+    def rename(self, canonical):
+        """ ID 를 canonical(ID) 로 바꿈 (이미 새 ID 기록이 있으면 그쪽을 남김). 바뀐 개수 반환 """
+        moved = [post_id for post_id in self.entries if canonical(post_id) != post_id]
+        for post_id in moved:
+            entry = self.entries.pop(post_id)
+            self.entries.setdefault(canonical(post_id), entry)
+        self.dirty = self.dirty or bool(moved)
+        return len(moved)
+
+    def prune(self, seen):
+        """ 본 글 기록(SeenStore)에서 만료된 글은 같이 지움 """
+        stale = [post_id for post_id in self.entries if post_id not in seen]
+        for post_id in stale:
+            del self.entries[post_id]
+        self.dirty = self.dirty or bool(stale)
+        return len(stale)
+
+    def save(self):
+        if self.dirty:
+            state_store.save_json(self.file, self.entries)
+            self.dirty = False
+
+
+def body_changes(old_body, new_body):
+    """ 줄 단위 비교 → (추가된 줄, 삭제된 줄) 각각 최대 MAX_DIFF_LINES 개 """
+    old_lines = [" ".join(line.split()) for line in (old_body or "").splitlines() if line.strip()]
+    new_lines = [" ".join(line.split()) for line in (new_body or "").splitlines() if line.strip()]
+    added, removed = [], []
+    for line in difflib.unified_diff(old_lines, new_lines, lineterm="", n=0):
+        if line.startswith(("+++", "---", "@@")):
+            continue
+        target = added if line.startswith("+") else removed
+        target.append(line[1:][:DIFF_LINE_CHARS])
+    return added, removed
+
+
+def find_edits(source, posts, versions):
+    """
+    posts 중 목록상 버전이 바뀐 글의 본문을 다시 받아서 실제로 바뀐 것만 돌려줌 (기록이 없는 글은 기준만 기록).
+    반환: [{"post", "old_version", "version", "hash", "body", "changes"}]
+    본문 받기에 실패한 글은 버전을 갱신하지 않음 → 다음 실행에서 다시 확인
+    """
+    candidates = []
+    for post in posts:
+        version = source.version(post)
+        if version is None:
+            continue
+        post_id = source.fingerprint(post)
+        entry = versions.get(post_id)
+        if entry is None:
+            # 처음 기록하는 글 (기능을 켠 직후 등) → 기준만 잡음
+            versions.record(post_id, version)
+        elif entry["version"] != version:
+            if source.should_notify_edit(post):
+                candidates.append((post, entry))
+            else:
+                versions.record(post_id, version)
+    if not candidates:
+        return []
+    metrics.count("edit_candidates", len(candidates))
+
+    store = archive.get_archive() if archive.ARCHIVE_ENABLED else None
+    edits = []
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="edit") as pool:
+        futures = [(post, entry, pool.submit(metrics.bind(source.fetch_body), post))
+                   for post, entry in candidates[:MAX_FETCH]]
+        for post, entry, future in futures:
+            post_id = source.fingerprint(post)
+            version = source.version(post)
+            try:
+                body = future.result() or ""
+            except Exception as e:
+                metrics.count("edit_fetch_failed")
+                print(f"⚠️ 수정 확인 실패: {post['title']} ({e})")
+                continue
+
+            old_doc = store.docs.get(archive.doc_key(source.name, post_id)) if store else None
+            if old_doc and not old_doc["body"]:
+                old_doc = None  # 예전에 본문을 못 찾고 빈 본문으로 보관된 글
+            old_hash = entry.get("hash") or (old_doc or {}).get("hash")
+            new_hash = body_hash(body)
+            if old_hash == EMPTY_HASH:
+                # 예전에 빈 본문으로 기록된 기준 → 비교할 수 없으니 이번 본문을 기준으로만 기록
+                versions.record(post_id, version, new_hash)
+                continue
+            if old_hash == new_hash:
+                # 수정일만 바뀌고 본문은 그대로
+                versions.record(post_id, version, new_hash)
+                continue
+            added, removed = body_changes(old_doc["body"], body) if old_doc else ([], [])
+            if old_doc and not (added or removed):
+                # 줄바꿈/공백만 바뀜
+                versions.record(post_id, version, new_hash)
+                continue
+            edits.append({
+                "post": post,
+                "old_version": entry["version"],
+                "version": version,
+                "hash": new_hash,
+                "body": body,
+                "changes": {"added": added, "removed": removed, "known": old_doc is not None},
+            })
+    metrics.count("edits", len(edits))
+    return edits
+
+
+def record_new(source, posts, versions):
+    """
+    이번에 새로 알린 글은 지금 버전을 기준으로 기록.
+    (안 하면 다음에 목록이 바뀔 때 기준을 잡게 되는데, 그 사이에 고친 글은 수정으로 안 보임)
+    """
+    if not EDIT_TRACKING:
+        return
+    for post in posts:
+        version = source.version(post)
+        if version is not None:
+            versions.record(source.fingerprint(post), version)
+
+
+def record_edits(source, edits, versions):
+    """ 전송이 끝난 수정 건을 기준으로 저장 + 보관함 본문도 새 버전으로 """
+    store = archive.get_archive() if archive.ARCHIVE_ENABLED else None
+    for edit in edits:
+        post = edit["post"]
+        post_id = source.fingerprint(post)
+        versions.record(post_id, edit["version"], edit["hash"])
+        if store and source.should_archive(post):
+            store.add(source.name, post_id, post, edit["body"])
+    if store and edits:
+        store.save()
+
+
+# ------------------------------------------------------
+# 메시지 (소스에서 따로 정하지 않으면 이 모양)
+# ------------------------------------------------------
+def build_update_message(label, edit):
+    post = edit["post"]
+    changes = edit["changes"]
+    lines = [f"✏️ <b>[{html.escape(label)} 수정] {html.escape(post['title'])}</b>", ""]
+    lines.append(f"🔄 {html.escape(str(edit['old_version']))} → {html.escape(str(edit['version']))}")
+    lines.extend(f"➕ {html.escape(line)}" for line in changes["added"][:MAX_DIFF_LINES])
+    lines.extend(f"➖ {html.escape(line)}" for line in changes["removed"][:MAX_DIFF_LINES])
+    hidden = max(0, len(changes["added"]) - MAX_DIFF_LINES) + max(0, len(changes["removed"]) - MAX_DIFF_LINES)
+    if hidden:
+        lines.append(f"… 외 {hidden}줄")
+    if not changes["known"]:
+        lines.append("(이전 본문 기록이 없어 바뀐 줄은 알 수 없음)")
+    return "\n".join(lines)
+
+
+def send_update(label, chat_id, edit):
+    keyboard = {"inline_keyboard": [[{"text": "👉 바뀐 내용 보러가기", "url": edit["post"]["link"]}]]}
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id, build_update_message(label, edit),
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=json.dumps(keyboard)
+    )
+
+
+def send_update_digest(label, chat_id, edits):
+    msg = telegram_dispatcher.build_digest(
+        f"✏️ <b>수정된 {html.escape(label)} {len(edits)}건</b>",
+        [(e["post"]["title"], e["post"]["link"]) for e in edits]
+    )
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id, msg,
+        parse_mode="HTML",
+        disable_web_page_preview=True
+    )
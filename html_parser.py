@@ -0,0 +1,125 @@
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# ▼ 설정 ▼
+# auto 면 설치된 것 중 빠른 순서(selectolax → lxml → html.parser)로 고름
+HTML_PARSER = os.environ.get('HTML_PARSER', 'auto')
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+try:
+    import lxml  # noqa: F401  (BeautifulSoup 의 "lxml" 백엔드용)
+    _HAS_LXML = True
+except ImportError:
+    _HAS_LXML = False
+
+
+def available_backends():
+    backends = []
+    if _SelectolaxParser is not None:
+        backends.append("selectolax")
+    if _HAS_LXML:
+        backends.append("lxml")
+    backends.append("html.parser")
+    return backends
+
+
+def default_backend():
+    if HTML_PARSER != "auto" and HTML_PARSER in available_backends():
+        return HTML_PARSER
+    return available_backends()[0]
+
+
+# ------------------------------------------------------
+# 백엔드마다 다른 노드 API를 같은 모양으로 감싸기
+# (select / select_one / text / attr 만 있으면 스크래퍼는 충분함)
+# ------------------------------------------------------
+class SoupNode:
+    __slots__ = ("tag",)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+    def select(self, css):
+        return [SoupNode(t) for t in self.tag.select(css)]
+
+    def select_one(self, css):
+        found = self.tag.select_one(css)
+        return SoupNode(found) if found is not None else None
+
+    def text(self, separator="", strip=False):
+        return self.tag.get_text(separator, strip=strip)
+
+    def attr(self, name, default=None):
+        return self.tag.get(name, default)
+
+
+class LexborNode:
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def select(self, css):
+        return [LexborNode(n) for n in self.node.css(css)]
+
+    def select_one(self, css):
+        found = self.node.css_first(css)
+        return LexborNode(found) if found is not None else None
+
+    def text(self, separator="", strip=False):
+        # BeautifulSoup.get_text 와 같은 규칙: 텍스트 노드를 모아 strip 후 빈 것은 버림
+        parts = []
+        for child in self.node.traverse(include_text=True):
+            if child.tag != "-text":
+                continue
+            value = child.text_content or ""
+            if strip:
+                value = value.strip()
+                if not value:
+                    continue
+            parts.append(value)
+        return separator.join(parts)
+
+    def attr(self, name, default=None):
+        value = self.node.attributes.get(name, default)
+        return default if value is None else value
+
+
+def _strainer(scope):
+    if scope is None:
+        return None
+    if isinstance(scope, str):
+        return SoupStrainer(scope)
+    tag, css_class = scope
+    return SoupStrainer(tag, class_=css_class)
+
+
+def _scope_css(scope):
+    if isinstance(scope, str):
+        return scope
+    tag, css_class = scope
+    return f"{tag}.{css_class}"
+
+
+def parse(markup, scope=None, backend=None):
+    """
+    HTML 을 파싱해서 루트 노드를 돌려줌.
+    scope: 필요한 부분만 파싱할 때 쓰는 필터 - 태그 이름("li") 또는 (태그, 클래스) 튜플
+    """
+    backend = backend or default_backend()
+
+    if backend == "selectolax":
+        tree = _SelectolaxParser(markup)
+        root = tree.root
+        # selectolax 는 C 로 문서 전체를 한 번에 파싱하므로, 범위는 파싱 후 서브트리로 좁힘
+        if scope is not None and not isinstance(scope, str):
+            root = tree.css_first(_scope_css(scope)) or root
+        return LexborNode(root)
+
+    soup = BeautifulSoup(markup, backend, parse_only=_strainer(scope))
+    return SoupNode(soup)
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+
+# SSL 인증서 경고 무시 (학교 사이트들이 verify=False 로만 접속됨)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# ▼ 설정 ▼
+# 모든 스크립트(monitor, dorm_monitor, calendar_bot)가 이 세션 하나를 같이 씀
+POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '10'))  # 유지할 호스트별 풀 개수
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '10'))  # 호스트당 keep-alive 연결 수
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+# 호스트별 카운터: requests = 보낸 요청 수, connections = 새로 맺은 TCP(+TLS) 연결 수
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(host, field):
+    with _stats_lock:
+        entry = _stats.setdefault(host, {"requests": 0, "connections": 0})
+        entry[field] += 1
+
+
+def _counting_pool(pool_cls):
+    """ 새 연결을 만들 때마다 카운트하는 커넥션 풀 클래스 """
+    class CountingPool(pool_cls):
+        def _new_conn(self):
+            _count(self.host, "connections")
+            return super()._new_conn()
+
+    CountingPool.__name__ = f"Counting{pool_cls.__name__}"
+    return CountingPool
+
+
+_POOL_CLASSES = {
+    "http": _counting_pool(HTTPConnectionPool),
+    "https": _counting_pool(HTTPSConnectionPool),
+}
+
+
+class PooledAdapter(HTTPAdapter):
+    """ 호스트별 keep-alive 풀을 쓰면서 요청/연결 수를 세는 어댑터 """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _POOL_CLASSES
+
+    def send(self, request, **kwargs):
+        _count(urlparse(request.url).hostname, "requests")
+        return super().send(request, **kwargs)
+
+
+def _build_session(pool_connections, pool_maxsize, headers):
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+def configure(pool_connections=None, pool_maxsize=None, headers=None):
+    """ 풀 크기/기본 헤더를 바꿔서 공유 세션을 새로 만듦 """
+    global _session
+    merged_headers = dict(DEFAULT_HEADERS)
+    if headers:
+        merged_headers.update(headers)
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = _build_session(
+            pool_connections or POOL_CONNECTIONS,
+            pool_maxsize or POOL_MAXSIZE,
+            merged_headers,
+        )
+    return _session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE, DEFAULT_HEADERS)
+    return _session
+
+
+def request(method, url, **kwargs):
+    start = time.perf_counter()
+    status = None
+    nbytes = 0
+    try:
+        res = get_session().request(method, url, **kwargs)
+        status = res.status_code
+        if kwargs.get("stream"):
+            # 본문은 호출한 쪽에서 나중에 읽음 → 헤더 기준
+            nbytes = int(res.headers.get("Content-Length") or 0)
+        else:
+            nbytes = len(res.content)
+        return res
+    finally:
+        # 실행 계측 중이면 호스트별 상태 코드/바이트/대기 시간 기록
+        metrics.record_http(url, status, nbytes, time.perf_counter() - start)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def stats():
+    """ 호스트별 요청 수, 새 연결 수, 재사용 횟수 """
+    with _stats_lock:
+        result = {}
+        for host, entry in _stats.items():
+            result[host] = dict(entry, reused=max(entry["requests"] - entry["connections"], 0))
+        return result
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def print_stats():
+    for host, entry in stats().items():
+        print(f"🔌 {host}: 요청 {entry['requests']}회 / 새 연결 {entry['connections']}회 / 재사용 {entry['reused']}회")
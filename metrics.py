@@ -0,0 +1,299 @@
+"""
+실행 계측: 단계별 시간(fetch/parse/diff/send/state), HTTP 상태/바이트, 개수, 재시도 횟수.
+
+실행이 끝나면
+- METRICS_DIR/runs.jsonl 에 한 줄 추가 (실행 기록)
+- METRICS_DIR/<작업>.prom 을 덮어씀 (Prometheus node_exporter textfile 형식, 마지막 실행 값)
+
+METRICS_PROFILE=cprofile,tracemalloc 를 주면 실행 중 프로파일링도 함
+(cProfile 결과는 METRICS_DIR/<작업>-<시각>.prof, 상위 함수/할당 위치는 로그에 출력).
+
+사용법:
+    @metrics.instrument("notice")
+    def run():
+        with metrics.stage("fetch"):
+            ...
+        metrics.count("items", len(posts))
+"""
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlparse
+
+import state_store
+
+# ▼ 설정 ▼
+METRICS_DIR = os.environ.get('METRICS_DIR', 'metrics')
+METRICS_ENABLED = os.environ.get('METRICS', '1') != '0'
+PROFILE = {p.strip() for p in os.environ.get('METRICS_PROFILE', '').split(",") if p.strip()}
+PROFILE_TOP = 15
+PREFIX = "webmon"
+# 텔레그램 API 주소의 봇 토큰 (requests 예외 메시지에 URL 이 그대로 들어감)
+TOKEN_PATTERN = re.compile(r"/bot[^/\s'\"]+")
+
+_current = contextvars.ContextVar("metrics_run", default=None)
+
+
+class Run:
+    """ 실행 한 번의 기록. 여러 스레드에서 같이 쓰므로 잠금으로 보호 """
+
+    def __init__(self, job):
+        self.job = job
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+        self.stages = {}
+        self.counters = {}
+        self.http = {}
+        self.stale = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def record_http(self, host, status, nbytes, seconds):
+        with self.lock:
+            entry = self.http.setdefault(host, {"requests": 0, "bytes": 0, "seconds": 0.0, "status": {}})
+            entry["requests"] += 1
+            entry["bytes"] += nbytes
+            entry["seconds"] += seconds
+            key = str(status or "error")
+            entry["status"][key] = entry["status"].get(key, 0) + 1
+
+    def mark_stale(self, source, reason):
+        with self.lock:
+            self.stale[source] = reason
+
+    def fail(self, error):
+        """ runs.jsonl 은 Actions 아티팩트로 올라가므로 (비밀값 가림 처리가 안 됨) 예외는 종류와 가린 메시지만 """
+        self.status = "error"
+        if isinstance(error, BaseException):
+            error = f"{type(error).__name__}: {error}"
+        self.error = redact(str(error))
+
+    def to_dict(self):
+        return {
+            "job": self.job,
+            "started_at": round(self.started_at, 3),
+            "duration": round(self.duration or 0.0, 4),
+            "status": self.status,
+            "error": self.error,
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "counters": self.counters,
+            "http": {host: dict(entry, seconds=round(entry["seconds"], 4)) for host, entry in self.http.items()},
+            "stale": self.stale,
+        }
+
+    def summary(self):
+        stages = " / ".join(f"{k} {v:.2f}s" for k, v in self.stages.items())
+        total_bytes = sum(h["bytes"] for h in self.http.values())
+        line = f"📊 [{self.job}] {self.duration:.2f}초 ({stages or '-'}) / 받은 데이터 {total_bytes / 1024:.0f}KB"
+        if self.stale:
+            line += "\n⚠️ 최신이 아닌 데이터: " + ", ".join(f"{k} ({v})" for k, v in self.stale.items())
+        return line
+
+
+# ------------------------------------------------------
+# 현재 실행에 기록 (실행 밖에서 부르면 아무것도 안 함)
+# ------------------------------------------------------
+def current():
+    return _current.get()
+
+
+def stage(name):
+    run = _current.get()
+    return run.stage(name) if run else nullcontext()
+
+
+def count(key, n=1):
+    run = _current.get()
+    if run:
+        run.count(key, n)
+
+
+def stale(source, reason):
+    """ 이번 실행에서 source 를 새로 못 받아서 예전 데이터를 쓰거나 건너뜀 """
+    run = _current.get()
+    if run:
+        run.mark_stale(source, reason)
+
+
+def fail(error):
+    run = _current.get()
+    if run:
+        run.fail(error)
+
+
+def record_http(url, status, nbytes, seconds):
+    run = _current.get()
+    if run:
+        run.record_http(urlparse(url).hostname, status, nbytes, seconds)
+
+
+def bind(func):
+    """
+    스레드 풀에 넘길 함수에 지금 실행을 같이 넘김 (contextvars 는 스레드로 자동 전달되지 않음).
+    submit 할 때마다 새로 불러야 함 (같은 context 를 두 스레드가 동시에 쓸 수 없음)
+    """
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, func)
+
+
+def redact(text):
+    """ 로그/기록에 남길 문자열에서 봇 토큰을 가림 """
+    text = TOKEN_PATTERN.sub("/bot***", text)
+    token = os.environ.get('TELEGRAM_TOKEN')
+    return text.replace(token, "***") if token else text
+
+
+def percentile(samples, q):
+    """ 표본에서 q(0~1) 분위 값 (봇 응답 시간, 벤치마크 p99 에 같이 씀). 표본이 없으면 None """
+    samples = sorted(samples)
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+# ------------------------------------------------------
+# 실행 단위
+# ------------------------------------------------------
+@contextmanager
+def run(job):
+    record = Run(job)
+    token = _current.set(record)
+    profiler = _start_profiling()
+    try:
+        yield record
+    except BaseException as e:
+        # 실행 중 exit(1) 로 끝나면 SystemExit 도 실패로 기록 (exit(0) 은 제외)
+        if not (isinstance(e, SystemExit) and not e.code):
+            record.fail(e)
+        raise
+    finally:
+        _current.reset(token)
+        record.duration = time.perf_counter() - record._start
+        _stop_profiling(profiler, record)
+        if METRICS_ENABLED:
+            try:
+                export(record)
+            except OSError as e:
+                print(f"⚠️ 계측 결과 저장 실패: {e}")
+        print(record.summary())
+
+
+def instrument(job):
+    """ run() 함수 전체를 실행 하나로 기록하는 데코레이터 """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run(job):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------
+# 내보내기
+# ------------------------------------------------------
+_export_lock = threading.Lock()
+
+
+def export(record):
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    line = json.dumps(record.to_dict(), ensure_ascii=False, sort_keys=True)
+    with _export_lock:
+        with open(os.path.join(METRICS_DIR, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    state_store.atomic_write_text(os.path.join(METRICS_DIR, f"{record.job}.prom"), prometheus_text(record))
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_text(record):
+    job = record.job
+    metrics = [
+        ("run_timestamp_seconds", "Start time of the last run", [(_labels(job=job), record.started_at)]),
+        ("run_duration_seconds", "Wall time of the last run", [(_labels(job=job), record.duration or 0.0)]),
+        ("run_success", "1 if the last run finished without error", [(_labels(job=job), int(record.status == "ok"))]),
+        ("stage_seconds", "Time spent per stage in the last run (summed across threads)",
+         [(_labels(job=job, stage=k), v) for k, v in sorted(record.stages.items())]),
+        ("items", "Counters recorded during the last run",
+         [(_labels(job=job, kind=k), v) for k, v in sorted(record.counters.items())]),
+        ("stale", "1 for each source served from old data (or skipped) in the last run",
+         [(_labels(job=job, source=k), 1) for k in sorted(record.stale)]),
+        ("http_requests", "HTTP requests in the last run by host and status",
+         [(_labels(job=job, host=host, status=status), n)
+          for host, entry in sorted(record.http.items()) for status, n in sorted(entry["status"].items())]),
+        ("http_bytes", "Response bytes downloaded in the last run",
+         [(_labels(job=job, host=host), entry["bytes"]) for host, entry in sorted(record.http.items())]),
+        ("http_seconds", "Time spent waiting on HTTP in the last run (summed across threads)",
+         [(_labels(job=job, host=host), entry["seconds"]) for host, entry in sorted(record.http.items())]),
+    ]
+    lines = []
+    for name, help_text, samples in metrics:
+        if not samples:
+            continue
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {PREFIX}_{name} gauge")
+        lines.extend(f"{PREFIX}_{name}{labels} {value}" for labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------------------------------
+# 프로파일링 (METRICS_PROFILE)
+# ------------------------------------------------------
+def _start_profiling():
+    profiler = {}
+    if "cprofile" in PROFILE:
+        import cProfile
+        profiler["cprofile"] = cProfile.Profile()
+        profiler["cprofile"].enable()
+    if "tracemalloc" in PROFILE:
+        import tracemalloc
+        # 데몬에서 다른 작업이 이미 추적 중이면 건드리지 않음
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            profiler["tracemalloc"] = tracemalloc
+    return profiler
+
+
+def _stop_profiling(profiler, record):
+    if "cprofile" in profiler:
+        import pstats
+        prof = profiler["cprofile"]
+        prof.disable()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{record.job}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        prof.dump_stats(path)
+        print(f"🔬 cProfile 저장: {path} (호출한 스레드만 측정됨)")
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+    if "tracemalloc" in profiler:
+        tracemalloc = profiler["tracemalloc"]
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        record.counters["peak_alloc_bytes"] = peak
+        print(f"🔬 최대 메모리 할당 {peak / 1024:.0f}KB, 상위 위치:")
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+            print(f"   {stat}")
@@ -1,174 +1,391 @@
 import os
-import requests
+import re
 import json # [NEW] 버튼 기능을 위해 추가
-from bs4 import BeautifulSoup
-import urllib3
-
-# SSL 인증서 경고 무시
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+import html_parser
+import metrics
+import notice_rules
+import request_policy
+import sources
+import state_store
+import telegram_dispatcher
 
 # ▼ 설정 ▼
 TARGET_URL = "https://www.kw.ac.kr/ko/life/notice.jsp"
-TOKEN = os.environ.get('TELEGRAM_TOKEN')
 CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
 
+# 밀린 글 확인: 한 번에 최대 몇 페이지까지, 몇 페이지씩 미리 요청할지
+MAX_PAGES = int(os.environ.get('NOTICE_MAX_PAGES', '5'))
+PIPELINE_DEPTH = int(os.environ.get('NOTICE_PIPELINE_DEPTH', '2'))
+# 밀린 글을 읽다가 다음 페이지를 못 받았을 때, 읽은 페이지 수 (다음 실행은 그 페이지까지 멈추지 않고 다시 읽음)
+CATCHUP_FILE = "notice_catchup.json"
+TPAGE_PATTERN = re.compile(r"([?&]tpage=)\d+")
+# 글 고유 번호 - 목록 위치/검색 조건(tpage, searchKey, srCategoryId ...)이나 제목이 바뀌어도 그대로
+DUID_PATTERN = re.compile(r"[?&]DUID=(\d+)")
+# 글 보기 페이지의 본문 영역 (앞에서부터 찾음)
+BODY_SELECTORS = (".board-view-box .contents", ".board-view-box", ".board-view")
+
 # ------------------------------------------------------
 # 1. 키워드별 이모지 매핑
 # ------------------------------------------------------
+# 키워드/순서는 notice_rules.json 에서 관리 (notice_rules.py 참고)
 def get_emoji(title):
-    if "장학" in title or "대출" in title: return "💰" 
-    elif "학사" in title or "수업" in title or "복학" in title: return "📅" 
-    elif "행사" in title or "축제" in title or "특강" in title: return "🎉" 
-    elif "채용" in title or "모집" in title or "인턴" in title: return "👔" 
-    elif "국제" in title or "교환" in title: return "✈️" 
-    elif "봉사" in title: return "❤️" 
-    elif "대회" in title or "공모" in title: return "🏆" 
-    else: return "📢" 
+    return notice_rules.get_engine().classify(title)["emoji"]
 
 # ------------------------------------------------------
 # 2. 텔레그램 전송 함수 (버튼 추가)
 # ------------------------------------------------------
-def send_telegram(title, link, info):
-    if TOKEN and CHAT_ID:
-        try:
-            icon = get_emoji(title)
-            # 대괄호가 마크다운 링크 문법이랑 겹쳐서 깨지는 걸 방지
-            safe_title = title
-            
-            # [수정] 텍스트 링크([👉 공지 바로가기]...)를 제거하고 본문만 남김
-            msg = f"{icon} *{safe_title}*\n" \
-                  f"\n" \
-                  f"{info}"
-            
-            url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-            
-            # [NEW] 버튼 생성
-            keyboard = {
-                "inline_keyboard": [
-                    [
-                        {"text": "👉 공지 내용 보러가기", "url": link}
-                    ]
-                ]
-            }
-
-            payload = {
-                "chat_id": CHAT_ID,
-                "text": msg,
-                "parse_mode": "Markdown",
-                "reply_markup": json.dumps(keyboard) # 버튼 데이터 추가
-            }
-            requests.post(url, data=payload)
-        except Exception as e:
-            print(f"텔레그램 전송 실패: {e}")
-
-def run():
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
+def send_telegram(title, link, info, icon=None, chat_id=None):
+    """ 전송 큐에 넣고 Future 를 돌려줌 (결과는 telegram_dispatcher 참고) """
+    icon = icon or get_emoji(title)
+    # 대괄호가 마크다운 링크 문법이랑 겹쳐서 깨지는 걸 방지
+    safe_title = title
+    
+    # [수정] 텍스트 링크([👉 공지 바로가기]...)를 제거하고 본문만 남김
+    msg = f"{icon} *{safe_title}*\n" \
+          f"\n" \
+          f"{info}"
+    
+    # [NEW] 버튼 생성
+    keyboard = {
+        "inline_keyboard": [
+            [
+                {"text": "👉 공지 내용 보러가기", "url": link}
+            ]
+        ]
     }
 
-    try:
-        print(f"접속 시도: {TARGET_URL}")
-        response = requests.get(TARGET_URL, headers=headers, verify=False, timeout=30)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        items = soup.select(".board-list-box ul li")[:50]
-        current_new_posts = []
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id or CHAT_ID, msg,
+        parse_mode="Markdown",
+        reply_markup=json.dumps(keyboard) # 버튼 데이터 추가
+    )
 
-        print(f"🔍 스캔 중... ({len(items)}개)")
+def send_digest(posts, chat_id=None):
+    """ 새 글이 한꺼번에 많을 때 - 목록 하나로 묶어서 전송 """
+    msg = telegram_dispatcher.build_digest(
+        f"📢 <b>새 공지 {len(posts)}건</b>",
+        [(p['title'], p['link']) for p in posts]
+    )
+    keyboard = {"inline_keyboard": [[{"text": "📢 전체 공지사항", "url": TARGET_URL}]]}
+    return telegram_dispatcher.get_dispatcher().submit(
+        chat_id or CHAT_ID, msg,
+        parse_mode="HTML",
+        disable_web_page_preview=True,
+        reply_markup=json.dumps(keyboard)
+    )
 
-        for item in items:
-            if "신규게시글" not in item.get_text():
-                continue
+# ------------------------------------------------------
+# 3. 변경 감지용 영역 (공지 목록 부분만 비교)
+# ------------------------------------------------------
+# 조회수는 매번 바뀌므로 빼고, 글마다 (DUID, 제목, 작성일, 수정일) 만 비교 - 파서 없이 문자열로 찾음
+ITEM_ANCHOR_PATTERN = re.compile(r'<a href="([^"]*)"[^>]*>(.*?)</a>', re.S)
+ITEM_DATE_PATTERN = re.compile(r'<span>(작성일|수정일)</span>\s*<span>([^<]*)</span>')
+TAG_PATTERN = re.compile(r"<[^>]+>")
 
-            a_tag = item.select_one("div.board-text > a")
-            info_tag = item.select_one("p.info") 
+def notice_region(page_text):
+    start = page_text.find("board-list-box")
+    if start == -1:
+        return page_text
+    end = page_text.find("</ul>", start)
+    region = page_text[start:end] if end != -1 else page_text[start:]
+    items = []
+    for chunk in region.split("<li")[1:]:
+        anchor = ITEM_ANCHOR_PATTERN.search(chunk)
+        if not anchor:
+            continue
+        duid = DUID_PATTERN.search(anchor.group(1).replace("&amp;", "&"))
+        title = " ".join(TAG_PATTERN.sub(" ", anchor.group(2)).split())
+        dates = dict(ITEM_DATE_PATTERN.findall(chunk))
+        items.append("\t".join((duid.group(1) if duid else anchor.group(1), title,
+                                 dates.get("작성일", ""), dates.get("수정일", ""))))
+    # 구조를 못 알아보면 영역 전체 (조회수가 섞여서 빠른 경로는 덜 타지만 놓치지는 않음)
+    return "\n".join(items) if items else region
 
-            # 교수지원팀 필터링
-            if info_tag and "교수지원팀" in info_tag.get_text():
+# ------------------------------------------------------
+# 4. 작성자/작성일 정보 정리 (조회수, 수정일은 뺌)
+# ------------------------------------------------------
+def parse_info_meta(raw_text):
+    parts = raw_text.split("|")
+    clean_parts = []
+    skip_next = False
+    for part in parts:
+        p = part.strip()
+        if not p: continue
+        if "수정일" in p:
+            skip_next = True
+            continue
+        if skip_next:
+            if any(char.isdigit() for char in p):
+                skip_next = False
                 continue
+            else:
+                skip_next = False
+        if "조회" in p: continue
+        clean_parts.append(p)
+    
+    final_parts = []
+    idx = 0
+    while idx < len(clean_parts):
+        current = clean_parts[idx]
+        if "작성일" in current and idx + 1 < len(clean_parts):
+            final_parts.append(f"{current} {clean_parts[idx+1]}")
+            idx += 2
+        else:
+            final_parts.append(current)
+            idx += 1
+    
+    if final_parts:
+        return "| " + " | ".join(final_parts)
+    return ""
 
-           
-            if info_tag and "국제학생" in info_tag.get_text():
-                continue 
-
-            if a_tag:
-                raw_title = " ".join(a_tag.get_text().split())
-                clean_title = raw_title.replace("신규게시글", "").replace("Attachment", "").strip()
-                
-                link = a_tag.get('href')
-                full_link = f"https://www.kw.ac.kr{link}" if link else TARGET_URL
-                
-                meta_info = ""
-                if info_tag:
-                    raw_text = info_tag.get_text("|", strip=True)
-                    parts = raw_text.split("|")
-                    clean_parts = []
-                    skip_next = False
-                    for part in parts:
-                        p = part.strip()
-                        if not p: continue
-                        if "수정일" in p:
-                            skip_next = True
-                            continue
-                        if skip_next:
-                            if any(char.isdigit() for char in p):
-                                skip_next = False
-                                continue
-                            else:
-                                skip_next = False
-                        if "조회" in p: continue
-                        clean_parts.append(p)
-                    
-                    final_parts = []
-                    idx = 0
-                    while idx < len(clean_parts):
-                        current = clean_parts[idx]
-                        if "작성일" in current and idx + 1 < len(clean_parts):
-                            final_parts.append(f"{current} {clean_parts[idx+1]}")
-                            idx += 2
-                        else:
-                            final_parts.append(current)
-                            idx += 1
-                    
-                    if final_parts:
-                        meta_info = "| " + " | ".join(final_parts)
-
-                fingerprint = f"{clean_title}|{full_link}"
-                
-                current_new_posts.append({
-                    "id": fingerprint,
-                    "title": clean_title,
-                    "link": full_link,
-                    "info": meta_info
-                })
-
-        old_posts = []
-        if os.path.exists("data.txt"):
-            with open("data.txt", "r", encoding="utf-8") as f:
-                old_posts = [line.strip() for line in f.readlines() if line.strip()]
-
-        save_data = []
-        for post in current_new_posts:
-            save_data.append(post["id"])
-            
-            if not old_posts:
-                continue
-            
-            if post["id"] not in old_posts:
-                print(f"🚀 새 공지: {post['title']}")
-                send_telegram(post['title'], post['link'], post['info'])
+def parse_info_dates(raw_text):
+    """ "작성일|2026-10-17|수정일|2026-10-18|..." → {"posted": ..., "modified": ...} (수정 감지용) """
+    parts = [p.strip() for p in raw_text.split("|")]
+    dates = {"posted": None, "modified": None}
+    for label, key in (("작성일", "posted"), ("수정일", "modified")):
+        if label in parts:
+            idx = parts.index(label)
+            if idx + 1 < len(parts):
+                dates[key] = parts[idx + 1]
+    return dates
 
-        if not old_posts:
-             print("🚀 첫 실행: 기준점 잡기 완료")
+# ------------------------------------------------------
+# 5. 목록 HTML → 글 목록 (네트워크 없이 호출 가능)
+# ------------------------------------------------------
+def page_independent_link(link):
+    """ 몇 페이지에서 봤든 같은 글이면 같은 링크가 되도록 tpage 를 1로 고정 """
+    return TPAGE_PATTERN.sub(r"\g<1>1", link)
 
-        with open("data.txt", "w", encoding="utf-8") as f:
-            for pid in save_data:
-                f.write(pid + "\n")
+def post_id(title, link):
+    """ 글 ID = 링크의 DUID (DUID 가 없는 링크면 예전처럼 제목|링크) """
+    match = DUID_PATTERN.search(link)
+    return match.group(1) if match else f"{title}|{link}"
+
+def extract_page(page_html, backend=None):
+    """
+    목록의 모든 글. 알림 대상 여부는 is_new(신규게시글 표시), excluded(부서 필터)로 표시.
+    (어디까지 읽었는지 판단하려면 알림 대상이 아닌 글도 필요함)
+    """
+    with metrics.stage("parse"):
+        return _extract_page(page_html, backend)
+
+def _extract_page(page_html, backend):
+    # 공지 목록 영역만 파싱 (헤더/메뉴/스크립트는 건너뜀)
+    root = html_parser.parse(page_html, scope=("div", "board-list-box"), backend=backend)
+    items = root.select(".board-list-box ul li")[:50]
+    engine = notice_rules.get_engine()
+    page_posts = []
+
+    for item in items:
+        a_tag = item.select_one("div.board-text > a")
+        if not a_tag:
+            continue
+
+        is_new = "신규게시글" in item.text()
+        info_tag = item.select_one("p.info") 
+        info_text = info_tag.text() if info_tag else ""
+
+        raw_title = " ".join(a_tag.text().split())
+        clean_title = raw_title.replace("신규게시글", "").replace("Attachment", "").strip()
+
+        # 카테고리(이모지) + 부서 필터(교수지원팀 / 국제학생 등)를 한 번에
+        rule = engine.classify(clean_title, info_text)
+        excluded = rule["excluded"]
+        
+        link = a_tag.attr('href')
+        full_link = page_independent_link(f"https://www.kw.ac.kr{link}") if link else TARGET_URL
         
-        print("💾 data.txt 업데이트 완료")
+        meta_info = ""
+        dates = {"posted": None, "modified": None}
+        if info_tag:
+            raw_info = info_tag.text("|", strip=True)
+            dates = parse_info_dates(raw_info)
+            if is_new and not excluded:
+                meta_info = parse_info_meta(raw_info)
+
+        page_posts.append({
+            "id": post_id(clean_title, full_link),
+            "title": clean_title,
+            "link": full_link,
+            "info": meta_info,
+            "is_new": is_new,
+            "excluded": excluded,
+            "category": rule["category"],
+            "emoji": rule["emoji"],
+            "date": dates["posted"],
+            "modified": dates["modified"]
+        })
+
+    return page_posts
+
+def extract_posts(page_html, backend=None):
+    """ 알림 대상만: 신규게시글 표시가 있고 필터에 안 걸린 글 """
+    return [p for p in extract_page(page_html, backend) if p["is_new"] and not p["excluded"]]
+
+# ------------------------------------------------------
+# 6. 여러 페이지 이어 읽기 (이미 아는 글이 나올 때까지)
+# ------------------------------------------------------
+def fetch_page(page):
+    with metrics.stage("fetch"):
+        response = request_policy.get(TARGET_URL, params={"tpage": page}, hedge=True, verify=False)
+    return response.text
+
+def reached_known(page_posts, seen):
+    """
+    이 페이지에서 멈춰도 되는지.
+    - 맨 아래(가장 오래된) 글을 이미 알고 있음 → 다음 페이지는 전부 더 오래된 글
+      (상단 고정 공지는 매 페이지에 있을 수 있어서 맨 아래 글로 판단)
+    - 신규게시글이 하나도 없음 → 다음 페이지도 알림 대상이 없음
+    """
+    if not page_posts:
+        return True
+    if page_posts[-1]["id"] in seen:
+        return True
+    return not any(p["is_new"] for p in page_posts)
 
-    except Exception as e:
-        print(f"❌ 오류 발생: {e}")
+def crawl(first_page_html, seen, max_pages=None, depth=None, resume=0):
+    """
+    1페이지부터 시작해 이미 아는 글이 나올 때까지 tpage 를 넘기며 읽음.
+    다음 페이지 요청은 depth 개씩 미리 보내두고(파이프라인), 최대 max_pages 페이지까지만.
+    resume: 지난 실행이 중간에 끊긴 페이지 수 - 그 페이지까지는 아는 글이 나와도 멈추지 않음
+            (끊기기 전에 읽은 글은 이미 "본 글"이라서 멈춤 조건만 보면 뒤 페이지를 영영 안 읽음)
+    2페이지부터 받기에 실패하면(서킷 브레이커 포함) 거기까지 읽은 글만 돌려줌 - 1페이지 새 글 알림은 그대로 감
+    반환: (중복 제거된 글 목록, 읽은 페이지 수, 끝까지 읽었는지)
+    """
+    max_pages = max_pages or MAX_PAGES
+    depth = depth or PIPELINE_DEPTH
+
+    posts = {}
+    page_posts = extract_page(first_page_html)
+    pages_read = 1
+    # 첫 실행(기준점 잡기)에는 1페이지만
+    if not len(seen) or (reached_known(page_posts, seen) and pages_read > resume) or max_pages <= 1:
+        return page_posts, pages_read, True
+
+    for post in page_posts:
+        posts.setdefault(post["id"], post)
+
+    pool = ThreadPoolExecutor(max_workers=depth)
+    in_flight = deque()
+    next_page = 2
+    complete = True
+    try:
+        while True:
+            while next_page <= max_pages and len(in_flight) < depth:
+                in_flight.append(pool.submit(metrics.bind(fetch_page), next_page))
+                next_page += 1
+            if not in_flight:
+                print(f"📚 최대 {max_pages}페이지까지만 확인함")
+                break
+
+            try:
+                page_html = in_flight.popleft().result()
+            except Exception as e:
+                print(f"⚠️ {pages_read + 1}페이지 받기 실패 - {pages_read}페이지까지 읽은 글만 확인 ({e})")
+                metrics.stale(f"notice {pages_read + 1}페이지", "받기 실패 - 다음 실행에서 이어서 읽음")
+                complete = False
+                break
+            page_posts = extract_page(page_html)
+            pages_read += 1
+            for post in page_posts:
+                posts.setdefault(post["id"], post)
+            if reached_known(page_posts, seen) and pages_read > resume:
+                break
+    finally:
+        for future in in_flight:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+    print(f"📚 밀린 글 확인: {pages_read}페이지 읽음")
+    return list(posts.values()), pages_read, complete
+
+# ------------------------------------------------------
+# 7. 글 본문 (검색 보관함용, archive.py)
+# ------------------------------------------------------
+def extract_body(view_html, backend=None):
+    """ 글 보기 페이지 → 본문 텍스트 (본문 영역을 못 찾으면 빈 문자열) """
+    root = html_parser.parse(view_html, backend=backend)
+    for css in BODY_SELECTORS:
+        node = root.select_one(css)
+        if node is not None:
+            return node.text("\n", strip=True)
+    return ""
+
+def fetch_body(link):
+    """ 본문을 못 찾으면 예외 - 빈 본문으로 보관되면 다시 받지 않고, 수정 비교도 "" 끼리 하게 됨 """
+    response = request_policy.get(link, verify=False)
+    response.raise_for_status()
+    body = extract_body(response.text)
+    if not body:
+        raise ValueError("본문 영역을 찾지 못함")
+    return body
+
+# ------------------------------------------------------
+# 소스 플러그인 (sources.py 가 변경 감지/비교/전송/저장을 맡음)
+# ------------------------------------------------------
+@sources.register
+class NoticeSource(sources.Source):
+    name = "notice"
+    label = "공지"
+    legacy_path = "data.txt"
+
+    def fetch(self, detector):
+        print(f"접속 시도: {TARGET_URL}")
+        return request_policy.get(TARGET_URL, headers=detector.request_headers(), hedge=True, verify=False)
+
+    def is_unchanged(self, response, detector):
+        # 지난 실행에서 밀린 글을 다 못 읽었으면 목록이 그대로여도 이어서 읽음
+        return detector.is_unchanged(response, notice_region) and not state_store.load_json(CATCHUP_FILE, 0)
+
+    def extract(self, response, seen):
+        resume = state_store.load_json(CATCHUP_FILE, 0)
+        all_posts, pages_read, complete = crawl(response.text, seen, resume=resume)
+        # 읽지 못한 페이지의 글은 "본 글"로 기록되지 않으므로, 다음 실행에서 여기까지 다시 읽고 이어감
+        left = 0 if complete else max(resume, pages_read)
+        if left != resume:
+            state_store.save_json(CATCHUP_FILE, left)
+        marked = sum(1 for p in all_posts if self.should_notify(p))
+        print(f"🔍 스캔 완료: {len(all_posts)}개 중 새 글 표시 {marked}개 ({pages_read}페이지)")
+        metrics.count("pages", pages_read)
+        return all_posts
+
+    def should_notify(self, post):
+        return post["is_new"] and not post["excluded"]
+
+    def subscription_tags(self, post):
+        return (post['category'],)
+
+    def canonical_id(self, stored_id):
+        # 예전 ID "제목|링크" → DUID
+        if "|" not in stored_id:
+            return stored_id
+        title, _, link = stored_id.rpartition("|")
+        return post_id(title, link)
+
+    def send_one(self, chat_id, post):
+        return send_telegram(post['title'], post['link'], post['info'], post['emoji'], chat_id)
+
+    def send_digest(self, chat_id, posts):
+        return send_digest(posts, chat_id)
+
+    def should_archive(self, post):
+        # 필터에 걸리는 부서 공지는 본문까지 받을 필요 없음
+        return not post["excluded"]
+
+    def fetch_body(self, post):
+        return fetch_body(post["link"])
+
+    def version(self, post):
+        return f"수정일 {post['modified']}" if post.get("modified") else None
+
+
+def run():
+    ok = sources.run_source(NoticeSource())
+    http_client.print_stats()
+    if not ok:
         exit(1)
 
 if __name__ == "__main__":
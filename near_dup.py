@@ -0,0 +1,250 @@
+"""
+여러 소스에 올라온 같은 공지는 한 번만 알림 (거의 같은 글 찾기).
+
+학교 공지와 행복기숙사에 같은 안내가 말머리만 다르게 ([학사] / [필독] 등) 올라오면 둘 다 알리지 않도록,
+새 글마다 제목의 MinHash 서명을 state/near_dup.json 에 기록해두고 다른 소스의 최근 글과 비교함.
+
+- 서명: 말머리를 뗀 제목의 토큰(archive.tokenize, 한글 바이그램) 집합 → 해시 NUM_HASHES 개 각각의 최솟값
+- 색인: 서명을 BANDS 개 구간으로 나눠 (구간 번호, 구간 값) → 글 (LSH).
+  한 구간이라도 같은 글만 후보로 꺼내므로 기록이 늘어도 새 글 하나 확인하는 비용은 거의 그대로
+- 후보는 제목 토큰으로 정확히 다시 비교(자카드 유사도). 제목의 숫자(연도, 학기, 차수 등)가 다르면 다른 글.
+  TITLE_THRESHOLD 이상이면
+  본문(상대 글은 보관함 본문, 새 글은 받아서)이 BODY_THRESHOLD 이상 같을 때 중복.
+  상대 본문이 아직 없으면 제목이 STRICT_THRESHOLD 이상이고 토큰이 MIN_TOKENS 개 이상일 때만 중복
+- 다른 소스의 글과만 비교 (같은 게시판의 "1차/2차 신청 안내"처럼 제목이 비슷한 글은 따로 알림)
+- 중복으로 본 글도 상대 글을 못 받은 채팅방(구독 조건이 다른 경우)에는 그대로 보냄
+- 중복으로 본 글은 다른 글의 원본이 되지 않음 (원본 전송이 실패해서 다음 실행에 다시 보낼 때 같이 막히지 않게)
+- 본문 비교가 필요한 후보는 (전송 전에) 본문을 동시에 받고, 받은 본문은 보관함에 그대로 넘겨서 다시 받지 않음
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import archive
+import metrics
+import state_store
+
+# ▼ 설정 ▼
+NEAR_DUP = os.environ.get('NEAR_DUP', '1') != '0'
+NEAR_DUP_FILE = "near_dup.json"
+WINDOW_DAYS = float(os.environ.get('NEAR_DUP_WINDOW_DAYS', '30'))  # 이 기간 안에 올라온 글끼리만 비교
+NUM_HASHES = 48
+BANDS = 12  # 구간당 4개 → 자카드 0.7 인 글은 96%, 0.3 인 글은 9% 확률로 후보가 됨
+TITLE_THRESHOLD = 0.7
+STRICT_THRESHOLD = 0.9
+BODY_THRESHOLD = 0.6
+MIN_TOKENS = 4
+
+# 제목 앞의 말머리: [학사], (필독), 【공지】 ...
+PREFIX_PATTERN = re.compile(r"^(\s*[\[(【<][^\])】>]*[\])】>])+")
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20261018)  # 서명이 파일에 저장되므로 실행마다 같은 해시를 써야 함
+_PARAMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_HASHES)]
+
+
+def title_tokens(title):
+    return set(archive.tokenize(PREFIX_PATTERN.sub("", title or "")))
+
+
+def numbers(tokens):
+    return {t for t in tokens if any(c.isdigit() for c in t)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def signature(tokens):
+    """ 토큰 집합 → MinHash 서명 (토큰이 없으면 None) """
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "big") for t in tokens]
+    if not hashes:
+        return None
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PARAMS]
+
+
+def bands(sig):
+    rows = NUM_HASHES // BANDS
+    return [(band, tuple(sig[band * rows:(band + 1) * rows])) for band in range(BANDS)]
+
+
+class NearDupIndex:
+    """ 글 키(archive.doc_key) → {source, id, title, link, tags, sig, at, dup} + LSH 구간 색인 """
+
+    def __init__(self, name=NEAR_DUP_FILE):
+        self.file = name
+        self.entries = {}
+        self.buckets = {}  # (구간 번호, 구간 값) → 글 키 집합
+        self.lock = threading.Lock()
+        self.dirty = False
+        for key, entry in state_store.load_json(name, {}).items():
+            self._index(key, entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, key, entry):
+        self._unindex(key)
+        self.entries[key] = entry
+        for band in bands(entry["sig"]):
+            self.buckets.setdefault(band, set()).add(key)
+
+    def _unindex(self, key):
+        old = self.entries.pop(key, None)
+        if not old:
+            return
+        for band in bands(old["sig"]):
+            bucket = self.buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[band]
+
+    def candidates(self, sig):
+        keys = set()
+        for band in bands(sig):
+            keys |= self.buckets.get(band, set())
+        return keys
+
+    def best_match(self, source_name, tokens, sig, now):
+        """ 다른 소스의 최근 원본 글 중 제목이 가장 비슷한 것 → (유사도, 글) 또는 None """
+        cutoff = now - WINDOW_DAYS * 86400
+        best = None
+        for key in self.candidates(sig):
+            entry = self.entries[key]
+            if entry["source"] == source_name or entry.get("dup") or entry["at"] < cutoff:
+                continue
+            other = title_tokens(entry["title"])
+            if numbers(tokens) != numbers(other):
+                continue
+            score = jaccard(tokens, other)
+            if score >= TITLE_THRESHOLD and (best is None or score > best[0]):
+                best = (score, entry)
+        return best
+
+    def add(self, source_name, post_id, post, tags, sig, now):
+        key = archive.doc_key(source_name, post_id)
+        old = self.entries.get(key)
+        if old and old["title"] == post["title"]:
+            return  # 전송 실패로 다시 확인하는 글 → 처음 기록 그대로
+        self._index(key, {
+            "source": source_name, "id": post_id, "title": post["title"], "link": post.get("link"),
+            "tags": list(tags), "sig": sig, "at": int(now), "dup": False,
+        })
+        self.dirty = True
+
+    def mark_dup(self, source_name, post_id, of):
+        entry = self.entries.get(archive.doc_key(source_name, post_id))
+        if entry is not None:
+            entry["dup"] = archive.doc_key(of["source"], of["id"])
+            self.dirty = True
+
+    def prune(self, now=None):
+        cutoff = (now or time.time()) - WINDOW_DAYS * 86400
+        stale = [key for key, entry in self.entries.items() if entry["at"] < cutoff]
+        for key in stale:
+            self._unindex(key)
+        self.dirty = self.dirty or bool(stale)
+        return len(stale)
+
+    def save(self):
+        with self.lock:
+            self.prune()
+            if self.dirty:
+                state_store.save_json(self.file, self.entries)
+                self.dirty = False
+
+
+_dup_index = None
+_dup_index_lock = threading.Lock()
+
+
+def get_index():
+    global _dup_index
+    if _dup_index is None:
+        with _dup_index_lock:
+            if _dup_index is None:
+                _dup_index = NearDupIndex()
+    return _dup_index
+
+
+# ------------------------------------------------------
+# 실행기(sources.py)에서 호출
+# ------------------------------------------------------
+def find_twins(source, posts, now=None, bodies=None):
+    """
+    새 글 중 다른 소스에 이미 올라온 글과 같은 것 → {글 ID: 상대 글 기록}.
+    새 글은 확인과 동시에 기록함 (같은 라운드에 동시에 실행 중인 소스끼리도 서로 찾도록)
+    bodies: 주면 확인하느라 받은 본문을 {글 ID: 본문} 으로 채움 (archive.update 에 넘겨서 다시 받지 않게)
+    """
+    if not NEAR_DUP or not posts:
+        return {}
+    index = get_index()
+    now = now or time.time()
+    found = []
+    with index.lock:
+        for post in posts:
+            tokens = title_tokens(post["title"])
+            sig = signature(tokens)
+            if sig is None:
+                continue
+            match = index.best_match(source.name, tokens, sig, now)
+            if match:
+                found.append((post, tokens, match))
+            index.add(source.name, source.fingerprint(post), post, source.subscription_tags(post), sig, now)
+    if not found:
+        return {}
+    metrics.count("near_dup_candidates", len(found))
+
+    fetched = _fetch_bodies(source, found)
+    if bodies is not None:
+        bodies.update({post_id: body for post_id, body in fetched.items() if body})
+    twins = {}
+    for post, tokens, (score, entry) in found:
+        post_id = source.fingerprint(post)
+        if not _confirm(score, tokens, _twin_body(entry), fetched.get(post_id)):
+            continue
+        twins[post_id] = entry
+        with index.lock:
+            index.mark_dup(source.name, post_id, entry)
+        print(f"🪞 다른 소스에 올라온 글과 같음: {post['title']} ≈ [{entry['source']}] {entry['title']}")
+    metrics.count("near_duplicates", len(twins))
+    return twins
+
+
+def _twin_body(entry):
+    store = archive.get_archive() if archive.ARCHIVE_ENABLED else None
+    doc = store.docs.get(archive.doc_key(entry["source"], entry["id"])) if store else None
+    return doc["body"] if doc else None
+
+
+def _fetch_bodies(source, found):
+    """ 상대 글 본문이 보관함에 있는 후보만 새 글 본문을 동시에 받음 → {글 ID: 본문 또는 None} """
+    todo = [post for post, _, (_, entry) in found if _twin_body(entry)]
+    if not todo:
+        return {}
+    fetched = {}
+    with ThreadPoolExecutor(max_workers=min(archive.FETCH_WORKERS, len(todo)), thread_name_prefix="near-dup") as pool:
+        futures = [(post, pool.submit(metrics.bind(source.fetch_body), post)) for post in todo]
+        for post, future in futures:
+            try:
+                fetched[source.fingerprint(post)] = future.result()
+            except Exception as e:
+                print(f"⚠️ 중복 확인용 본문 받기 실패: {post['title']} ({e})")
+                fetched[source.fingerprint(post)] = None
+    return fetched
+
+
+def _confirm(score, tokens, twin_body, body):
+    """ 두 본문이 다 있으면 본문으로, 아니면 제목이 거의 같고 충분히 길 때만 중복 """
+    if twin_body and body:
+        return jaccard(set(archive.tokenize(body)), set(archive.tokenize(twin_body))) >= BODY_THRESHOLD
+    return score >= STRICT_THRESHOLD and len(tokens) >= MIN_TOKENS
+
+
+def save():
+    if NEAR_DUP and _dup_index is not None:
+        _dup_index.save()
@@ -0,0 +1,174 @@
+"""
+공지 분류/필터 규칙 엔진.
+
+notice_rules.json 의 키워드 → 카테고리(이모지), 제외 규칙을 정규식 하나로 컴파일해서
+제목 + 정보 줄을 한 번만 훑고 카테고리, 이모지, 제외 여부를 같이 돌려줌.
+규칙이 수백 개로 늘어나도 글 하나당 검사 횟수는 글자 수에 비례함 (키워드 수와 무관).
+
+규칙 파일 형식:
+    {
+     "default": {"category": "일반", "emoji": "📢"},
+     "categories": [{"category": "장학", "emoji": "💰", "keywords": ["장학", "대출"]}, ...],
+     "exclude": [{"name": "부서 필터", "field": "info", "keywords": ["교수지원팀"]}]
+    }
+- categories 는 위에 있을수록 우선 (기존 if-elif 순서와 같음)
+- field: "title"(categories 기본), "info"(exclude 기본), "any"
+"""
+import json
+import os
+import re
+import threading
+
+# ▼ 설정 ▼
+RULES_FILE = os.environ.get(
+    'NOTICE_RULES_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "notice_rules.json")
+)
+
+FIELDS = ("title", "info")
+
+
+def _build_trie(keywords):
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = True
+    return trie
+
+
+def _trie_pattern(node):
+    """
+    키워드 트라이 → 정규식. 같은 접두사를 공유하는 키워드는 한 갈래로 합쳐져서
+    위치마다 첫 글자로 바로 갈래가 정해짐. 더 긴 키워드를 먼저 시도함 (greedy)
+    """
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # 여기서 끝나는 키워드도 있음 → 더 긴 쪽이 안 맞으면 여기서 멈춤
+        body = "(?:" + body + ")?"
+    return body
+
+
+class RuleEngine:
+    def __init__(self, rules):
+        default = rules.get("default", {})
+        self.default_category = default.get("category", "일반")
+        self.default_emoji = default.get("emoji", "📢")
+        self.categories = rules.get("categories", [])
+        self.excludes = rules.get("exclude", [])
+
+        # 키워드 → 필드별 (카테고리 번호, 제외 규칙 번호) 후보
+        hits = {}
+        for idx, rule in enumerate(self.categories):
+            for field in self._fields(rule.get("field", "title")):
+                for keyword in rule["keywords"]:
+                    hits.setdefault(keyword, []).append(("category", field, idx))
+        for idx, rule in enumerate(self.excludes):
+            for field in self._fields(rule.get("field", "info")):
+                for keyword in rule["keywords"]:
+                    hits.setdefault(keyword, []).append(("exclude", field, idx))
+
+        # 한 위치에서는 가장 긴 키워드 하나만 잡히므로, 그 안에 들어 있는 짧은 키워드의 규칙도 같이 적용
+        # (예: "국제학생"이 잡히면 "국제"도 들어 있는 것)
+        self.table = {}
+        for keyword in hits:
+            entry = {field: [len(self.categories), None] for field in FIELDS}
+            for other, other_hits in hits.items():
+                if other not in keyword:
+                    continue
+                for kind, field, idx in other_hits:
+                    best = entry[field]
+                    if kind == "category":
+                        best[0] = min(best[0], idx)
+                    elif best[1] is None or idx < best[1]:
+                        best[1] = idx
+            self.table[keyword] = tuple(tuple(entry[field]) for field in FIELDS)
+
+        # 겹쳐 있는 키워드도 놓치지 않도록 lookahead 로 모든 위치에서 검사
+        self.pattern = re.compile("(?=(" + _trie_pattern(_build_trie(hits)) + "))") if hits else None
+
+    @staticmethod
+    def _fields(field):
+        return FIELDS if field == "any" else (field,)
+
+    def classify(self, title, info=""):
+        """ 반환: {"category", "emoji", "excluded", "exclude_rule"} """
+        best = len(self.categories)
+        exclude_idx = None
+        if self.pattern is not None:
+            # 제목과 정보 줄을 \0 으로 이어서 한 번에 훑음 (키워드가 경계를 넘어 잡히지 않음)
+            boundary = len(title)
+            for match in self.pattern.finditer(f"{title}\0{info}"):
+                keyword = match.group(1)
+                if not keyword:
+                    continue
+                category_idx, excl = self.table[keyword][0 if match.start() < boundary else 1]
+                if category_idx < best:
+                    best = category_idx
+                if excl is not None and (exclude_idx is None or excl < exclude_idx):
+                    exclude_idx = excl
+
+        if best < len(self.categories):
+            category, emoji = self.categories[best]["category"], self.categories[best]["emoji"]
+        else:
+            category, emoji = self.default_category, self.default_emoji
+
+        return {
+            "category": category,
+            "emoji": emoji,
+            "excluded": exclude_idx is not None,
+            "exclude_rule": self.excludes[exclude_idx].get("name") if exclude_idx is not None else None
+        }
+
+
+class KeywordMatcher:
+    """
+    키워드 집합을 같은 방식(트라이 정규식 + lookahead)으로 컴파일해서,
+    글에 들어 있는 키워드를 전부 찾음. 키워드가 수천 개여도 글 길이만큼만 훑음
+    """
+
+    def __init__(self, keywords):
+        keywords = {k for k in keywords if k}
+        # 잡힌 키워드 → 그 안에 들어 있는 (더 짧은) 키워드까지 전부
+        self.closure = {}
+        for keyword in keywords:
+            self.closure[keyword] = frozenset(
+                keyword[i:j] for i in range(len(keyword)) for j in range(i + 1, len(keyword) + 1)
+                if keyword[i:j] in keywords
+            )
+        self.pattern = re.compile("(?=(" + _trie_pattern(_build_trie(keywords)) + "))") if keywords else None
+
+    def find(self, text):
+        found = set()
+        if self.pattern is None:
+            return found
+        for match in self.pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword:
+                found |= self.closure[keyword]
+        return found
+
+
+def load_rules(path=None):
+    with open(path or RULES_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# ------------------------------------------------------
+# 여러 곳에서 같이 쓰는 엔진 (처음 쓸 때 한 번만 컴파일)
+# ------------------------------------------------------
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RuleEngine(load_rules())
+    return _engine
@@ -0,0 +1,272 @@
+"""
+스크래핑 요청 정책: 실행 전체 시간 예산 + 연결/읽기 타임아웃 분리 + 지터 지수 백오프 재시도
++ (GET 한정) 느린 요청 헤징 + 호스트별 서킷 브레이커.
+
+    @metrics.instrument("notice")
+    @request_policy.budgeted()
+    def run():
+        res = request_policy.get(URL, hedge=True, verify=False)
+
+- 예산(RUN_BUDGET)이 남은 만큼만 타임아웃/재시도 대기를 잡고, 다 쓰면 BudgetExceeded
+- 계속 실패하는 호스트는 BREAKER_COOLDOWN 동안 요청하지 않고 바로 CircuitOpen
+  (상태는 state/circuit_breaker.json 에 저장돼서 다음 실행에도 이어짐)
+- 둘 다 requests.RequestException 이라서 기존 except 로도 잡힘
+- 같은 호스트로 동시에 나가는 요청은 HOST_CONCURRENCY 개까지 (sources.run_all 이 소스 여러 개를 동시에 돌림)
+"""
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+
+import http_client
+import metrics
+import state_store
+
+# ▼ 설정 ▼
+RUN_BUDGET = float(os.environ.get('RUN_BUDGET', '90'))  # 실행 한 번에 쓸 수 있는 네트워크 시간(초)
+CONNECT_TIMEOUT = float(os.environ.get('CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.environ.get('READ_TIMEOUT', '20'))
+MAX_ATTEMPTS = int(os.environ.get('REQUEST_MAX_ATTEMPTS', '3'))
+BACKOFF_BASE = 0.5  # 재시도 대기: 0~0.5, 0~1, 0~2 ... 초 (full jitter)
+BACKOFF_MAX = 8.0
+HEDGE_AFTER = float(os.environ.get('HEDGE_AFTER', '3'))  # GET 이 이 시간(초) 안에 안 끝나면 같은 요청을 하나 더
+HOST_CONCURRENCY = int(os.environ.get('HOST_CONCURRENCY', '4'))  # 같은 호스트로 동시에 보낼 수 있는 요청 수 (헤징 포함)
+
+BREAKER_FILE = "circuit_breaker.json"
+BREAKER_THRESHOLD = int(os.environ.get('BREAKER_THRESHOLD', '3'))  # 연속 실패 몇 번이면 차단
+BREAKER_COOLDOWN = float(os.environ.get('BREAKER_COOLDOWN', '600'))  # 차단 후 다시 시도하기까지(초)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class BudgetExceeded(requests.RequestException):
+    pass
+
+
+class CircuitOpen(requests.RequestException):
+    pass
+
+
+# ------------------------------------------------------
+# 실행 전체 시간 예산 (스레드 풀로는 metrics.bind 로 같이 넘어감)
+# ------------------------------------------------------
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+def remaining():
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def budget(seconds=None):
+    """ with 블록 동안 요청 예산을 seconds(기본 RUN_BUDGET) 로 잡음 """
+    token = _deadline.set(time.monotonic() + (seconds or RUN_BUDGET))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def budgeted(seconds=None):
+    """ budget() 의 데코레이터 버전 """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with budget(seconds):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------
+# 서킷 브레이커
+# ------------------------------------------------------
+class CircuitBreaker:
+    """
+    호스트별 연속 실패 횟수. threshold 번 연속 실패하면 cooldown 동안 "열림"(요청 안 함),
+    cooldown 이 지나면 한 번 시도해보고 성공하면 닫힘, 실패하면 다시 cooldown.
+    """
+
+    def __init__(self, threshold=None, cooldown=None):
+        self.threshold = threshold or BREAKER_THRESHOLD
+        self.cooldown = cooldown or BREAKER_COOLDOWN
+        self.hosts = state_store.load_json(BREAKER_FILE, {})
+        self.lock = threading.Lock()
+
+    def allow(self, host, now=None):
+        with self.lock:
+            entry = self.hosts.get(host)
+            if not entry or entry["failures"] < self.threshold:
+                return True
+            return (now or time.time()) - entry["opened_at"] >= self.cooldown
+
+    def retry_in(self, host, now=None):
+        entry = self.hosts.get(host) or {}
+        return max(0.0, entry.get("opened_at", 0) + self.cooldown - (now or time.time()))
+
+    def record_success(self, host):
+        with self.lock:
+            entry = self.hosts.get(host)
+            if not entry or not entry["failures"]:
+                return
+            if entry["failures"] >= self.threshold:
+                print(f"🔌 {host} 복구됨 - 차단 해제")
+            self.hosts[host] = {"failures": 0, "opened_at": 0, "last_error": None}
+            self._save()
+
+    def record_failure(self, host, error):
+        with self.lock:
+            entry = self.hosts.setdefault(host, {"failures": 0, "opened_at": 0, "last_error": None})
+            entry["failures"] += 1
+            entry["last_error"] = str(error)[:200]
+            if entry["failures"] >= self.threshold:
+                # 새로 열리거나, cooldown 후 시도가 또 실패 → 다시 cooldown
+                entry["opened_at"] = time.time()
+                print(f"🔌 {host} 연속 {entry['failures']}번 실패 - {self.cooldown:.0f}초 동안 요청 안 함")
+            self._save()
+
+    def _save(self):
+        state_store.save_json(BREAKER_FILE, self.hosts)
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker():
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
+
+
+# ------------------------------------------------------
+# 요청
+# ------------------------------------------------------
+_hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+
+@contextmanager
+def _host_slot(host):
+    """ 호스트별 동시 요청 수 제한 (소스 여러 개가 같은 서버를 동시에 긁을 때). 기다리는 시간도 예산에서 씀 """
+    with _host_slots_lock:
+        slot = _host_slots.setdefault(host, threading.BoundedSemaphore(HOST_CONCURRENCY))
+    left = remaining()
+    if not slot.acquire(timeout=None if left is None else max(0.0, left)):
+        raise BudgetExceeded(f"{host} 동시 요청 자리를 기다리다 예산을 다 씀")
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def _send(method, url, **kwargs):
+    with _host_slot(urlparse(url).hostname):
+        return http_client.request(method, url, **kwargs)
+
+
+def _backoff(attempt):
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempt - 1))))
+
+
+def _timeout(read_timeout):
+    """ (연결, 읽기) 타임아웃 - 남은 예산보다 길게 잡지 않음 """
+    connect, read = CONNECT_TIMEOUT, read_timeout or READ_TIMEOUT
+    left = remaining()
+    if left is not None:
+        if left <= 0:
+            raise BudgetExceeded("실행 시간 예산을 다 씀")
+        connect, read = min(connect, left), min(read, left)
+    return connect, read
+
+
+def _send_hedged(method, url, hedge_after, kwargs):
+    """ 첫 요청이 hedge_after 초 안에 안 끝나면 같은 요청을 하나 더 보내고 먼저 성공한 쪽을 씀 """
+    first = _hedge_pool.submit(metrics.bind(_send), method, url, **kwargs)
+    done, _ = wait([first], timeout=hedge_after)
+    if done:
+        return first.result()
+
+    metrics.count("hedged")
+    second = _hedge_pool.submit(metrics.bind(_send), method, url, **kwargs)
+    pending = {first, second}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if future is second:
+                    metrics.count("hedge_won")
+                # 진 쪽은 취소할 수 없으므로 끝나면 그냥 버려짐
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def request(method, url, idempotent=None, hedge=False, read_timeout=None, attempts=None, **kwargs):
+    """
+    http_client.request 와 같지만 정책 적용.
+    idempotent: 재시도해도 되는 요청인지 (기본: GET 만). 조회용 POST 는 True 로 줄 수 있음
+    hedge: GET 이 느리면 같은 요청을 하나 더 보냄 (HEDGE_AFTER 초 후)
+    """
+    host = urlparse(url).hostname
+    breaker = get_breaker()
+    if not breaker.allow(host):
+        metrics.count("circuit_open")
+        raise CircuitOpen(f"{host} 차단 중 ({breaker.retry_in(host):.0f}초 후 다시 시도)")
+
+    idempotent = method == "GET" if idempotent is None else idempotent
+    attempts = (attempts or MAX_ATTEMPTS) if idempotent else 1
+    hedge = hedge and method == "GET" and HEDGE_AFTER > 0
+
+    error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            kwargs["timeout"] = _timeout(read_timeout)
+            if hedge:
+                res = _send_hedged(method, url, HEDGE_AFTER, kwargs)
+            else:
+                res = _send(method, url, **kwargs)
+            if res.status_code not in RETRY_STATUS:
+                breaker.record_success(host)
+                return res
+            error = requests.HTTPError(f"HTTP {res.status_code}", response=res)
+        except BudgetExceeded as e:
+            metrics.count("budget_exceeded")
+            error = e
+            break
+        except requests.RequestException as e:
+            error = e
+
+        if attempt < attempts:
+            delay = _backoff(attempt)
+            left = remaining()
+            if left is not None and delay >= left:
+                break
+            metrics.count("retries")
+            print(f"⏳ {host} 재시도 {attempt}/{attempts - 1} ({error}) - {delay:.1f}초 대기")
+            time.sleep(delay)
+
+    if not isinstance(error, BudgetExceeded):
+        breaker.record_failure(host, error)
+    raise error
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,328 @@
+"""
+게시판 소스 플러그인 + 공통 실행기.
+
+게시판 하나 = Source 하나. 각 소스는 "어떻게 받고(fetch) 어떻게 글을 뽑는지(extract)"만 구현하고,
+변경 감지 → 이미 본 글과 비교 → 구독자에게 전송 → 상태 저장은 run_source 가 공통으로 처리함.
+
+    @sources.register
+    class MyBoard(sources.Source):
+        name = "my_board"            # state/seen_my_board.tsv, change_my_board.json, 실행 기록 이름
+        label = "학과 공지"
+        def fetch(self, detector): ...
+        def extract(self, page, seen): ...
+        def send_one(self, chat_id, post): ...
+        def send_digest(self, chat_id, posts): ...
+
+SOURCE_MODULES 에 모듈 이름을 추가하면 run_all / daemon 이 같이 실행함.
+같은 호스트로 동시에 나가는 요청 수는 request_policy.HOST_CONCURRENCY 로 제한됨.
+
+사용법:
+    python sources.py                 # 등록된 소스 전부 동시에
+    python sources.py --only notice   # 일부만
+    python sources.py --list
+"""
+import argparse
+import importlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import archive
+import edit_tracker
+import http_client
+import metrics
+import near_dup
+import request_policy
+import telegram_dispatcher
+from change_detect import ChangeDetector
+from state_store import DeliveryStore, SeenStore
+from subscribers import Registry
+
+# ▼ 설정 ▼
+SOURCE_MODULES = [m.strip() for m in os.environ.get('SOURCE_MODULES', 'monitor,dorm_monitor').split(",") if m.strip()]
+SOURCE_WORKERS = int(os.environ.get('SOURCE_WORKERS', '8'))  # 동시에 실행할 소스 수
+
+
+class SkipRun(Exception):
+    """ 이번 실행은 아무것도 기록하지 않고 끝냄 (다음 실행에서 다시 확인) """
+
+
+class Source:
+    name = None
+    label = "새 글"
+    legacy_path = None  # 예전 기록 파일 (처음 한 번 가져옴)
+    tags = ()  # 구독 카테고리 (subscribers.py)
+
+    def fetch(self, detector):
+        """ 목록을 받아옴. detector.request_headers() 로 조건부 요청 가능. 반환값은 그대로 아래 메서드로 넘어감 """
+        raise NotImplementedError
+
+    def is_unchanged(self, page, detector):
+        """ 지난번과 같으면 True (파싱 생략) """
+        return detector.is_unchanged(page)
+
+    def extract(self, page, seen):
+        """ 목록에서 본 글 전부 (알림 대상이 아닌 글 포함 - 전부 "본 글"로 기록됨) """
+        raise NotImplementedError
+
+    def fingerprint(self, post):
+        return post["id"]
+
+    def canonical_id(self, post_id):
+        """ 예전 형식으로 저장된 ID → 지금 fingerprint 형식 (ID 형식을 바꾼 소스만 구현) """
+        return post_id
+
+    def should_notify(self, post):
+        return True
+
+    def subscription_tags(self, post):
+        """ 구독 카테고리 매칭에 쓰는 태그 """
+        return self.tags
+
+    def recipients(self, post, registry):
+        return registry.recipients(post["title"], self.subscription_tags(post))
+
+    def send_one(self, chat_id, post):
+        """ → Future (telegram_dispatcher) """
+        raise NotImplementedError
+
+    def send_digest(self, chat_id, posts):
+        raise NotImplementedError
+
+    def should_archive(self, post):
+        """ 본문을 보관함(archive.py)에 넣을 글인지 """
+        return True
+
+    def fetch_body(self, post):
+        """ 글 본문 텍스트 (없으면 제목만 보관) """
+        return None
+
+    def version(self, post):
+        """ 목록에서 보이는 수정 흔적 (수정일 등). 바뀌면 본문을 다시 받아 비교함. None 이면 수정 감지 안 함 """
+        return None
+
+    def should_notify_edit(self, post):
+        return self.should_archive(post)
+
+    def send_update(self, chat_id, edit):
+        return edit_tracker.send_update(self.label, chat_id, edit)
+
+    def send_update_digest(self, chat_id, edits):
+        return edit_tracker.send_update_digest(self.label, chat_id, edits)
+
+
+# ------------------------------------------------------
+# 등록
+# ------------------------------------------------------
+_registry = {}
+
+
+def register(cls):
+    if not cls.name:
+        raise ValueError(f"{cls.__name__}.name 이 비어 있음")
+    _registry[cls.name] = cls
+    return cls
+
+
+def load_sources(modules=None):
+    """ 플러그인 모듈을 불러와서 (import 때 register 됨) 소스 인스턴스 목록을 돌려줌 """
+    for module in modules or SOURCE_MODULES:
+        importlib.import_module(module)
+    return [cls() for cls in _registry.values()]
+
+
+# ------------------------------------------------------
+# 공통 흐름
+# ------------------------------------------------------
+def run_source(source, budget=None):
+    """ 소스 하나 실행. 실패하면 False (기록은 안 바뀌므로 다음 실행에서 다시 시도) """
+    with metrics.run(source.name), request_policy.budget(budget):
+        try:
+            _run(source)
+            return True
+        except request_policy.CircuitOpen as e:
+            # 서버가 계속 안 되는 중 → 이번 실행은 건너뜀 (기록은 그대로라 복구되면 이어서 확인)
+            print(f"⏭️ [{source.name}] {e}")
+            metrics.stale(source.name, "서킷 브레이커 열림")
+            return True
+        except Exception as e:
+            print(f"❌ [{source.name}] 오류 발생: {e}")
+            metrics.fail(e)
+            metrics.stale(source.name, "수집 실패")
+            return False
+
+
+def edit_key(source, edit):
+    return f"edit:{source.fingerprint(edit['post'])}:{edit['version']}"
+
+
+def _migrate_ids(source, seen):
+    """
+    ID 형식이 바뀐 소스: 예전 ID 로 남은 기록(본 글, 수정 기준, 보관함)을 새 ID 로 옮기고 바로 저장.
+    본 글 기록에 예전 ID 가 남아 있을 때만 (한 번 옮기면 다음 실행부터는 보관함을 불러오지 않음)
+    """
+    if type(source).canonical_id is Source.canonical_id:
+        return
+    if all(source.canonical_id(post_id) == post_id for post_id in seen):
+        return
+    versions = edit_tracker.VersionStore(source.name)
+    moved = seen.rename(source.canonical_id)
+    versions.rename(source.canonical_id)
+    if archive.ARCHIVE_ENABLED:
+        archive.get_archive().rename(source.name, source.canonical_id)
+    # 보관함/수정 기준을 먼저 저장 - 중간에 죽어도 본 글 기록에 예전 ID 가 남아 있으면 다음 실행에서 다시 옮김
+    versions.save()
+    seen.save()
+    print(f"🔁 [{source.name}] 예전 형식 ID {moved}개를 새 ID 로 옮김")
+
+
+def _run(source):
+    seen = SeenStore(source.name, legacy_path=source.legacy_path)
+    detector = ChangeDetector(source.name)
+    with metrics.stage("fetch"):
+        page = source.fetch(detector)
+
+    # 목록이 그대로면 파싱/비교 없이 바로 종료
+    with metrics.stage("diff"):
+        unchanged = len(seen) and source.is_unchanged(page, detector)
+    if unchanged:
+        metrics.count("unchanged")
+        print(f"⚡ {source.label} 목록 변경 없음 - 파싱 생략")
+        return
+
+    _migrate_ids(source, seen)
+    try:
+        posts = source.extract(page, seen)
+    except SkipRun as e:
+        print(f"⚠️ [{source.name}] {e}")
+        detector.abandon()
+        return
+
+    with metrics.stage("diff"):
+        first_run = len(seen) == 0
+        new_posts = [] if first_run else [
+            p for p in posts if source.should_notify(p) and source.fingerprint(p) not in seen
+        ]
+    metrics.count("items", len(posts))
+    metrics.count("new_posts", len(new_posts))
+    for post in new_posts:
+        print(f"🚀 새 {source.label}: {post['title']}")
+
+    # 다른 소스에 이미 올라온 같은 글 (학교 공지 ↔ 기숙사 공지 등)
+    with metrics.stage("dedup"):
+        bodies = {}
+        twins = near_dup.find_twins(source, new_posts, bodies=bodies)
+
+    # 목록상 수정 흔적이 바뀐 글만 본문을 다시 받아 비교 (이번에 새로 알리는 글은 기준만 기록)
+    versions = edit_tracker.VersionStore(source.name)
+    edits = []
+    if edit_tracker.EDIT_TRACKING:
+        with metrics.stage("edits"):
+            new_ids = {source.fingerprint(p) for p in new_posts}
+            edits = edit_tracker.find_edits(source, [p for p in posts if source.fingerprint(p) not in new_ids], versions)
+        for edit in edits:
+            print(f"✏️ 수정된 {source.label}: {edit['post']['title']} ({edit['old_version']} → {edit['version']})")
+
+    # 구독 조건(카테고리/키워드)이 맞는 채팅방마다 전송 (TELEGRAM_CHAT_ID 채널은 전부 받음)
+    # 같은 글이 다른 소스로 이미 간 채팅방은 뺌
+    with metrics.stage("send"):
+        registry = Registry.load()
+
+        def recipients(post):
+            chat_ids = source.recipients(post, registry)
+            twin = twins.get(source.fingerprint(post))
+            if twin:
+                chat_ids = set(chat_ids) - registry.recipients(twin["title"], twin["tags"])
+            return chat_ids
+
+        # 지난 실행에서 일부 채팅방만 실패한 글은 그 채팅방에만 다시 보냄
+        deliveries = DeliveryStore(source.name)
+        delivered = telegram_dispatcher.fan_out(
+            new_posts,
+            recipients,
+            source.send_one,
+            source.send_digest,
+            key=source.fingerprint,
+            sent=deliveries.sent
+        )
+        delivered_edits = telegram_dispatcher.fan_out(
+            edits,
+            lambda e: source.recipients(e["post"], registry),
+            source.send_update,
+            source.send_update_digest,
+            key=lambda e: edit_key(source, e),
+            sent=deliveries.sent
+        )
+    # 전송 실패한 글은 기록하지 않음 → 다음 실행 때 (못 받은 채팅방에만) 다시 시도
+    failed_ids = {source.fingerprint(p) for p in new_posts} - {source.fingerprint(p) for p in delivered}
+    failed_edits = len(edits) - len(delivered_edits)
+    unfinished = failed_ids | ({edit_key(source, e) for e in edits} - {edit_key(source, e) for e in delivered_edits})
+    # 알림 대상이 아닌 글도 "본 글"로 기록해야 다음 실행에서 어디까지 읽었는지 알 수 있음
+    for post in posts:
+        if source.fingerprint(post) not in failed_ids:
+            seen.add(source.fingerprint(post))
+
+    if first_run:
+        print(f"🚀 [{source.name}] 첫 실행: 기준점 잡기 완료")
+    if failed_ids or failed_edits:
+        print(f"⚠️ 전송 실패 {len(failed_ids) + failed_edits}건 - 다음 실행 때 다시 시도")
+
+    with metrics.stage("state"):
+        evicted = seen.save()
+        deliveries.save(unfinished)
+        edit_tracker.record_new(source, delivered, versions)
+        edit_tracker.record_edits(source, delivered_edits, versions)
+        versions.prune(seen)
+        versions.save()
+        near_dup.save()
+        if failed_ids or failed_edits:
+            detector.abandon()
+        else:
+            detector.commit()
+    print(f"💾 {seen.path} 업데이트 완료 ({len(seen)}개 보관, {evicted}개 만료)")
+
+    # 새 글 본문을 검색용으로 보관 (알림/기록은 이미 끝났으므로 실패해도 이번 실행은 성공)
+    if archive.ARCHIVE_ENABLED:
+        with metrics.stage("archive"):
+            try:
+                archive.update(source, posts, bodies=bodies)
+            except Exception as e:
+                metrics.count("archive_failed")
+                print(f"⚠️ [{source.name}] 본문 보관 실패: {e}")
+
+
+def run_all(names=None, workers=None):
+    """ 등록된 소스를 동시에 실행. 반환: {이름: 성공 여부} """
+    selected = [s for s in load_sources() if not names or s.name in names]
+    if not selected:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(workers or SOURCE_WORKERS, len(selected)), thread_name_prefix="source") as pool:
+        results = dict(zip((s.name for s in selected), pool.map(run_source, selected)))
+    telegram_dispatcher.get_dispatcher().flush()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="게시판 소스 실행")
+    parser.add_argument("--only", nargs="*", help="실행할 소스 이름")
+    parser.add_argument("--list", action="store_true", help="등록된 소스 목록")
+    args = parser.parse_args()
+
+    if args.list:
+        for source in load_sources():
+            print(f"{source.name:<12}{source.label}")
+        return
+
+    results = run_all(args.only)
+    http_client.print_stats()
+    failed = [name for name, ok in results.items() if not ok]
+    if failed:
+        print(f"❌ 실패한 소스: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # python sources.py 로 실행하면 이 파일은 __main__ 이 되므로,
+    # 플러그인들이 register 하는 "sources" 모듈을 다시 불러와서 그쪽 main 을 실행
+    import sources
+    sources.main()
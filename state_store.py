@@ -0,0 +1,168 @@
+import json
+import os
+import tempfile
+import time
+
+# ▼ 설정 ▼
+# 실행 사이에 유지해야 하는 상태 파일들은 전부 이 폴더에 모음 (Actions 에서 git 으로 커밋됨)
+STATE_DIR = os.environ.get('STATE_DIR', 'state')
+# 저장소에 커밋하지 않는 상태 (구독자 chat ID 같은 개인정보, git 기록을 불리는 본문 보관함)
+# .gitignore 에 있음, Actions 에서는 캐시로 유지
+PRIVATE_DIR = os.environ.get('PRIVATE_STATE_DIR', 'private')
+
+
+def state_path(name):
+    return os.path.join(STATE_DIR, name)
+
+
+def private_path(name):
+    return os.path.join(PRIVATE_DIR, name)
+
+
+def atomic_write_text(path, text):
+    """ 임시 파일에 다 쓴 뒤 교체 - 중간에 죽어도 반쯤 쓰인 파일이 남지 않음 """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_json(name, default):
+    return read_json(state_path(name), default)
+
+
+def save_json(name, data):
+    write_json(state_path(name), data)
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        print(f"⚠️ 상태 파일이 깨져서 무시합니다: {path}")
+        return default
+
+
+def write_json(path, data):
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True) + "\n")
+
+
+# ------------------------------------------------------
+# 이미 본 게시글 저장소 (data.txt / dorm_data.txt 대체)
+# ------------------------------------------------------
+SEEN_MAX_AGE_DAYS = float(os.environ.get('SEEN_MAX_AGE_DAYS', '365'))  # 이 기간 동안 안 보이면 삭제
+SEEN_MAX_ITEMS = int(os.environ.get('SEEN_MAX_ITEMS', '5000'))  # 소스별 최대 보관 개수
+
+
+class SeenStore:
+    """
+    소스별 "이미 본 ID" 기록.
+    파일은 한 줄에 "<마지막으로 본 시각(epoch)>\\t<ID>" 인 TSV 이고,
+    메모리에서는 dict 로 들고 있어서 포함 여부 확인이 O(1).
+    목록에서 잠깐 빠졌다 돌아온 글도 기간 안이면 계속 기억함.
+    """
+
+    def __init__(self, name, legacy_path=None, max_age_days=None, max_items=None):
+        self.name = name
+        self.path = state_path(f"seen_{name}.tsv")
+        self.max_age = (max_age_days or SEEN_MAX_AGE_DAYS) * 86400
+        self.max_items = max_items or SEEN_MAX_ITEMS
+        self._index = {}  # ID -> 마지막으로 본 시각
+        self._load(legacy_path)
+
+    def _load(self, legacy_path):
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    ts, sep, post_id = line.rstrip("\n").partition("\t")
+                    if not sep or not post_id:
+                        continue
+                    try:
+                        self._index[post_id] = float(ts)
+                    except ValueError:
+                        continue
+        elif legacy_path and os.path.exists(legacy_path):
+            # 예전 형식(한 줄에 ID 하나)을 한 번만 가져옴
+            now = time.time()
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                legacy_ids = [line.strip() for line in f if line.strip()]
+            # 예전 파일은 최신 글이 위에 있으므로 거꾸로 넣어서 오래된 순서를 맞춤
+            for post_id in reversed(legacy_ids):
+                self._index[post_id] = now
+            print(f"📥 {legacy_path} 에서 {len(self._index)}개 가져옴 → {self.path}")
+
+    def __contains__(self, post_id):
+        return post_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def add(self, post_id, now=None):
+        """ 본 것으로 기록 (이미 있으면 시각만 갱신). 처음 보는 ID 면 True """
+        post_id = post_id.replace("\t", " ").replace("\n", " ")
+        is_new = self._index.pop(post_id, None) is None
+        # 다시 넣어서 dict 순서 = 최근에 본 순서 (같은 시각일 때 순서 기준)
+        self._index[post_id] = now or time.time()
+        return is_new
+
+    def rename(self, canonical):
+        """ ID 를 canonical(ID) 로 바꿈 (순서 유지, 같은 ID 로 합쳐지면 최근 시각). 바뀐 개수 반환 """
+        renamed = {}
+        moved = 0
+        for post_id, ts in self._index.items():
+            new_id = canonical(post_id)
+            moved += new_id != post_id
+            renamed[new_id] = max(ts, renamed.pop(new_id, ts))
+        if moved:
+            self._index = renamed
+        return moved
+
+    def evict(self, now=None):
+        """ 오래된 항목과 개수 초과분(가장 오래 안 보인 것부터)을 지움. 지운 개수 반환 """
+        cutoff = (now or time.time()) - self.max_age
+        kept = sorted(((k, ts) for k, ts in self._index.items() if ts >= cutoff), key=lambda kv: kv[1])
+        kept = dict(kept[-self.max_items:])
+        removed = len(self._index) - len(kept)
+        self._index = kept
+        return removed
+
+    def save(self):
+        removed = self.evict()
+        lines = [f"{ts:.0f}\t{post_id}\n" for post_id, ts in self._index.items()]
+        atomic_write_text(self.path, "".join(lines))
+        return removed
+
+
+# ------------------------------------------------------
+# 일부 채팅방에만 전송된 글 (다음 실행에서 실패한 채팅방에만 다시 보냄)
+# ------------------------------------------------------
+class DeliveryStore:
+    """ 항목 키(글 ID 등) → 이미 받은 채팅방 집합. chat ID 라서 커밋하지 않는 private/delivery_<소스>.json 에 둠 """
+
+    def __init__(self, name):
+        self.path = private_path(f"delivery_{name}.json")
+        self.sent = {key: set(ids) for key, ids in read_json(self.path, {}).items()}
+        self._loaded = bool(self.sent)
+
+    def save(self, unfinished):
+        """ 아직 다 못 보낸 항목만 남김 (다 보냈거나 목록에서 사라진 항목은 지움) """
+        data = {key: sorted(self.sent[key]) for key in unfinished if self.sent.get(key)}
+        if data or self._loaded:
+            write_json(self.path, data)
+            self._loaded = bool(data)
+        return len(data)
@@ -0,0 +1,110 @@
+"""
+구독자 목록 (private/subscribers.json) + 역색인.
+
+chat ID 는 개인정보라서 state/ (공개 저장소에 커밋됨) 가 아니라 커밋하지 않는 private/ 에 둠.
+Actions 에서는 SUBSCRIBERS_JSON 시크릿으로 파일을 만들거나, SUBSCRIBERS_PATH 로 다른 위치를 지정.
+
+구독 조건:
+- categories: 글의 태그 중 하나와 같으면 받음 (공지 카테고리 "장학", "학사"… / 기숙사 글은 "기숙사")
+- keywords: 제목에 들어 있으면 받음
+- all: 전부 받음 (TELEGRAM_CHAT_ID 채널은 항상 all 로 취급)
+
+태그/키워드 → 구독자 ID 역색인을 만들어두므로, 글 하나의 받는 사람을 찾는 비용은
+전체 구독자 수가 아니라 "조건이 맞는 구독자 수"에 비례함.
+
+파일 형식:
+    {"subscribers": {"<chat_id>": {"categories": ["장학", "기숙사"], "keywords": ["근로"], "all": false}}}
+"""
+import os
+
+import state_store
+from notice_rules import KeywordMatcher
+
+# ▼ 설정 ▼
+SUBSCRIBERS_FILE = "subscribers.json"
+SUBSCRIBERS_PATH = os.environ.get('SUBSCRIBERS_PATH')  # 없으면 private/subscribers.json
+# 예전처럼 모든 알림을 받는 채널 (구독자 목록과 별개로 항상 포함)
+CHANNEL_ID = os.environ.get('TELEGRAM_CHAT_ID')
+
+
+def registry_path():
+    """ 예전처럼 state/ 에 있으면 private/ 로 옮김 (state/ 는 공개 저장소에 커밋되므로) """
+    path = SUBSCRIBERS_PATH or state_store.private_path(SUBSCRIBERS_FILE)
+    legacy = state_store.state_path(SUBSCRIBERS_FILE)
+    if not os.path.exists(path) and os.path.exists(legacy):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        os.replace(legacy, path)
+        print(f"🔒 {legacy} → {path} 로 옮김 (저장소 기록에 남은 예전 파일은 따로 지워야 함)")
+    return path
+
+
+class Registry:
+    def __init__(self, subscribers=None, channel_id=CHANNEL_ID):
+        self.subscribers = subscribers if subscribers is not None else {}
+        self.channel_id = channel_id
+        self._build_index()
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or registry_path()
+        data = state_store.read_json(path, {})
+        return cls(data.get("subscribers", {}))
+
+    def save(self, path=None):
+        state_store.write_json(path or registry_path(), {"subscribers": self.subscribers})
+
+    def _build_index(self):
+        self.all_ids = set()
+        self.by_category = {}
+        self.by_keyword = {}
+        for chat_id, sub in self.subscribers.items():
+            if sub.get("all"):
+                self.all_ids.add(chat_id)
+            for category in sub.get("categories", ()):
+                self.by_category.setdefault(category, set()).add(chat_id)
+            for keyword in sub.get("keywords", ()):
+                self.by_keyword.setdefault(keyword, set()).add(chat_id)
+        if self.channel_id:
+            self.all_ids.add(str(self.channel_id))
+        self.matcher = KeywordMatcher(self.by_keyword)
+
+    # --------------------------------------------------
+    # 구독 관리 (바꾼 뒤 save() 로 저장)
+    # --------------------------------------------------
+    def subscribe(self, chat_id, categories=(), keywords=(), all=False):
+        sub = self.subscribers.setdefault(str(chat_id), {"categories": [], "keywords": [], "all": False})
+        sub["categories"] = sorted(set(sub.get("categories", [])) | set(categories))
+        sub["keywords"] = sorted(set(sub.get("keywords", [])) | {k.strip() for k in keywords if k.strip()})
+        sub["all"] = sub.get("all", False) or all
+        self._build_index()
+        return sub
+
+    def unsubscribe(self, chat_id, categories=(), keywords=()):
+        """ 조건을 하나도 안 주면 구독 자체를 삭제 """
+        chat_id = str(chat_id)
+        if chat_id not in self.subscribers:
+            return False
+        if not categories and not keywords:
+            del self.subscribers[chat_id]
+        else:
+            sub = self.subscribers[chat_id]
+            sub["categories"] = [c for c in sub.get("categories", []) if c not in categories]
+            sub["keywords"] = [k for k in sub.get("keywords", []) if k not in keywords]
+        self._build_index()
+        return True
+
+    # --------------------------------------------------
+    # 글 → 받는 사람
+    # --------------------------------------------------
+    def recipients(self, title, tags=()):
+        """ 글 제목과 태그(카테고리 목록)로 받는 구독자 ID 집합 """
+        ids = set(self.all_ids)
+        for tag in tags:
+            ids |= self.by_category.get(tag, set())
+        for keyword in self.matcher.find(title):
+            ids |= self.by_keyword[keyword]
+        return ids
+
+    def __len__(self):
+        return len(self.subscribers)
+
@@ -0,0 +1,285 @@
+import html
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import http_client
+import metrics
+
+# ▼ 설정 ▼
+TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+TOKEN = os.environ.get('TELEGRAM_TOKEN')
+
+# 텔레그램 한도: 전체 초당 30개, 같은 채팅방 초당 1개 정도 → 조금 여유 있게
+GLOBAL_RATE = float(os.environ.get('TELEGRAM_GLOBAL_RATE', '25'))  # 초당 전체 전송 수
+CHAT_RATE = float(os.environ.get('TELEGRAM_CHAT_RATE', '1'))  # 초당 채팅방별 전송 수
+CHAT_BURST = int(os.environ.get('TELEGRAM_CHAT_BURST', '3'))  # 채팅방별로 몰아서 보낼 수 있는 개수
+WORKERS = int(os.environ.get('TELEGRAM_WORKERS', '8'))  # 동시에 전송하는 채팅방 수
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0  # 5xx/네트워크 오류 재시도 대기: 1, 2, 4, 8초 (+지터)
+MAX_RETRY_AFTER = 60  # 429 retry_after 가 이보다 길면 포기
+
+# 한 번에 새 글이 이보다 많으면 한 개의 요약 메시지로 묶음
+DIGEST_THRESHOLD = int(os.environ.get('DIGEST_THRESHOLD', '5'))
+MESSAGE_LIMIT = 4096
+
+
+class TokenBucket:
+    """ 초당 rate 개, 최대 capacity 개까지 모아둘 수 있는 토큰 버킷 """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """ 토큰 하나를 예약하고, 쓸 수 있을 때까지 기다림. 기다린 시간(초) 반환 """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class Dispatcher:
+    """
+    텔레그램 전송 큐.
+    - 채팅방마다 순서를 지키면서, 서로 다른 채팅방은 병렬로 보냄
+    - 채팅방별/전체 토큰 버킷으로 속도 제한
+    - 429 는 retry_after 만큼, 5xx/네트워크 오류는 지수 백오프로 재시도
+    submit() 은 Future 를 돌려주고, 결과는 {"ok", "status", "attempts", "error"} dict.
+    """
+
+    def __init__(self, token=None, api_url=None, workers=None, global_rate=None, chat_rate=None, chat_burst=None):
+        self.token = token if token is not None else TOKEN
+        self.api_url = (api_url or TELEGRAM_API_URL).rstrip("/")
+        self.global_bucket = TokenBucket(global_rate or GLOBAL_RATE, capacity=max(1, int(global_rate or GLOBAL_RATE)))
+        self.chat_rate = chat_rate or CHAT_RATE
+        self.chat_burst = chat_burst or CHAT_BURST
+        self._pool = ThreadPoolExecutor(max_workers=workers or WORKERS, thread_name_prefix="telegram")
+        self._lock = threading.Lock()
+        self._chat_queues = {}
+        self._chat_buckets = {}
+        self._pending = set()
+        self.stats = {"sent": 0, "failed": 0, "retries": 0, "throttled": 0}
+
+    # --------------------------------------------------
+    # 큐에 넣기
+    # --------------------------------------------------
+    def submit(self, chat_id, text, method="sendMessage", **params):
+        future = Future()
+        if not self.token or not chat_id:
+            # 토큰/채팅방 설정이 없으면 보내지 않음 (로컬 실행용) - 처리된 것으로 취급
+            future.set_result({"ok": True, "skipped": True, "status": None, "attempts": 0, "error": None})
+            return future
+
+        payload = dict(params, chat_id=chat_id, text=text)
+        with self._lock:
+            self._pending.add(future)
+            queue = self._chat_queues.setdefault(chat_id, deque())
+            queue.append((method, payload, future))
+            # 이 채팅방을 비우는 작업이 없을 때만 새로 띄움 (채팅방 하나 = 작업 하나 → 순서 보장)
+            if len(queue) == 1:
+                self._pool.submit(self._drain, chat_id)
+        future.add_done_callback(self._discard)
+        return future
+
+    def _discard(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def flush(self, timeout=None):
+        """ 지금까지 넣은 전송이 다 끝날 때까지 기다림 """
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+
+    # --------------------------------------------------
+    # 실제 전송
+    # --------------------------------------------------
+    def _drain(self, chat_id):
+        while True:
+            with self._lock:
+                method, payload, future = self._chat_queues[chat_id][0]
+            try:
+                future.set_result(self._deliver(chat_id, method, payload))
+            except Exception as e:
+                future.set_result({"ok": False, "status": None, "attempts": 0, "error": _describe(e)})
+            with self._lock:
+                queue = self._chat_queues[chat_id]
+                queue.popleft()
+                if not queue:
+                    del self._chat_queues[chat_id]
+                    return
+
+    def _chat_bucket(self, chat_id):
+        with self._lock:
+            bucket = self._chat_buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, capacity=self.chat_burst)
+            return bucket
+
+    def _deliver(self, chat_id, method, payload):
+        url = f"{self.api_url}/bot{self.token}/{method}"
+        bucket = self._chat_bucket(chat_id)
+        error = None
+        status = None
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            bucket.acquire()
+            self.global_bucket.acquire()
+
+            delay = None
+            try:
+                res = http_client.post(url, data=payload, timeout=(5, 15))
+                status = res.status_code
+                if status == 200:
+                    self._count("sent")
+                    return {"ok": True, "status": status, "attempts": attempt, "error": None}
+
+                body = _json_or_empty(res)
+                error = body.get("description") or f"HTTP {status}"
+                if status == 429:
+                    self._count("throttled")
+                    delay = (body.get("parameters") or {}).get("retry_after", 1)
+                    if delay > MAX_RETRY_AFTER:
+                        break
+                elif status >= 500:
+                    delay = _backoff(attempt)
+                else:
+                    # 400/403 등은 다시 보내도 똑같이 실패함
+                    break
+            except Exception as e:
+                # requests 예외 메시지에는 토큰이 든 URL 이 들어 있음 → 결과/로그에는 가려서 남김
+                error = _describe(e)
+                delay = _backoff(attempt)
+
+            if attempt < MAX_ATTEMPTS:
+                self._count("retries")
+                print(f"⏳ 텔레그램 재시도 {attempt}/{MAX_ATTEMPTS - 1} ({error}) - {delay:.1f}초 대기")
+                time.sleep(delay)
+
+        self._count("failed")
+        print(f"텔레그램 전송 실패: {error}")
+        return {"ok": False, "status": status, "attempts": attempt, "error": error}
+
+    def _count(self, field):
+        with self._lock:
+            self.stats[field] += 1
+
+
+def _backoff(attempt):
+    return BACKOFF_BASE * (2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+
+
+def _json_or_empty(res):
+    try:
+        body = res.json()
+        return body if isinstance(body, dict) else {}
+    except ValueError:
+        return {}
+
+
+# ------------------------------------------------------
+# 여러 스크립트가 같이 쓰는 전송기
+# ------------------------------------------------------
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = Dispatcher()
+    return _dispatcher
+
+
+def build_digest(header, entries, limit=MESSAGE_LIMIT):
+    """
+    (제목, 링크) 목록을 HTML 요약 메시지 하나로 묶음.
+    텔레그램 길이 제한을 넘으면 뒤쪽은 "외 N건"으로 줄임.
+    """
+    lines = [header, ""]
+    length = len(header) + 1
+    for idx, (title, link) in enumerate(entries):
+        line = f"• <a href=\"{html.escape(link, quote=True)}\">{html.escape(title)}</a>"
+        rest = f"\n… 외 {len(entries) - idx}건"
+        if length + len(line) + 1 + len(rest) > limit:
+            lines.append(rest.strip())
+            break
+        lines.append(line)
+        length += len(line) + 1
+    return "\n".join(lines)
+
+
+def fan_out(posts, recipients, send_one, send_digest, threshold=None, key=None, sent=None):
+    """
+    글마다 받는 사람을 정해서 한꺼번에 큐에 넣고 (채팅방끼리는 병렬) 결과를 모음.
+    recipients(post) → 채팅방 ID 목록
+    send_one(chat_id, post) / send_digest(chat_id, posts) → Future
+    한 채팅방에 threshold 개보다 많이 가면 그 채팅방에는 요약 1개로 보냄.
+    sent: {key(post): 이미 받은 채팅방 집합} - 그 채팅방은 건너뛰고, 이번에 끝난 채팅방을 추가함
+          (일부 채팅방만 실패한 글을 다음 실행에서 다시 보낼 때 받은 곳에 또 가지 않게)
+    반환: 받을 사람 모두에게 전송이 끝난 글 목록 (차단 등 다시 보내도 안 되는 실패는 끝난 것으로 침)
+    """
+    threshold = DIGEST_THRESHOLD if threshold is None else threshold
+    key = key or id
+    # 채팅방 → 보낼 글 (글 순서 유지)
+    by_chat = {}
+    for post in posts:
+        done = sent.get(key(post), ()) if sent is not None else ()
+        for chat_id in recipients(post):
+            if chat_id not in done:
+                by_chat.setdefault(chat_id, []).append(post)
+
+    jobs = []
+    digests = 0
+    for chat_id, chat_posts in by_chat.items():
+        if len(chat_posts) > threshold:
+            digests += 1
+            jobs.append((chat_id, chat_posts, send_digest(chat_id, chat_posts)))
+        else:
+            jobs.extend((chat_id, [post], send_one(chat_id, post)) for post in chat_posts)
+    if len(by_chat) > 1 or digests:
+        print(f"📨 {len(posts)}건 → {len(by_chat)}개 채팅방, 메시지 {len(jobs)}개 (요약 {digests}개)")
+
+    failed = set()
+    for chat_id, job_posts, future in jobs:
+        result = future.result()
+        metrics.count("send_retries", max(result.get("attempts", 1) - 1, 0))
+        if not result["ok"]:
+            metrics.count("send_failed")
+            if _retryable(result):
+                failed.update(id(post) for post in job_posts)
+                continue
+        if sent is not None:
+            for post in job_posts:
+                sent.setdefault(key(post), set()).add(chat_id)
+    metrics.count("messages", len(jobs))
+    return [post for post in posts if id(post) not in failed]
+
+
+def _describe(e):
+    return f"{type(e).__name__}: {metrics.redact(str(e))}"
+
+
+def _retryable(result):
+    """ 400/403(채팅방 없음, 봇 차단) 은 다음 실행에 다시 보내도 똑같이 실패함 """
+    status = result.get("status")
+    return status is None or status == 429 or status >= 500